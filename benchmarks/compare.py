@@ -0,0 +1,72 @@
+"""
+Compare two benchmark result files and flag regressions.
+
+Usage:
+    python benchmarks/compare.py results/abc1234.json results/def5678.json
+    python benchmarks/compare.py base.json head.json --threshold 0.05
+
+Exits with status 1 when any benchmark got slower by more than the threshold.
+"""
+import argparse
+import json
+import sys
+
+
+def load_results(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    timings = {
+        (r['name'], r['rows']): r['best']
+        for r in report['results'] if r.get('status') == 'ok'
+    }
+    return report.get('commit', path), timings
+
+
+def compare(base_path, head_path, threshold=0.10):
+    """
+    Print per-benchmark changes in best time between two runs.
+
+    Args:
+        base_path (str): Results of the reference commit
+        head_path (str): Results of the commit under test
+        threshold (float): Relative slowdown reported as a regression
+
+    Returns:
+        list: (name, rows, change) for every regression
+    """
+    base_commit, base = load_results(base_path)
+    head_commit, head = load_results(head_path)
+    print(f"{base_commit} -> {head_commit}")
+
+    regressions = []
+    for key in sorted(set(base) & set(head), key=lambda k: (k[0], k[1] or 0)):
+        name, rows = key
+        change = (head[key] - base[key]) / base[key] if base[key] else 0.0
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append((name, rows, change))
+        label = f"{name} [{rows:,}]" if rows else name
+        print(f"{label:<32} {base[key]:>9.3f}s {head[key]:>9.3f}s {change:>+8.1%}{flag}")
+
+    for key in sorted(set(base) ^ set(head), key=lambda k: (k[0], k[1] or 0)):
+        print(f"{key[0]} [{key[1]}] only in {'base' if key in base else 'head'}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark runs")
+    parser.add_argument('base')
+    parser.add_argument('head')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Relative slowdown treated as a regression (default: 0.10)")
+    args = parser.parse_args()
+
+    regressions = compare(args.base, args.head, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Synthetic Taglish comment generators for the benchmarks.
+
+Comments are built from a fixed vocabulary with a seeded RNG, so every run
+of a given size produces byte-identical data and timings stay comparable
+across commits.
+"""
+import os
+import random
+from typing import List
+
+import pandas as pd
+
+TAGALOG = (
+    "ang mga sa na ng yung lang talaga kasi dapat hindi bakit sana naman po "
+    "pera bayan gobyerno kurakot nakaw baha kalsada proyekto pulitiko tayo sila "
+    "nila kayo ninyo wala meron grabe kawawa managot batas kulong ibalik buwis"
+).split()
+ENGLISH = (
+    "the is and of to flood control project corruption budget funds contractor "
+    "senate president investigation accountability ghost projects billion "
+    "should be charged please stop stealing money infrastructure people"
+).split()
+NOISE = ["😡", "🤣", "!!!", "...", "#FloodControl", "@dpwh", "https://example.com/post", "&amp;", "HAHAHA"]
+
+SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+
+def parse_size(label: str) -> int:
+    """'10k' / '100k' / '1m' or a plain integer."""
+    label = label.lower()
+    if label in SIZES:
+        return SIZES[label]
+    return int(label)
+
+
+def generate_comments(n: int, seed: int = 42) -> List[str]:
+    """
+    Generate `n` comments mixing English, Tagalog and Taglish.
+
+    Roughly a third of the comments lean Tagalog, a third English and a
+    third are code-switched; some carry emojis, mentions, hashtags, URLs and
+    HTML entities so every cleaning regex has work to do.
+    """
+    rng = random.Random(seed)
+    comments = []
+    for _ in range(n):
+        tl_share = rng.choice((0.9, 0.5, 0.1))
+        words = [
+            rng.choice(TAGALOG) if rng.random() < tl_share else rng.choice(ENGLISH)
+            for _ in range(rng.randint(3, 40))
+        ]
+        if rng.random() < 0.4:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(NOISE))
+        if rng.random() < 0.2:
+            words[0] = words[0].capitalize()
+        comments.append(' '.join(words))
+    return comments
+
+
+def platform_frames(n: int, seed: int = 42) -> List[tuple]:
+    """
+    Split `n` comments across frames in each platform's legacy layout, as
+    returned by text_preprocessor.read_csv_files().
+    """
+    comments = generate_comments(n, seed)
+    chunks = [comments[i::5] for i in range(5)]
+    return [
+        (pd.DataFrame({'Hashtags': '', 'Comments': chunks[0], 'Source': 'Threads'}), 'Threads'),
+        (pd.DataFrame({'comment_id': range(len(chunks[1])), 'username': 'user', 'text': chunks[1]}), 'Instagram'),
+        (pd.DataFrame({'url': 'https://reddit.com/x', 'user': 'user', 'comment': chunks[2],
+                       'id': [f"r{i}" for i in range(len(chunks[2]))], 'parent_id': 't3_x'}), 'Reddit'),
+        (pd.DataFrame({'postUrl': 'https://x.com/a/status/1', 'postId': '1', 'comments': chunks[3]}), 'X'),
+        (pd.DataFrame({'Comment Text': chunks[4]}), 'Facebook'),
+    ]
+
+
+def write_repo_layout(base_path: str, n: int, seed: int = 42) -> str:
+    """
+    Write synthetic cleaned CSVs where text_preprocessor.read_csv_files()
+    looks for them, under `base_path`.
+    """
+    paths = {
+        'Threads': 'threads_comments.csv',
+        'Instagram': os.path.join('instagram-scraper', 'cleaned_instagram_comments.csv'),
+        'Reddit': os.path.join('reddit-scraper', 'cleaned_reddit_comments.csv'),
+        'X': os.path.join('x-scraper', 'CleanedXComments.csv'),
+        'Facebook': os.path.join('facebook-scraper', 'facebook_comments.csv'),
+    }
+    for df, source in platform_frames(n, seed):
+        path = os.path.join(base_path, paths[source])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        df.to_csv(path, index=False)
+    return base_path
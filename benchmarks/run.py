@@ -0,0 +1,312 @@
+"""
+Offline CPU benchmarks for the preprocessing and modelling hot paths.
+
+Every benchmark runs on synthetic Taglish corpora from generators.py, so
+no scraped data or network access is needed. Results are written to
+benchmarks/results/<commit>.json; compare two runs with compare.py.
+
+Usage:
+    python benchmarks/run.py                      # 10k and 100k rows
+    python benchmarks/run.py --sizes 10k 100k 1m
+    python benchmarks/run.py --only clean_text tfidf
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+sys.path.insert(0, BASE_DIR)
+
+from generators import generate_comments, parse_size, platform_frames, write_repo_layout  # noqa: E402
+
+# Mirrors the notebooks' vectorizer / model settings
+TFIDF_PARAMS = dict(max_features=1000, min_df=2, max_df=0.8, ngram_range=(1, 2), sublinear_tf=True)
+SVD_COMPONENTS = 10
+LDA_TOPICS = 10
+
+BENCHMARKS = {}
+_scratch_dirs = []
+
+
+class Skip(Exception):
+    """Raised by a benchmark whose optional dependency is missing."""
+
+
+def scratch_dir(prefix):
+    """Temporary directory for a benchmark's setup, removed once it has been timed."""
+    tmp = tempfile.TemporaryDirectory(prefix=prefix)
+    _scratch_dirs.append(tmp)
+    return tmp.name
+
+
+def benchmark(name, sized=True):
+    """
+    Register a benchmark.
+
+    A benchmark is a function taking the row count and returning a
+    zero-argument callable to time; setup done before the return is not
+    timed. Unsized benchmarks run once per invocation, not once per size.
+    """
+    def register(func):
+        BENCHMARKS[name] = (func, sized)
+        return func
+    return register
+
+
+@benchmark('clean_text')
+def bench_clean_text(n):
+    from text_preprocessor import TextPreprocessor
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        preprocessor = TextPreprocessor()
+    comments = generate_comments(n)
+    return lambda: [preprocessor.clean_text(c) for c in comments]
+
+
+@benchmark('clean_views')
+def bench_clean_views(n):
+    """All three PROFILES views per comment in one pass."""
+    from text_preprocessor import TextPreprocessor
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        preprocessor = TextPreprocessor()
+        preprocessor.lemmatize('comments')
+    comments = generate_comments(n)
+    return lambda: [preprocessor.clean_views(c) for c in comments]
+
+
+@benchmark('extract_comments')
+def bench_extract_comments(n):
+    from text_preprocessor import extract_comments_from_dataframes
+
+    frames = platform_frames(n)
+    return lambda: extract_comments_from_dataframes(frames)
+
+
+@benchmark('read_csv_files')
+def bench_read_csv_files(n):
+    from text_preprocessor import read_csv_files
+
+    tmp = scratch_dir('bench_read_')
+    write_repo_layout(tmp, n)
+    return lambda: read_csv_files(base_path=tmp)
+
+
+def cleaned_corpus(n):
+    from stopwords_vocab import get_stopwords
+    import pandas as pd
+
+    stopwords = get_stopwords()
+    texts = pd.Series(generate_comments(n)).str.lower().str.replace(r'[^a-z\s]', ' ', regex=True)
+    return [' '.join(token for token in text.split() if token not in stopwords) for text in texts]
+
+
+@benchmark('tfidf')
+def bench_tfidf(n):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    docs = cleaned_corpus(n)
+    return lambda: TfidfVectorizer(**TFIDF_PARAMS).fit_transform(docs)
+
+
+@benchmark('lsa_svd')
+def bench_lsa_svd(n):
+    from sklearn.decomposition import TruncatedSVD
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    matrix = TfidfVectorizer(**TFIDF_PARAMS).fit_transform(cleaned_corpus(n))
+    return lambda: TruncatedSVD(n_components=SVD_COMPONENTS, random_state=42).fit_transform(matrix)
+
+
+@benchmark('lda_train')
+def bench_lda_train(n):
+    try:
+        from gensim.corpora import Dictionary
+        from gensim.models import LdaModel
+    except ImportError as e:
+        raise Skip(f"gensim not installed ({e})")
+
+    tokens = [doc.split() for doc in cleaned_corpus(n)]
+    dictionary = Dictionary(tokens)
+    dictionary.filter_extremes(no_below=2, no_above=0.7)
+    corpus = [dictionary.doc2bow(doc) for doc in tokens]
+    # Single-process with fewer passes than the notebook (10 passes / 400
+    # iterations) so the 1m run finishes; relative changes are what matter
+    return lambda: LdaModel(corpus, id2word=dictionary, num_topics=LDA_TOPICS,
+                            passes=1, iterations=50, chunksize=2000, random_state=42)
+
+
+def index_documents(n):
+    import pandas as pd
+
+    comments = generate_comments(n)
+    sources = ['Threads', 'Instagram', 'Reddit', 'X', 'Facebook']
+    return pd.DataFrame({'source': [sources[i % 5] for i in range(n)],
+                         'original_id': [str(i) for i in range(n)],
+                         'comment': comments,
+                         'tokens': cleaned_corpus(n)})
+
+
+@benchmark('bm25_build')
+def bench_bm25_build(n):
+    from search_index import SearchIndex
+
+    docs = index_documents(n)
+
+    def run():
+        with tempfile.TemporaryDirectory(prefix='bench_index_') as index_dir:
+            SearchIndex(index_dir).add(docs)
+    return run
+
+
+@benchmark('bm25_query')
+def bench_bm25_query(n):
+    """100 queries (one to three terms, some filtered by source) against an n-document index."""
+    from search_index import SearchIndex
+
+    index_dir = scratch_dir('bench_index_')
+    SearchIndex(index_dir).add(index_documents(n))
+    index = SearchIndex(index_dir)
+    queries = [['kurakot'], ['flood', 'control'], ['baha', 'proyekto', 'contractor'], ['senate'],
+               ['ghost', 'projects']] * 20
+
+    def run():
+        for i, terms in enumerate(queries):
+            index.search_terms(terms, k=10, sources=['Reddit', 'X'] if i % 2 else None)
+    return run
+
+
+def spam_matching(n, terms):
+    import random
+    from spam_filter import PatternMatcher, SPAM_TERMS_FILE, load_patterns
+
+    rng = random.Random(42)
+    extra = [''.join(rng.choices('abcdefghijklmnopqrstuvwxyzàáạảãèéẹẻẽ', k=rng.randint(4, 12)))
+             for _ in range(terms)]
+    matcher = PatternMatcher(list(load_patterns(SPAM_TERMS_FILE)) + extra)
+    comments = generate_comments(n)
+    return lambda: [matcher.matches(c) for c in comments]
+
+
+@benchmark('spam_filter')
+def bench_spam_filter_default(n):
+    return spam_matching(n, 0)
+
+
+@benchmark('spam_filter_5k_terms')
+def bench_spam_filter_5k(n):
+    """Same comments against 5,000 extra terms; should stay close to spam_filter."""
+    return spam_matching(n, 5000)
+
+
+@benchmark('consolidate_cold', sized=False)
+def bench_consolidate_cold(n):
+    from consolidator_v2 import create_workflow_notebook
+
+    def run():
+        with tempfile.TemporaryDirectory(prefix='bench_cache_') as cache:
+            create_workflow_notebook(base_path=BASE_DIR, cache_dir=cache)
+    return run
+
+
+@benchmark('consolidate_warm', sized=False)
+def bench_consolidate_warm(n):
+    from consolidator_v2 import create_workflow_notebook
+
+    cache = scratch_dir('bench_cache_')
+    with contextlib.redirect_stdout(io.StringIO()):
+        create_workflow_notebook(base_path=BASE_DIR, cache_dir=cache)
+    return lambda: create_workflow_notebook(base_path=BASE_DIR, cache_dir=cache)
+
+
+def time_call(func, repeat):
+    """Wall-clock seconds of `repeat` calls, with the benchmark's own prints silenced."""
+    timings = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_benchmark(name, n, repeat):
+    func, sized = BENCHMARKS[name]
+    result = {'name': name, 'rows': n if sized else None}
+    try:
+        try:
+            call = func(n)
+        except Skip as e:
+            result.update(status='skipped', reason=str(e))
+            return result
+        timings = time_call(call, repeat)
+    finally:
+        while _scratch_dirs:
+            _scratch_dirs.pop().cleanup()
+    best = min(timings)
+    result.update(status='ok', best=best, mean=statistics.mean(timings), repeat=repeat)
+    if sized:
+        result['rows_per_sec'] = n / best if best else None
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite")
+    parser.add_argument('--sizes', nargs='+', default=['10k', '100k'],
+                        help="Corpus sizes: 10k, 100k, 1m or a row count (default: 10k 100k)")
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help="Run a subset")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per benchmark (best is reported)")
+    parser.add_argument('--output', help="Results file (default: benchmarks/results/<commit>.json)")
+    args = parser.parse_args()
+
+    names = args.only or list(BENCHMARKS)
+    sizes = [parse_size(s) for s in args.sizes]
+    commit = git_commit()
+
+    results = []
+    for name in names:
+        for n in (sizes if BENCHMARKS[name][1] else sizes[:1]):
+            result = run_benchmark(name, n, args.repeat)
+            results.append(result)
+            label = f"{name} [{n:,} rows]" if result['rows'] else name
+            if result['status'] == 'skipped':
+                print(f"{label}: skipped - {result['reason']}")
+            else:
+                rate = f", {result['rows_per_sec']:,.0f} rows/s" if result.get('rows_per_sec') else ''
+                print(f"{label}: best {result['best']:.3f}s, mean {result['mean']:.3f}s{rate}")
+
+    report = {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': f"{platform.system()} {platform.machine()} ({os.cpu_count()} CPUs)",
+        'results': results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from scraper_core import RowSink
+
+# Column order of every scraper output written through CommentWriter
+COMMENT_FIELDS = (
+    'platform', 'post_url', 'comment_id', 'parent_id', 'username',
+    'text', 'created_at', 'like_count', 'is_reply',
+)
+
+# Exact dtypes of the unified layout. Strings are never missing (they are
+# written as ''), so a read needs no NaN handling or type coercion.
+COMMENT_DTYPES = {
+    'platform': str,
+    'post_url': str,
+    'comment_id': str,
+    'parent_id': str,
+    'username': str,
+    'text': str,
+    'created_at': str,
+    'like_count': 'int64',
+    'is_reply': 'int8',
+}
+
+# Column renames that upgrade files written before the unified layout
+LEGACY_COLUMNS = {
+    'reddit': {'url': 'post_url', 'user': 'username', 'comment': 'text', 'id': 'comment_id'},
+    'instagram': {'created_at_utc': 'created_at'},
+    'facebook': {'id': 'comment_id'},
+}
+
+
+@dataclass(slots=True)
+class Comment:
+    """One scraped comment, identical across platforms."""
+    platform: str
+    text: str
+    post_url: str = ''
+    comment_id: str = ''
+    parent_id: str = ''
+    username: str = ''
+    created_at: str = ''
+    like_count: int = 0
+    is_reply: int = 0
+
+    def as_row(self) -> Dict[str, object]:
+        return {field: getattr(self, field) for field in COMMENT_FIELDS}
+
+
+class CommentWriter(RowSink):
+    """
+    Buffered writer for Comment records in the unified CSV layout.
+
+    Records are collected in memory and written `batch_size` at a time;
+    call flush() before recording progress elsewhere (e.g. a checkpoint).
+    """
+
+    def __init__(self, path: str, fresh: bool = False, batch_size: int = 500):
+        super().__init__(path, COMMENT_FIELDS, fresh=fresh)
+        self.batch_size = batch_size
+        self.buffer: List[Dict[str, object]] = []
+
+    def add(self, comment: Comment) -> None:
+        self.buffer.append(comment.as_row())
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def extend(self, comments: Iterable[Comment]) -> None:
+        for comment in comments:
+            self.add(comment)
+
+    def flush(self) -> None:
+        if self.buffer:
+            rows, self.buffer = self.buffer, []
+            self.write(rows)
+
+    def close(self) -> None:
+        self.flush()
+        super().close()
+
+
+def is_unified(df: pd.DataFrame) -> bool:
+    """True when a frame already has the unified comment layout."""
+    return list(df.columns) == list(COMMENT_FIELDS)
+
+
+def read_comments(path: str, platform: Optional[str] = None) -> pd.DataFrame:
+    """
+    Read a comment CSV into the unified layout.
+
+    Files written by CommentWriter are read as-is with fixed dtypes. Older
+    per-platform exports are upgraded using LEGACY_COLUMNS, which needs the
+    `platform` they came from.
+
+    Args:
+        path (str): CSV to read
+        platform (str, optional): Platform of a legacy file
+
+    Returns:
+        pd.DataFrame: Columns in COMMENT_FIELDS order
+    """
+    header = pd.read_csv(path, nrows=0)
+    if is_unified(header):
+        return pd.read_csv(path, dtype=COMMENT_DTYPES, keep_default_na=False)
+
+    if platform not in LEGACY_COLUMNS:
+        raise ValueError(f"{path} is not in the unified layout; pass one of {sorted(LEGACY_COLUMNS)} as platform")
+
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    df = df.rename(columns=LEGACY_COLUMNS[platform])
+    df['platform'] = platform
+    for field, dtype in COMMENT_DTYPES.items():
+        if field not in df.columns:
+            df[field] = '' if dtype is str else 0
+    df = df[list(COMMENT_FIELDS)]
+    df['like_count'] = pd.to_numeric(df['like_count'], errors='coerce').fillna(0)
+    return df.astype(COMMENT_DTYPES)
@@ -4,7 +4,9 @@ import nbformat
 from nbformat.v4 import new_notebook, new_code_cell, new_markdown_cell
 import ast
 
-def create_merged_notebook():
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def create_merged_notebook(base_path=BASE_DIR):
     """Create a single notebook merging all Python files and notebooks"""
     
     # Create new notebook
@@ -13,8 +15,6 @@ def create_merged_notebook():
     # Add title
     merged_nb.cells.append(new_markdown_cell("# Flood Control Semantic Analysis - Merged Codebase\n\nThis notebook contains all Python scripts and notebooks from the project merged into a single file."))
     
-    base_path = "/Users/lestat/Documents/Projects/Data Mining/flood-control-semantic-analysis"
-    
     # Updated processing order including all scrapers
     processing_order = [
         # Core utilities first
@@ -218,14 +218,12 @@ def scan_remaining_files(notebook, base_path, processed_files):
         notebook.cells.append(new_markdown_cell("*No additional Python files found.*"))
 
 # Enhanced simple version that ensures scrapers are included
-def create_simple_merged_notebook():
+def create_simple_merged_notebook(base_path=BASE_DIR):
     """Create a simpler merged notebook with all files including scrapers"""
     
     merged_nb = new_notebook()
     merged_nb.cells.append(new_markdown_cell("# Flood Control Semantic Analysis - Complete Codebase\n\n*This includes all scrapers, analysis notebooks, and utility scripts.*"))
     
-    base_path = "/Users/lestat/Documents/Projects/Data Mining/flood-control-semantic-analysis"
-    
     # Collect files by category
     categories = {
         "Scrapers": [],
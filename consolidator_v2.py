@@ -1,10 +1,15 @@
 import os
 import json
+import hashlib
 import nbformat
 from nbformat.v4 import new_notebook, new_code_cell, new_markdown_cell
+from concurrent.futures import ThreadPoolExecutor
 import ast
 
-def create_workflow_notebook():
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, '.consolidator_cache')
+
+def create_workflow_notebook(base_path=BASE_DIR, cache_dir=CACHE_DIR, max_workers=8):
     """Create a consolidated notebook following the complete workflow"""
     
     # Create new notebook
@@ -26,8 +31,6 @@ This notebook consolidates the entire data processing and analysis workflow for
 ---
 """))
     
-    base_path = "/Users/lestat/Documents/Projects/Data Mining/flood-control-semantic-analysis"
-    
     # Define the exact workflow order based on your codebase
     workflow_sections = [
         {
@@ -78,6 +81,10 @@ This notebook consolidates the entire data processing and analysis workflow for
     
     processed_files = []
     
+    # Build (or load from cache) the cells for every file up front
+    all_files = [f for section in workflow_sections for f in section['files']]
+    fragments = load_fragments(base_path, all_files, cache_dir, max_workers)
+    
     # Process each workflow section
     for section in workflow_sections:
         # Add major section header with emoji and clear formatting
@@ -92,9 +99,7 @@ This notebook consolidates the entire data processing and analysis workflow for
         section_has_files = False
         
         for file_path in section['files']:
-            full_path = os.path.join(base_path, file_path)
-            
-            if os.path.exists(full_path):
+            if file_path in fragments:
                 section_has_files = True
                 processed_files.append(file_path)
                 
@@ -110,10 +115,7 @@ This notebook consolidates the entire data processing and analysis workflow for
 
 """))
                 
-                if file_path.endswith('.py'):
-                    merge_python_file(merged_nb, full_path, file_path)
-                elif file_path.endswith('.ipynb'):
-                    merge_notebook_file(merged_nb, full_path, file_path)
+                merged_nb.cells.extend(nbformat.from_dict(cell) for cell in fragments[file_path])
                 
                 # Add clear separator
                 merged_nb.cells.append(new_markdown_cell("\n---\n"))
@@ -155,6 +157,97 @@ This consolidated notebook contains the complete flood control semantic analysis
     print(f"✅ Consolidated workflow notebook saved to: {output_path}")
     return output_path
 
+def _consolidator_version():
+    """Hash of this script so cached fragments are rebuilt when the formatting code changes"""
+    with open(os.path.abspath(__file__), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+def build_fragment(full_path, rel_path):
+    """Render a single source file into a list of notebook cells"""
+    fragment = new_notebook()
+    if rel_path.endswith('.py'):
+        merge_python_file(fragment, full_path, rel_path)
+    elif rel_path.endswith('.ipynb'):
+        merge_notebook_file(fragment, full_path, rel_path)
+    return fragment.cells
+
+def load_fragments(base_path, rel_paths, cache_dir=CACHE_DIR, max_workers=8):
+    """
+    Return {rel_path: cells} for every existing file, reusing cached fragments.
+    
+    Fragments are stored per path and content hash, since the rendered cells
+    name their file. A file whose size and mtime match the index is not even
+    re-read; a file whose content is unchanged after a touch is re-hashed but
+    not re-parsed. Only files with new content are rendered, in parallel.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    index_path = os.path.join(cache_dir, 'index.json')
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        index = {}
+    
+    version = _consolidator_version()
+    fragments = {}
+    to_build = []
+    stale = []
+    
+    for rel_path in rel_paths:
+        full_path = os.path.join(base_path, rel_path)
+        if not os.path.exists(full_path):
+            continue
+        
+        st = os.stat(full_path)
+        entry = index.get(rel_path)
+        if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            content_hash = entry['sha256']
+        else:
+            with open(full_path, 'rb') as f:
+                content_hash = hashlib.sha256(f.read()).hexdigest()
+        
+        path_hash = hashlib.sha256(rel_path.encode('utf-8')).hexdigest()[:12]
+        fragment_name = f"{content_hash}-{path_hash}-{version}.json"
+        fragment_path = os.path.join(cache_dir, fragment_name)
+        if entry and entry.get('fragment') not in (None, fragment_name):
+            stale.append(entry['fragment'])
+        index[rel_path] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': content_hash,
+                           'fragment': fragment_name}
+        
+        if os.path.exists(fragment_path):
+            with open(fragment_path, 'r', encoding='utf-8') as f:
+                fragments[rel_path] = json.load(f)
+        else:
+            to_build.append((rel_path, full_path, fragment_path))
+    
+    def build(item):
+        rel_path, full_path, fragment_path = item
+        cells = build_fragment(full_path, rel_path)
+        with open(fragment_path, 'w', encoding='utf-8') as f:
+            json.dump(cells, f, ensure_ascii=False)
+        return rel_path, cells
+    
+    if to_build:
+        print(f"🔄 Rendering {len(to_build)} changed file(s), {len(fragments)} cached")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for rel_path, cells in executor.map(build, to_build):
+                fragments[rel_path] = cells
+    else:
+        print(f"⚡ All {len(fragments)} file(s) loaded from cache")
+    
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=1)
+    
+    # Drop the previous fragment of files whose content (or the consolidator) changed;
+    # fragments of files not in this call are kept for the other notebook layouts
+    for name in stale:
+        try:
+            os.remove(os.path.join(cache_dir, name))
+        except FileNotFoundError:
+            pass
+    
+    return fragments
+
 def merge_python_file(notebook, file_path, rel_path):
     """Add Python file content with proper formatting and context"""
     try:
@@ -189,9 +282,9 @@ Core text preprocessing utilities including:
                 tree = ast.parse(content)
                 lines = content.split('\n')
                 
-                # Extract imports
+                # Extract top-level imports (nested imports stay inside their functions)
                 imports = []
-                for node in ast.walk(tree):
+                for node in tree.body:
                     if isinstance(node, (ast.Import, ast.ImportFrom)):
                         line_num = node.lineno - 1
                         if line_num < len(lines):
@@ -201,15 +294,15 @@ Core text preprocessing utilities including:
                     notebook.cells.append(new_markdown_cell("#### 📦 Required Imports"))
                     notebook.cells.append(new_code_cell('\n'.join(sorted(set(imports)))))
                 
-                # Extract classes and functions with better organization
+                # Extract top-level classes and functions; only tree.body is visited
                 classes_and_functions = []
-                for node in ast.walk(tree):
-                    if isinstance(node, ast.ClassDef) and node.col_offset == 0:
+                for node in tree.body:
+                    if isinstance(node, ast.ClassDef):
                         start_line = node.lineno - 1  
                         end_line = getattr(node, 'end_lineno', len(lines)) or len(lines)
                         content_block = '\n'.join(lines[start_line:end_line])
                         classes_and_functions.append(('class', node.name, content_block))
-                    elif isinstance(node, ast.FunctionDef) and node.col_offset == 0:
+                    elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
                         start_line = node.lineno - 1
                         end_line = getattr(node, 'end_lineno', len(lines)) or len(lines)
                         content_block = '\n'.join(lines[start_line:end_line])
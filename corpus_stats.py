@@ -0,0 +1,247 @@
+import math
+import random
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Upper bounds (inclusive) of the histogram buckets; the last bucket is open-ended
+WORD_BUCKETS = (2, 5, 10, 20, 50)
+LENGTH_BUCKETS = (20, 50, 100, 200, 500, 1000)
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang & Liberty, 2016).
+
+    Keeps a stack of compactors: level h holds items of weight 2**h, and a
+    full level is sorted and every other item promoted to the next one.
+    Memory stays near k / (1 - c) items however many values are added, with
+    rank error of roughly 1/k. Streams shorter than the first level's capacity are
+    kept whole, so small corpora get exact quantiles, interpolated between
+    neighbouring values the way pandas' Series.quantile() does.
+    """
+
+    def __init__(self, k: int = 200, c: float = 2 / 3, seed: Optional[int] = 0):
+        """
+        Args:
+            k (int): Capacity of the top compactor; larger is more accurate
+            c (float): Capacity ratio between consecutive levels
+            seed (int, optional): Seed for the compaction coin flips
+        """
+        self.k = k
+        self.c = c
+        self.rng = random.Random(seed)
+        self.compactors: List[List[float]] = []
+        self.size = 0
+        self.max_size = 0
+        self.count = 0
+        self._grow()
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return int(math.ceil(self.c ** depth * self.k)) + 1
+
+    def _grow(self) -> None:
+        self.compactors.append([])
+        self.max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def _compress(self) -> None:
+        for level, items in enumerate(self.compactors):
+            if len(items) >= self._capacity(level):
+                if level + 1 >= len(self.compactors):
+                    self._grow()
+                items.sort()
+                # Keep an odd item behind so the promoted half is exact
+                leftover = [items.pop()] if len(items) % 2 else []
+                self.compactors[level + 1].extend(items[self.rng.randint(0, 1)::2])
+                self.compactors[level] = leftover
+                self.size = sum(len(c) for c in self.compactors)
+                return
+
+    def update(self, value: float) -> None:
+        self.compactors[0].append(value)
+        self.size += 1
+        self.count += 1
+        if self.size >= self.max_size:
+            self._compress()
+
+    def update_many(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.update(value)
+
+    @property
+    def exact(self) -> bool:
+        """True while nothing has been compacted, i.e. every value is still held."""
+        return len(self.compactors) == 1
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        """
+        Values at the given ranks (0 <= q <= 1).
+
+        Exact, with linear interpolation (so the median of an even count is
+        the mean of the two middle values), until the first compaction;
+        approximate afterwards. Returns None for each rank when the sketch
+        is empty.
+        """
+        if not self.count:
+            return [None] * len(qs)
+        if self.exact:
+            return [float(v) for v in np.quantile(self.compactors[0], list(qs))]
+        weighted = sorted((value, 1 << level)
+                          for level, items in enumerate(self.compactors) for value in items)
+        total = sum(weight for _, weight in weighted)
+        results = []
+        for q in qs:
+            target = q * total
+            cumulative = 0
+            for value, weight in weighted:
+                cumulative += weight
+                if cumulative >= target:
+                    results.append(value)
+                    break
+            else:
+                results.append(weighted[-1][0])
+        return results
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles([q])[0]
+
+
+class Histogram:
+    """Counts of values per bucket, with the bucket bounds fixed up front."""
+
+    def __init__(self, bounds: Sequence[int]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+
+    def update_many(self, values: pd.Series) -> None:
+        buckets = np.searchsorted(self.bounds, values.to_numpy(), side='left')
+        for bucket, n in enumerate(np.bincount(buckets, minlength=len(self.counts))):
+            self.counts[bucket] += int(n)
+
+    def labels(self) -> List[str]:
+        labels, low = [], 0
+        for high in self.bounds:
+            labels.append(f"{low}-{high}")
+            low = high + 1
+        labels.append(f"{low}+")
+        return labels
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(zip(self.labels(), self.counts))
+
+
+class RunningStats:
+    """Exact count / mean / min / max plus a KLL sketch for quantiles."""
+
+    def __init__(self, k: int = 200):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+        self.sketch = KLLSketch(k=k)
+
+    def update_many(self, values: pd.Series) -> None:
+        if values.empty:
+            return
+        self.count += len(values)
+        self.total += int(values.sum())
+        low, high = int(values.min()), int(values.max())
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        self.sketch.update_many(values.tolist())
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self, qs: Sequence[float] = (0.25, 0.5, 0.75, 0.95)) -> Dict[str, object]:
+        quantiles = self.sketch.quantiles(qs)
+        return {
+            'count': self.count, 'mean': self.mean, 'min': self.min, 'max': self.max,
+            'quantiles': {f"p{int(q * 100)}": v for q, v in zip(qs, quantiles)},
+            'quantiles_exact': self.sketch.exact,
+        }
+
+
+def word_counts(cleaned: pd.Series) -> pd.Series:
+    """
+    Words per cleaned comment.
+
+    clean_text joins tokens with single spaces and strips the ends, so the
+    count is one more than the number of spaces; no token lists are built.
+    """
+    return cleaned.str.count(' ').add(1).where(cleaned.str.len() > 0, 0)
+
+
+class CorpusStats:
+    """
+    Summary statistics of preprocessed comments, accumulated chunk by chunk.
+
+    update() takes any slice of the preprocessed frame, so the statistics
+    of a corpus that never fits in memory come out the same as those of one
+    frame holding all of it (up to the sketch's quantile error).
+    """
+
+    def __init__(self, k: int = 200):
+        self.sources = Counter()
+        self.languages = Counter()
+        self.words = RunningStats(k)
+        self.original_length = RunningStats(k)
+        self.cleaned_length = RunningStats(k)
+        self.word_histogram = Histogram(WORD_BUCKETS)
+        self.length_histogram = Histogram(LENGTH_BUCKETS)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """
+        Add a chunk with `source`, `comment` and `cleaned_comment` columns
+        (and optionally `language`).
+        """
+        self.sources.update(chunk['source'].tolist())
+        if 'language' in chunk:
+            self.languages.update(chunk['language'].tolist())
+
+        words = word_counts(chunk['cleaned_comment'])
+        cleaned_length = chunk['cleaned_comment'].str.len()
+        self.words.update_many(words)
+        self.original_length.update_many(chunk['comment'].str.len())
+        self.cleaned_length.update_many(cleaned_length)
+        self.word_histogram.update_many(words)
+        self.length_histogram.update_many(cleaned_length)
+
+    @property
+    def total(self) -> int:
+        return self.words.count
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            'total': self.total,
+            'sources': dict(self.sources.most_common()),
+            'languages': dict(self.languages.most_common()),
+            'word_count': self.words.as_dict(),
+            'original_length': self.original_length.as_dict(),
+            'cleaned_length': self.cleaned_length.as_dict(),
+            'word_histogram': self.word_histogram.as_dict(),
+            'cleaned_length_histogram': self.length_histogram.as_dict(),
+        }
+
+    def print_summary(self) -> None:
+        print("\n=== Summary Statistics ===")
+        print(f"Total comments: {self.total}")
+        print("Comments by source:")
+        for source, n in self.sources.most_common():
+            print(f"  {source:<16} {n}")
+        if self.languages:
+            print("Comments by language:")
+            for language, n in self.languages.most_common():
+                print(f"  {language:<16} {n}")
+        print(f"\nAverage word count: {self.words.mean:.2f}")
+        approx = '' if self.words.sketch.exact else ' (approx.)'
+        print(f"Median word count{approx}: {self.words.sketch.quantile(0.5) or 0:.2f}")
+        print(f"Max word count: {self.words.max}")
+        print(f"Min word count: {self.words.min}")
+        print("Word count distribution:")
+        for label, n in self.word_histogram.as_dict().items():
+            print(f"  {label:<8} {n}")
@@ -0,0 +1,261 @@
+"""
+Content-addressed store for the datasets shared by the notebooks.
+
+Every file is kept once under data_store/blobs/, named by the SHA-256 of
+its content, and never modified. data_store/manifest.json maps dataset
+names to blobs, so notebooks ask for a name instead of a relative path:
+
+    from dataset_store import load_dataset
+    df = load_dataset('comments')
+
+Parsed DataFrames are cached per blob (and read options): in memory for the
+rest of the process, and as Parquet under data_store/cache/ for later
+processes. A dataset is parsed from CSV once, however many notebooks and
+scripts read it.
+
+    python dataset_store.py list
+    python dataset_store.py add comments path/to/comments.csv --description "..."
+    python dataset_store.py verify
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, Optional
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_STORE_DIR = os.path.join(BASE_DIR, 'data_store')
+
+# Text formats have their line endings normalized before hashing, so a copy
+# saved with Windows line endings resolves to the same blob
+TEXT_FORMATS = ('csv', 'txt')
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class DatasetStore:
+    """
+    Immutable hash-named blobs plus a manifest of named datasets.
+
+    Args:
+        root (str): Store directory holding blobs/, manifest.json and cache/
+    """
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR):
+        self.root = root
+        self.blob_dir = os.path.join(root, 'blobs')
+        self.cache_dir = os.path.join(root, 'cache')
+        self.manifest_path = os.path.join(root, 'manifest.json')
+        self._parsed: Dict[tuple, pd.DataFrame] = {}
+        self._manifest = None
+
+    @property
+    def manifest(self) -> dict:
+        if self._manifest is None:
+            if os.path.exists(self.manifest_path):
+                with open(self.manifest_path, encoding='utf-8') as f:
+                    self._manifest = json.load(f)
+            else:
+                self._manifest = {'datasets': {}}
+        return self._manifest
+
+    def _save_manifest(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        tmp = f"{self.manifest_path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+            f.write('\n')
+        os.replace(tmp, self.manifest_path)
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest)
+
+    def put(self, path: str, name: Optional[str] = None, fmt: Optional[str] = None,
+            description: str = '') -> str:
+        """
+        Copy a file into the store (once per distinct content) and optionally
+        point a dataset name at it.
+
+        Args:
+            path (str): File to add
+            name (str, optional): Dataset name to create or repoint
+            fmt (str, optional): 'csv', 'txt' or anything else for opaque
+                bytes; defaults to the file extension
+            description (str): Stored in the manifest entry
+
+        Returns:
+            str: SHA-256 of the stored content
+        """
+        fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+        with open(path, 'rb') as f:
+            data = f.read()
+        if fmt in TEXT_FORMATS:
+            data = data.replace(b'\r\n', b'\n')
+        digest = content_hash(data)
+        target = self.blob_path(digest)
+        if not os.path.exists(target):
+            os.makedirs(self.blob_dir, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.blob_dir)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.chmod(tmp, 0o444)
+            os.replace(tmp, target)
+        if name:
+            entry = self.manifest['datasets'].get(name, {})
+            sources = entry.get('sources', []) if entry.get('blob') == digest else []
+            source = os.path.relpath(os.path.abspath(path), BASE_DIR)
+            entry.update({'blob': digest, 'format': fmt, 'bytes': len(data),
+                          'sources': sorted(set(sources) | {source})})
+            if description:
+                entry['description'] = description
+            self.manifest['datasets'][name] = entry
+            self._save_manifest()
+        return digest
+
+    def entry(self, name: str) -> dict:
+        try:
+            return self.manifest['datasets'][name]
+        except KeyError:
+            raise KeyError(f"Unknown dataset {name!r}. Available: {sorted(self.manifest['datasets'])}") from None
+
+    def resolve(self, name: str) -> str:
+        """Path of the blob behind a dataset name (read-only; do not write to it)."""
+        path = self.blob_path(self.entry(name)['blob'])
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Blob for dataset {name!r} is missing: {path}")
+        return path
+
+    def load(self, name: str, **read_csv_kwargs) -> pd.DataFrame:
+        """
+        A CSV dataset as a DataFrame, parsed at most once per blob and options.
+
+        Returns a copy, so callers may modify it without affecting other
+        readers of the cached frame.
+        """
+        entry = self.entry(name)
+        if entry['format'] != 'csv':
+            raise ValueError(f"Dataset {name!r} is {entry['format']}, not csv")
+        options = json.dumps(read_csv_kwargs, sort_keys=True, default=str)
+        key = (entry['blob'], options)
+        df = self._parsed.get(key)
+        if df is None:
+            df = self._load_parsed(entry['blob'], options, read_csv_kwargs)
+            self._parsed[key] = df
+        return df.copy()
+
+    def _load_parsed(self, digest: str, options: str, read_csv_kwargs: dict) -> pd.DataFrame:
+        cache_file = os.path.join(self.cache_dir, f"{digest}-{content_hash(options.encode())[:12]}.parquet")
+        if os.path.exists(cache_file):
+            try:
+                return pd.read_parquet(cache_file)
+            except ImportError:
+                pass
+        df = pd.read_csv(self.blob_path(digest), **read_csv_kwargs)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{cache_file}.{os.getpid()}.tmp"
+            df.to_parquet(tmp, index=False)
+            os.replace(tmp, cache_file)
+        except (ImportError, ValueError, TypeError):
+            # No Parquet engine, or columns Parquet cannot hold: stay in-memory only
+            pass
+        return df
+
+    def read_text(self, name: str) -> str:
+        """A text dataset's content."""
+        with open(self.resolve(name), encoding='utf-8') as f:
+            return f.read()
+
+    def verify(self) -> Dict[str, bool]:
+        """Dataset name -> whether its blob exists and still matches its hash."""
+        results = {}
+        for name, entry in self.manifest['datasets'].items():
+            path = self.blob_path(entry['blob'])
+            ok = os.path.exists(path)
+            if ok:
+                with open(path, 'rb') as f:
+                    ok = content_hash(f.read()) == entry['blob']
+            results[name] = ok
+        return results
+
+    def clear_cache(self) -> None:
+        """Drop parsed forms (in memory and on disk); blobs are untouched."""
+        self._parsed.clear()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+store = DatasetStore()
+
+
+def load_dataset(name: str, **read_csv_kwargs) -> pd.DataFrame:
+    """Named CSV dataset from the default store (see DatasetStore.load)."""
+    return store.load(name, **read_csv_kwargs)
+
+
+def dataset_path(name: str) -> str:
+    """Blob path of a named dataset in the default store."""
+    return store.resolve(name)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Content-addressed dataset store")
+    parser.add_argument('--root', default=DEFAULT_STORE_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+    add = commands.add_parser('add', help="Store a file and point a dataset name at it")
+    add.add_argument('name')
+    add.add_argument('path')
+    add.add_argument('--format', help="csv, txt, ... (default: file extension)")
+    add.add_argument('--description', default='')
+    commands.add_parser('list', help="Datasets in the manifest")
+    commands.add_parser('verify', help="Re-hash every blob")
+    path = commands.add_parser('path', help="Print a dataset's blob path")
+    path.add_argument('name')
+    commands.add_parser('clear-cache', help="Delete cached parsed forms")
+    timing = commands.add_parser('time', help="Compare parsing a CSV dataset with loading it from the cache")
+    timing.add_argument('name')
+    args = parser.parse_args()
+
+    ds = DatasetStore(args.root)
+    if args.command == 'add':
+        digest = ds.put(args.path, args.name, args.format, args.description)
+        print(f"{args.name} -> {digest}")
+    elif args.command == 'list':
+        for name, entry in sorted(ds.manifest['datasets'].items()):
+            print(f"{name:<24} {entry['blob'][:12]}  {entry['format']:<4} {entry['bytes']:>10,} bytes  "
+                  f"{entry.get('description', '')}")
+    elif args.command == 'verify':
+        results = ds.verify()
+        for name, ok in sorted(results.items()):
+            print(f"{name:<24} {'ok' if ok else 'MISSING OR MODIFIED'}")
+        if not all(results.values()):
+            raise SystemExit(1)
+    elif args.command == 'path':
+        print(ds.resolve(args.name))
+    elif args.command == 'clear-cache':
+        ds.clear_cache()
+    else:
+        start = time.perf_counter()
+        pd.read_csv(ds.resolve(args.name))
+        parse = time.perf_counter() - start
+        ds.load(args.name)
+        cold = DatasetStore(args.root)
+        start = time.perf_counter()
+        cold.load(args.name)
+        cached = time.perf_counter() - start
+        start = time.perf_counter()
+        cold.load(args.name)
+        warm = time.perf_counter() - start
+        print(f"read_csv {parse * 1000:.1f}ms, new process (Parquet cache) {cached * 1000:.1f}ms, "
+              f"same process {warm * 1000:.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
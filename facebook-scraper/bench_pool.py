@@ -0,0 +1,99 @@
+import os
+import time
+import argparse
+
+from scrape_fb import DriverPool, crawl_posts, report_throughput
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def comment_html(post: int, i: int) -> str:
+    return (
+        '<div class="x1n2onr6">'
+        f'<span class="x3nfvp2"><span>user{post}_{i}</span></span>'
+        f'<div class="xdj266r">Post {post} comment {i} tungkol sa flood control</div>'
+        '</div>'
+    )
+
+
+def write_fixture(post: int, n_comments: int, batch: int, latency_ms: int, path: str) -> str:
+    """
+    Write a static page shaped like a Facebook post.
+
+    It has the comment sort button, the 'All comments' option and a
+    'View more comments' link that appends `batch` comments after
+    `latency_ms`, so the explicit waits are exercised the same way as on
+    the live site.
+    """
+    initial = ''.join(comment_html(post, i) for i in range(1, min(batch, n_comments) + 1))
+    html = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>fixture {post}</title></head>
+<body>
+<div class="x9f619 x1n2onr6 x1ja2u2z x6s0dn4 x3nfvp2 xxymvpz">Most relevant</div>
+<div role="menuitem">All comments</div>
+<div id="comments">{initial}</div>
+<span id="more">View more comments</span>
+<script>
+let loaded = {min(batch, n_comments)};
+const total = {n_comments};
+document.getElementById('more').addEventListener('click', () => {{
+    setTimeout(() => {{
+        const list = document.getElementById('comments');
+        const end = Math.min(loaded + {batch}, total);
+        for (let i = loaded + 1; i <= end; i++) {{
+            list.insertAdjacentHTML('beforeend',
+                `<div class="x1n2onr6"><span class="x3nfvp2"><span>user{post}_${{i}}</span></span>` +
+                `<div class="xdj266r">Post {post} comment ${{i}} tungkol sa flood control</div></div>`);
+        }}
+        loaded = end;
+        if (loaded >= total) document.getElementById('more').remove();
+    }}, {latency_ms});
+}});
+</script>
+</body></html>
+"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
+    return path
+
+
+def fixture_urls(posts: int, n_comments: int, batch: int, latency_ms: int):
+    urls = []
+    for post in range(1, posts + 1):
+        path = os.path.join(FIXTURE_DIR, f"fb_post_{post}_{n_comments}.html")
+        write_fixture(post, n_comments, batch, latency_ms, path)
+        urls.append(f"file://{path}")
+    return urls
+
+
+def run(urls, pool_size: int, expected: int):
+    pool = DriverPool(pool_size, headless=True)
+    try:
+        start = time.perf_counter()
+        results = list(crawl_posts(urls, pool, wait_timeout=2))
+        elapsed = time.perf_counter() - start
+    finally:
+        pool.close()
+
+    short = [url for _, url, cmts in results if len(cmts) != expected]
+    if short:
+        print(f"Warning: {len(short)} posts returned fewer than {expected} comments")
+    return report_throughput(len(results), elapsed, pool_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Facebook driver pool on local HTML fixtures")
+    parser.add_argument("--posts", type=int, default=12)
+    parser.add_argument("--comments", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=50, help="Comments added per 'View more' click")
+    parser.add_argument("--latency-ms", type=int, default=300, help="Simulated delay before a batch appears")
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    urls = fixture_urls(args.posts, args.comments, args.batch, args.latency_ms)
+    rates = {size: run(urls, size, args.comments) for size in args.pool_sizes}
+
+    print("\npool size | posts/min")
+    for size, rate in rates.items():
+        print(f"{size:>9} | {rate:9.1f}")
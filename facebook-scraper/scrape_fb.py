@@ -1,9 +1,11 @@
 import os
-import time
+import sys
 import json
+import time
+import queue
 import random
-from io import StringIO
-import pandas as pd
+import argparse
+from contextlib import contextmanager
 
 # ==== Selenium imports ====
 from selenium import webdriver
@@ -12,42 +14,125 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from scraper_core import iter_bounded, rate_limiter
+from comment_schema import Comment, CommentWriter
+from spam_filter import is_spam
+
+"""Set credentials first: FACEBOOK_USERNAME and FACEBOOK_PASSWORD as environment variables"""
+
+FACEBOOK_URL = "https://www.facebook.com/"
+COOKIES_FILE = "fb_cookies.json"
+
+# Counts the comment text nodes currently rendered, used to wait for "View more" to land
+COUNT_COMMENTS_JS = """
+return document.evaluate(
+    "count(//div[contains(@class, 'x1n2onr6')]//div[contains(@class, 'xdj266r')])",
+    document, null, XPathResult.NUMBER_TYPE, null
+).numberValue;
+"""
+
+# Pulls username + text for every comment in one round-trip instead of two
+# find_element calls per container. Nested x1n2onr6 containers resolve to the
+# same text node, so text nodes are de-duplicated.
+EXTRACT_COMMENTS_JS = """
+const limit = arguments[0];
+const first = (xpath, ctx) => document.evaluate(
+    xpath, ctx, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+const containers = document.evaluate(
+    "//div[contains(@class, 'x1n2onr6')]", document, null,
+    XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const seen = new Set();
+const results = [];
+for (let i = 0; i < containers.snapshotLength && results.length < limit; i++) {
+    const container = containers.snapshotItem(i);
+    const textEl = first(".//div[contains(@class, 'xdj266r')]", container);
+    const userEl = first(".//span[@class='x3nfvp2']/span", container);
+    if (!textEl || !userEl || seen.has(textEl)) continue;
+    seen.add(textEl);
+    results.push({username: userEl.innerText, text: textEl.innerText});
+}
+return results;
+"""
+
 # ==========================
 # Helper functions
 # ==========================
 
-def configure_driver():
+def configure_driver(headless=False):
     """Configure Chrome driver with webdriver-manager"""
     chrome_options = Options()
-    chrome_options.add_argument("--start-maximized")
+    if headless:
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--window-size=1920,1080")
+    else:
+        chrome_options.add_argument("--start-maximized")
     chrome_options.add_argument("--disable-notifications")
     chrome_options.add_argument("--disable-infobars")
     chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--allow-file-access-from-files")
     driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
     return driver
 
 
-def login_facebook(username, password, driver):
+def login_facebook(username, password, driver, timeout=30):
     """Login to Facebook"""
-    driver.get("https://www.facebook.com/")
+    driver.get(FACEBOOK_URL)
     WebDriverWait(driver, 15).until(
         EC.presence_of_element_located((By.ID, "email"))
     ).send_keys(username)
-    driver.find_element(By.ID, "pass").send_keys(password)          
-    driver.find_element(By.NAME, "login").click()                   
-    time.sleep(5)  # wait for login
+    driver.find_element(By.ID, "pass").send_keys(password)
+    driver.find_element(By.NAME, "login").click()
+    # The c_user cookie is only set once the session is authenticated
+    WebDriverWait(driver, timeout).until(lambda d: d.get_cookie("c_user"))
     print("Logged into Facebook.")
 
 
-def scroll_and_click_button(driver):
+def export_session_cookies(driver, path=None):
+    """Return the logged-in session cookies, optionally saving them as JSON"""
+    cookies = driver.get_cookies()
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(cookies, f)
+        print(f"Saved session cookies: {path}")
+    return cookies
+
+
+def load_session_cookies(path):
+    """Load cookies written by export_session_cookies"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def apply_session_cookies(driver, cookies):
+    """Authenticate a fresh driver by injecting exported session cookies"""
+    # Cookies can only be set for the domain currently loaded
+    driver.get(FACEBOOK_URL)
+    for cookie in cookies:
+        driver.add_cookie(cookie)
+
+
+def wait_for_page(driver, timeout=15):
+    """Wait until the document has finished loading"""
+    WebDriverWait(driver, timeout).until(
+        lambda d: d.execute_script("return document.readyState") == "complete"
+    )
+
+
+def count_comments(driver):
+    return int(driver.execute_script(COUNT_COMMENTS_JS))
+
+
+def scroll_and_click_button(driver, timeout=10):
     """Scroll until the 'All comments | Most relevant' button is clickable"""
     cnt = 3
     try:
         while cnt > 0:
             try:
-                button = WebDriverWait(driver, 10).until(
+                button = WebDriverWait(driver, timeout).until(
                     EC.element_to_be_clickable(
                         (By.CSS_SELECTOR, "div.x9f619.x1n2onr6.x1ja2u2z.x6s0dn4.x3nfvp2.xxymvpz")
                     )
@@ -64,10 +149,10 @@ def scroll_and_click_button(driver):
         return False
 
 
-def click_showed_type_btn(driver, btn_name):
+def click_showed_type_btn(driver, btn_name, timeout=10):
     """Click 'All comments' or 'Most relevant'"""
     try:
-        button = WebDriverWait(driver, 10).until(
+        button = WebDriverWait(driver, timeout).until(
             EC.element_to_be_clickable((By.XPATH, f"//*[contains(text(), '{btn_name}')]"))
         )
         button.click()
@@ -81,127 +166,227 @@ def click_view_more_btn(driver):
     """Click 'View more comments' if available"""
     try:
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        view_more_btn = WebDriverWait(driver, 5).until(
-            EC.element_to_be_clickable((By.XPATH, "//span[contains(text(), 'more comments')]"))
-        )
-        view_more_btn.click()
+        # The previous click has already settled, so there is nothing to wait for
+        buttons = driver.find_elements(By.XPATH, "//span[contains(text(), 'more comments')]")
+        if not buttons:
+            return False
+        buttons[0].click()
         print("Clicked 'View more comments'.")
         return True
     except Exception:
         return False
 
 
-def show_more_comments(driver, max_attempts=10):
+def show_more_comments(driver, max_attempts=10, timeout=10):
     """Keep clicking 'View more comments' until done"""
     attempts = 0
     while attempts < max_attempts:
+        before = count_comments(driver)
         if not click_view_more_btn(driver):
             break
-        time.sleep(2)
+        try:
+            # Wait for the new batch instead of sleeping a fixed amount
+            WebDriverWait(driver, timeout, poll_frequency=0.2).until(
+                lambda d: count_comments(d) > before
+            )
+        except TimeoutException:
+            break
         attempts += 1
     print("Finished loading more comments.")
 
 
-def filter_spam(text):
-    """Basic spam filter"""
-    spam_text = ['http', 'miễn phí', '100%', 'kèo bóng', 'khóa học', 'netflix', 'shopee', 'lazada']
-    for spam in spam_text:
-        if spam.lower() in text.lower():
-            return True
-    return False
+def get_comments(driver, url="", limit_text=2500):
+    """Extract visible comments with a single execute_script call, dropping spam"""
+    raw = driver.execute_script(EXTRACT_COMMENTS_JS, limit_text) or []
+    results = [
+        Comment(
+            platform="facebook",
+            post_url=url,
+            comment_id=str(cnt),
+            username=comment["username"] or "",
+            text=comment["text"]
+        )
+        for cnt, comment in enumerate(raw, start=1)
+        if not is_spam(comment["text"])
+    ]
+    print(f"Collected {len(results)} comments ({len(raw) - len(results)} spam dropped).")
+    return results, len(results)
 
 
-def get_comments(driver, limit_text=2500):
-    """Extract visible comments"""
-    cnt = 0
-    results = []
-    comments = driver.find_elements(By.XPATH, "//div[contains(@class, 'x1n2onr6')]")
-    for comment in comments:
+# ==========================
+# Driver pool
+# ==========================
+
+class DriverPool:
+    """
+    A fixed set of headless drivers sharing one authenticated session.
+
+    Workers borrow a driver with `acquire()` and hand it back when the post is
+    done, so each driver only ever crawls one page at a time.
+    """
+
+    def __init__(self, size, cookies=None, headless=True, driver_factory=configure_driver):
+        self.size = size
+        self.drivers = []
+        self.available = queue.Queue()
+        for _ in range(size):
+            driver = driver_factory(headless=headless)
+            if cookies:
+                apply_session_cookies(driver, cookies)
+            self.drivers.append(driver)
+            self.available.put(driver)
+
+    @contextmanager
+    def acquire(self):
+        driver = self.available.get()
         try:
-            text_ele = comment.find_element(By.XPATH, ".//div[contains(@class, 'xdj266r')]")
-            username = comment.find_element(By.XPATH, ".//span[@class='x3nfvp2']/span")
-            if text_ele:
-                cnt += 1
-                if cnt > limit_text:
-                    break
-                text = text_ele.text
-                results.append({
-                    "id": cnt,
-                    "username": username.text if username else "",
-                    "text": text,
-                    "is_spam": 1 if filter_spam(text) else 0
-                })
-        except Exception:
-            continue
-    print(f"Collected {cnt} comments.")
-    return results, cnt
+            yield driver
+        finally:
+            self.available.put(driver)
+
+    def close(self):
+        for driver in self.drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
 
+def authenticate(username, password, cookies_file=COOKIES_FILE, headless=True):
+    """
+    Reuse saved session cookies when present, otherwise log in once and
+    export them for the pool.
+    """
+    if cookies_file and os.path.exists(cookies_file):
+        print(f"Using saved session cookies: {cookies_file}")
+        return load_session_cookies(cookies_file)
 
-def save_to_csv(df, file_name):
-    """Save DataFrame to CSV"""
-    df.to_csv(file_name, index=False)
+    if not username or not password:
+        print("Error: set FACEBOOK_USERNAME and FACEBOOK_PASSWORD (or provide a cookies file)")
+        sys.exit(1)
+
+    driver = configure_driver(headless=headless)
+    try:
+        login_facebook(username, password, driver)
+        return export_session_cookies(driver, cookies_file)
+    finally:
+        driver.quit()
 
 # ==========================
 # Core crawler
 # ==========================
 
-def crawl_one_post(driver, url):
+def crawl_one_post(driver, url, limit_text=2500, wait_timeout=10):
     """Crawl a single FB post (assumes already logged in)"""
     driver.get(url)
-    time.sleep(5)
+    wait_for_page(driver)
 
-    scroll_and_click_button(driver)
-    click_showed_type_btn(driver, "All comments")
-    show_more_comments(driver)
+    scroll_and_click_button(driver, timeout=wait_timeout)
+    click_showed_type_btn(driver, "All comments", timeout=wait_timeout)
+    show_more_comments(driver, timeout=wait_timeout)
 
-    cmts, cnt = get_comments(driver, limit_text=2500)
+    cmts, cnt = get_comments(driver, url, limit_text=limit_text)
     return cmts, cnt
 
+
+def crawl_posts(urls, pool, limit_text=2500, wait_timeout=10):
+    """
+    Distribute URLs across the driver pool.
+
+    Yields:
+        tuple: (index, url, comments) as each post finishes
+    """
+    def crawl(job):
+        _, url = job
+        with pool.acquire() as driver:
+            return crawl_one_post(driver, url, limit_text=limit_text, wait_timeout=wait_timeout)
+
+    # Local fixtures are not subject to Facebook's rate limit
+    limiter = None if all(url.startswith("file://") for url in urls) else rate_limiter("facebook")
+
+    for (idx, url), result, error in iter_bounded(crawl, enumerate(urls, start=1), pool.size, limiter):
+        if error:
+            print(f"Error scraping {url}: {error}")
+            continue
+        cmts, _ = result
+        print(f"\nScraped: {url}")
+        yield idx, url, cmts
+
+
+def report_throughput(posts, elapsed, pool_size):
+    rate = posts / elapsed * 60 if elapsed else 0.0
+    print(f"Crawled {posts} posts in {elapsed:.1f}s with {pool_size} drivers ({rate:.1f} posts/min)")
+    return rate
+
 # ==========================
 # Main script
 # ==========================
 
-if __name__ == "__main__":
-    # ==== EDIT THESE ====
-    username = "2234664@slu.edu.ph"
-    password = "Scraper1234567890"
-
-    urls = [
-        "https://www.facebook.com/reel/624010930646756",
-        "https://www.facebook.com/photo/?fbid=1279436697548194&set=a.647063400785530",
-        "https://www.facebook.com/kapusomojessicasoho/videos/4243492582599046"
-    ]
-    # ====================
-
-    driver = configure_driver()
-    all_rows = []
-
+urls = [
+    "https://www.facebook.com/reel/624010930646756",
+    "https://www.facebook.com/photo/?fbid=1279436697548194&set=a.647063400785530",
+    "https://www.facebook.com/kapusomojessicasoho/videos/4243492582599046"
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape Facebook post comments with a pool of drivers")
+    parser.add_argument("urls", nargs="*", help="Post URLs (defaults to the built-in list)")
+    parser.add_argument("--urls-file", help="File with one post URL per line")
+    parser.add_argument("--pool-size", type=int, default=3, help="Headless drivers crawling in parallel")
+    parser.add_argument("--output-dir", default=os.path.join(os.path.expanduser("~"), "Downloads"))
+    parser.add_argument("--sample", type=int, default=40, help="Random comments kept per post")
+    parser.add_argument("--cookies", default=COOKIES_FILE, help="Saved session cookies to reuse")
+    parser.add_argument("--no-login", action="store_true", help="Skip authentication, e.g. for local HTML fixtures")
+    parser.add_argument("--headed", action="store_true", help="Show the browser windows")
+    args = parser.parse_args()
+
+    post_urls = args.urls or urls
+    if args.urls_file:
+        with open(args.urls_file, "r", encoding="utf-8") as f:
+            post_urls = [line.strip() for line in f if line.strip()]
+
+    headless = not args.headed
+    cookies = None
+    if not args.no_login:
+        cookies = authenticate(os.getenv("FACEBOOK_USERNAME"), os.getenv("FACEBOOK_PASSWORD"),
+                               cookies_file=args.cookies, headless=headless)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    pool_size = max(1, min(args.pool_size, len(post_urls)))
+    pool = DriverPool(pool_size, cookies=cookies, headless=headless)
+    combined_path = os.path.join(args.output_dir, "comments.csv")
+    combined = CommentWriter(combined_path, fresh=True)
+    posts = 0
+
+    start = time.perf_counter()
     try:
-        login_facebook(username, password, driver)
-
-        for idx, url in enumerate(urls, start=1):
-            print(f"\nScraping: {url}")
-            cmt_data, cnt = crawl_one_post(driver, url)
+        for idx, url, cmt_data in crawl_posts(post_urls, pool):
+            posts += 1
 
-            # Limit to 40 random comments (or fewer if <40 available)
+            # Limit to N random comments (or fewer if fewer are available)
             if cmt_data:
-                if len(cmt_data) > 40:
-                    cmt_data = random.sample(cmt_data, 40)
+                if len(cmt_data) > args.sample:
+                    cmt_data = random.sample(cmt_data, args.sample)
 
-                all_rows.extend(cmt_data)
+                combined.extend(cmt_data)
 
                 # Save per-post file
-                df_post = pd.read_json(StringIO(json.dumps(cmt_data, ensure_ascii=False)), orient="records")
-                per_post_path = os.path.join(os.path.expanduser("~"), "Downloads", f"comments_post_{idx}.csv")
-                save_to_csv(df_post, per_post_path)
-                print(f"Saved per-post CSV (max 40 comments): {per_post_path}")
-
-        # Save combined (sum of per-post limits)
-        if all_rows:
-            df_all = pd.read_json(StringIO(json.dumps(all_rows, ensure_ascii=False)), orient="records")
-            combined_path = os.path.join(os.path.expanduser("~"), "Downloads", "comments.csv")
-            save_to_csv(df_all, combined_path)
-            print(f"\nSaved combined CSV: {combined_path}")
-
+                per_post_path = os.path.join(args.output_dir, f"comments_post_{idx}.csv")
+                with CommentWriter(per_post_path, fresh=True) as writer:
+                    writer.extend(cmt_data)
+                print(f"Saved per-post CSV (max {args.sample} comments): {per_post_path}")
     finally:
-        driver.quit()
+        pool.close()
+        combined.close()
+    elapsed = time.perf_counter() - start
+
+    # Combined file holds the sum of per-post limits
+    if combined.rows_written:
+        print(f"\nSaved combined CSV: {combined_path}")
+
+    report_throughput(posts, elapsed, pool_size)
+
+
+if __name__ == "__main__":
+    main()
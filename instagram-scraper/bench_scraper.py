@@ -0,0 +1,155 @@
+"""
+Paging, resume and memory check for the Instagram comment scraper.
+
+A fake client answers media_comments_chunk() with generated comments paged
+by `min_id`, raises PleaseWaitFewMinutes once and drops the connection
+half-way through the post. The real scrape_comments() / iter_comment_chunks()
+/ AdaptiveBackoff / CursorStore path then scrapes the post and is restarted
+from the saved cursor, so the run shows:
+
+- that the rate-limit response is retried after one back-off,
+- that resuming from the cursor re-fetches no comment and misses none,
+- that every comment reaches the CSV exactly once,
+- the tracemalloc peak, which stays flat as the post grows because only one
+  chunk is held at a time.
+
+    python bench_scraper.py --comments 1000 100000 --chunk-size 50
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from types import SimpleNamespace
+
+import pandas as pd
+from instagrapi.exceptions import PleaseWaitFewMinutes
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from scraper import AdaptiveBackoff, CommentWriter, CursorStore, scrape_comments
+from scraper_core import TokenBucket
+
+
+class FakeClient:
+    """Stand-in for instagrapi.Client.media_comments_chunk over one generated post."""
+
+    def __init__(self, total: int, rate_limit_at: int = 2, fail_at: int = None):
+        """
+        Args:
+            total (int): Comments on the post
+            rate_limit_at (int): Call number answered once with PleaseWaitFewMinutes
+            fail_at (int, optional): Call number that drops the connection (once)
+        """
+        self.total = total
+        self.rate_limit_at = rate_limit_at
+        self.fail_at = fail_at
+        self.calls = 0
+        self.rate_limited = 0
+        self.served = []
+
+    def media_comments_chunk(self, media_id, max_amount, min_id=None):
+        self.calls += 1
+        if self.calls == self.rate_limit_at:
+            self.rate_limit_at = None
+            self.rate_limited += 1
+            raise PleaseWaitFewMinutes('Please wait a few minutes before you try again.')
+        if self.calls == self.fail_at:
+            self.fail_at = None
+            raise ConnectionError('connection reset by peer')
+
+        # Comments are generated per chunk; the fake keeps only the served ranges
+        start = int(min_id) if min_id else 0
+        end = min(self.total, start + max_amount)
+        comments = [SimpleNamespace(pk=i, user=SimpleNamespace(username=f'user{i % 500}'),
+                                    text=f'Comment {i} tungkol sa flood control',
+                                    created_at_utc=f'2025-09-15 {i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}+00:00',
+                                    comment_like_count=i % 50)
+                    for i in range(start, end)]
+        self.served.append((start, end))
+        return comments, (str(end) if end < self.total else None)
+
+
+def scrape(total: int, chunk_size: int, workdir: str):
+    """
+    Scrape one post, crashing half-way, then resume from the saved cursor.
+
+    Returns:
+        dict: Calls, retries, back-off waits, refetched/missing comments,
+            CSV rows, unique ids and tracemalloc peak (bytes)
+    """
+    output = os.path.join(workdir, f'instagram_{total}.csv')
+    cursors_path = os.path.join(workdir, f'cursors_{total}.json')
+    chunks = -(-total // chunk_size)
+    waits = []
+
+    def run(client):
+        backoff = AdaptiveBackoff(limiter=TokenBucket(rate=1e9), sleep=waits.append)
+        writer = CommentWriter(output)
+        try:
+            # scrape_comments prints a summary and the simulated crash
+            with contextlib.redirect_stdout(io.StringIO()):
+                scrape_comments(client, 'media', writer, CursorStore(cursors_path),
+                                max_comments=total, chunk_size=chunk_size, backoff=backoff)
+        finally:
+            writer.close()
+
+    first = FakeClient(total, rate_limit_at=2, fail_at=chunks // 2 + 2)
+    second = FakeClient(total, rate_limit_at=None)
+    CommentWriter(output, fresh=True).close()
+    tracemalloc.start()
+    try:
+        run(first)
+        run(second)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    served = first.served + second.served
+    covered = sum(end - start for start, end in served)
+    distinct = len({i for start, end in served for i in range(start, end)})
+    ids = pd.read_csv(output, usecols=['comment_id'], dtype=str)['comment_id']
+    return {
+        'calls': first.calls + second.calls,
+        'retries': first.rate_limited + second.rate_limited,
+        'waits': len(waits),
+        'refetched': covered - distinct,
+        'missing': total - distinct,
+        'resumed_from': second.served[0][0] if second.served else total,
+        'rows': len(ids),
+        'unique': ids.nunique(),
+        'peak': peak,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check Instagram comment paging, resume and memory against a fake client")
+    parser.add_argument('--comments', type=int, nargs='+', default=[1000, 100000], help="Comments on the fake post")
+    parser.add_argument('--chunk-size', type=int, default=50, help="Comments requested per call")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='instagram_bench_')
+    ok = True
+    try:
+        print(f"{'comments':>8} {'calls':>6} {'retry':>5} {'resumed@':>9} {'refetched':>9} "
+              f"{'missing':>7} {'rows':>8} {'peak KiB':>9}")
+        for total in args.comments:
+            result = scrape(total, args.chunk_size, workdir)
+            print(f"{total:>8} {result['calls']:>6} {result['retries']:>5} {result['resumed_from']:>9} "
+                  f"{result['refetched']:>9} {result['missing']:>7} {result['rows']:>8} {result['peak'] / 1024:>9.0f}")
+            if (result['retries'] != 1 or result['waits'] != 1 or result['refetched'] or result['missing']
+                    or result['rows'] != total or result['unique'] != total):
+                ok = False
+                print(f"  expected one back-off and {total} unique rows, got {result['waits']} waits, "
+                      f"{result['rows']} rows ({result['unique']} unique), {result['refetched']} refetched, "
+                      f"{result['missing']} missing")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
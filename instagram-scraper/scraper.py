@@ -1,10 +1,16 @@
 import os
-import csv
+import json
 import time
 import sys
+from itertools import islice
 from instagrapi import Client
 from instagrapi.exceptions import LoginRequired, PleaseWaitFewMinutes, ChallengeRequired
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scraper_core import backoff_delays, rate_limiter
+import comment_schema
+from comment_schema import Comment
+
 """Set credentials first: INSTAGRAM_USERNAME and INSTAGRAM_PASSWORD as environment variables"""
 
 def setup_client():
@@ -69,51 +75,174 @@ def get_media_id_from_url(cl, url):
         print(f"Error extracting media ID from {url}: {e}")
         return None
 
-def scrape_comments(cl, media_id, max_comments=500):
-    """Scrape comments from a post"""
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CURSORS_FILE = 'instagram_cursors.json'
+
+
+class AdaptiveBackoff:
+    """
+    Paces comment requests through the shared Instagram rate limiter and
+    backs off when Instagram answers with PleaseWaitFewMinutes.
+
+    Every rate-limit response halves the limiter's rate and waits out a
+    jittered, exponentially growing cool-down; every successful chunk
+    brings the rate back up towards the platform budget.
+    """
+
+    def __init__(self, limiter=None, penalty=60.0, max_penalty=900.0, min_rate=1 / 60.0,
+                 max_retries=5, sleep=time.sleep):
+        self.limiter = limiter or rate_limiter('instagram')
+        self.base_rate = self.limiter.rate
+        self.min_rate = min_rate
+        self.penalty = penalty
+        self.max_penalty = max_penalty
+        self.max_retries = max_retries
+        self.sleep = sleep
+
+    def pause(self):
+        """Wait for the next request slot"""
+        self.limiter.acquire()
+
+    def success(self):
+        self.limiter.rate = min(self.base_rate, self.limiter.rate * 1.25)
+
+    def rate_limited(self, attempt):
+        """Cool down after a PleaseWaitFewMinutes; returns False once retries are exhausted"""
+        if attempt >= self.max_retries:
+            return False
+        self.limiter.rate = max(self.min_rate, self.limiter.rate / 2)
+        delays = backoff_delays(self.penalty, max_delay=self.max_penalty)
+        wait = next(islice(delays, attempt, None))
+        print(f"Rate limited, waiting {wait:.0f}s (retry {attempt + 1}/{self.max_retries})...")
+        self.sleep(wait)
+        return True
+
+
+def comment_record(comment, post_url=''):
+    return Comment(
+        platform='instagram',
+        post_url=post_url,
+        comment_id=str(comment.pk),
+        username=comment.user.username,
+        text=comment.text,
+        created_at=str(comment.created_at_utc),
+        like_count=getattr(comment, 'comment_like_count', None) or getattr(comment, 'like_count', None) or 0
+    )
+
+
+def iter_comment_chunks(cl, media_id, max_comments=500, chunk_size=50, min_id=None, backoff=None, post_url=''):
+    """
+    Yield comments one chunk at a time using `min_id` pagination.
+
+    Only the current chunk is ever held in memory, regardless of how many
+    comments the post has.
+
+    Args:
+        cl: Logged-in instagrapi Client (or anything with `media_comments_chunk`)
+        media_id (str): Media to read
+        max_comments (int): Stop after this many comments
+        chunk_size (int): Comments requested per call
+        min_id (str, optional): Cursor to resume from
+        backoff (AdaptiveBackoff, optional): Request pacing
+        post_url (str, optional): Stored on every record
+
+    Yields:
+        tuple: (rows, next_min_id); next_min_id is None once the post is exhausted
+    """
+    backoff = backoff or AdaptiveBackoff()
+    fetched = 0
+    first = True
+
+    while fetched < max_comments:
+        if not first:
+            backoff.pause()
+        first = False
+
+        amount = min(chunk_size, max_comments - fetched)
+        attempt = 0
+        while True:
+            try:
+                comments, next_min_id = cl.media_comments_chunk(media_id, amount, min_id=min_id)
+                break
+            except PleaseWaitFewMinutes:
+                if not backoff.rate_limited(attempt):
+                    raise
+                attempt += 1
+        backoff.success()
+
+        rows = [comment_record(comment, post_url) for comment in comments[:max_comments - fetched]]
+        fetched += len(rows)
+        if not comments or not next_min_id:
+            yield rows, None
+            return
+        min_id = next_min_id
+        yield rows, min_id
+
+
+class CursorStore:
+    """Per-media pagination state persisted as JSON so a crashed run can resume"""
+
+    def __init__(self, filename=CURSORS_FILE):
+        self.path = filename if os.path.isabs(filename) else os.path.join(SCRIPT_DIR, filename)
+        self.state = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+
+    def get(self, media_id):
+        return self.state.get(media_id, {'min_id': None, 'count': 0, 'done': False})
+
+    def update(self, media_id, min_id, count, done):
+        self.state[media_id] = {'min_id': min_id, 'count': count, 'done': done}
+        # Write-then-rename so an interrupted save never leaves a truncated file
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class CommentWriter(comment_schema.CommentWriter):
+    """Appends records to the CSV in the instagram-scraper folder as each chunk arrives"""
+
+    def __init__(self, filename='instagram_comments.csv', fresh=False):
+        path = filename if os.path.isabs(filename) else os.path.join(SCRIPT_DIR, filename)
+        super().__init__(path, fresh=fresh)
+
+
+def scrape_comments(cl, media_id, writer, cursors, max_comments=500, chunk_size=50, backoff=None, post_url=''):
+    """
+    Stream a post's comments into `writer`, saving the cursor after every chunk.
+
+    Returns:
+        int: Comments written during this call
+    """
+    state = cursors.get(media_id)
+    if state['done']:
+        print(f"Already scraped {state['count']} comments, skipping")
+        return 0
+
+    count = state['count']
+    written = 0
     try:
-        comments = cl.media_comments(media_id, amount=max_comments)
-        
-        comment_data = []
-        for comment in comments:
-            comment_data.append({
-                'comment_id': comment.pk,
-                'username': comment.user.username,
-                'text': comment.text,
-                'created_at_utc': comment.created_at_utc,
-                'like_count': comment.comment_like_count if hasattr(comment, 'comment_like_count') else 0
-            })
-        
-        print(f"Scraped {len(comment_data)} comments")
-        return comment_data
-    
+        for rows, next_min_id in iter_comment_chunks(cl, media_id, max_comments=max_comments - count,
+                                                     chunk_size=chunk_size, min_id=state['min_id'],
+                                                     backoff=backoff, post_url=post_url):
+            writer.extend(rows)
+            writer.flush()
+            count += len(rows)
+            written += len(rows)
+            cursors.update(media_id, next_min_id, count, done=next_min_id is None or count >= max_comments)
     except Exception as e:
         print(f"Error scraping comments for media {media_id}: {e}")
-        return []
 
-def save_to_csv(comments, filename='instagram_comments.csv'):
-    """Save comments to CSV file in the instagram-scraper folder"""
-    if not comments:
-        print("No comments to save")
-        return
-    
-    # Get the directory where this script is located
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    full_path = os.path.join(script_dir, filename)
-    
-    with open(full_path, 'w', newline='', encoding='utf-8') as file:
-        fieldnames = ['comment_id', 'username', 'text', 'created_at_utc', 'like_count']
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        
-        writer.writeheader()
-        writer.writerows(comments)
-    
-    print(f"Saved {len(comments)} comments to {full_path}")
+    print(f"Scraped {written} comments ({count} total for this post)")
+    return written
 
 def main():
     # Check for command line arguments (removing session-related ones)
     if "--help" in sys.argv or "-h" in sys.argv:
-        print("Usage: python scraper.py")
+        print("Usage: python scraper.py [--fresh]")
+        print("  --fresh  Discard saved cursors and start a new CSV")
         print("Environment variables needed:")
         print("  INSTAGRAM_USERNAME - Your Instagram username")
         print("  INSTAGRAM_PASSWORD - Your Instagram password")
@@ -141,31 +270,39 @@ def main():
         print("Failed to setup Instagram client")
         return
     
-    all_comments = []
-    
-    for i, url in enumerate(urls, 1):
-        print(f"\nProcessing URL {i}/{len(urls)}: {url}")
-        
-        # Get media ID
-        media_id = get_media_id_from_url(cl, url)
-        if not media_id:
-            continue
-        
-        # Scrape comments
-        comments = scrape_comments(cl, media_id, max_comments=100)
-        all_comments.extend(comments)
-        
-        # Add delay to avoid rate limiting
-        if i < len(urls):
-            print("Waiting 3 seconds...")
-            time.sleep(3)
-    
-    # Save all comments to CSV
-    if all_comments:
-        save_to_csv(all_comments, 'instagram_comments.csv')
-        print(f"\nTotal comments scraped: {len(all_comments)}")
+    fresh = "--fresh" in sys.argv
+    if fresh:
+        cursors_path = os.path.join(SCRIPT_DIR, CURSORS_FILE)
+        if os.path.exists(cursors_path):
+            os.remove(cursors_path)
+
+    writer = CommentWriter('instagram_comments.csv', fresh=fresh)
+    cursors = CursorStore()
+    backoff = AdaptiveBackoff()
+    total = 0
+
+    try:
+        for i, url in enumerate(urls, 1):
+            print(f"\nProcessing URL {i}/{len(urls)}: {url}")
+
+            # Get media ID
+            media_id = get_media_id_from_url(cl, url)
+            if not media_id:
+                continue
+
+            # Stream comments straight to disk
+            total += scrape_comments(cl, media_id, writer, cursors, max_comments=100, backoff=backoff, post_url=url)
+
+            # Pace posts with the same adaptive delay used between chunks
+            if i < len(urls):
+                backoff.pause()
+    finally:
+        writer.close()
+
+    if total:
+        print(f"\nSaved {total} new comments to {writer.path}")
     else:
-        print("No comments were scraped")
+        print("No new comments were scraped")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,176 @@
+import cProfile
+import json
+import pstats
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+class _NullTimer:
+    """Shared no-op returned while instrumentation is disabled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def mark(self, step: str) -> None:
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics: 'Instrumentation', name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _Laps:
+    """Times consecutive sub-steps of one call: each mark() closes the step since the last one."""
+    __slots__ = ('metrics', 'prefix', 'last')
+
+    def __init__(self, metrics: 'Instrumentation', prefix: str):
+        self.metrics = metrics
+        self.prefix = prefix
+        self.last = time.perf_counter()
+
+    def mark(self, step: str) -> None:
+        now = time.perf_counter()
+        self.metrics.record(f"{self.prefix}.{step}", now - self.last)
+        self.last = now
+
+
+class Instrumentation:
+    """
+    Stage timers and counters for one run.
+
+    Disabled instances hand out a shared no-op object from timer() and
+    laps(), so instrumented code costs one attribute check per call. Hot
+    per-row code should use laps(), which times only every
+    `sample_every`-th call.
+    """
+
+    def __init__(self, enabled: bool = False, sample_every: int = 100):
+        """
+        Args:
+            enabled (bool): Record anything at all
+            sample_every (int): Time one in this many laps() calls per prefix
+        """
+        self.enabled = enabled
+        self.sample_every = max(1, sample_every)
+        self.timings: Dict[str, list] = {}
+        self.counters: Dict[str, int] = {}
+        self.calls: Dict[str, int] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        stats = self.timings.get(name)
+        if stats is None:
+            self.timings[name] = [1, seconds, seconds, seconds]
+        else:
+            stats[0] += 1
+            stats[1] += seconds
+            if seconds < stats[2]:
+                stats[2] = seconds
+            if seconds > stats[3]:
+                stats[3] = seconds
+
+    def timer(self, name: str):
+        """Context manager timing a block under `name`."""
+        if not self.enabled:
+            return NULL_TIMER
+        return _Timer(self, name)
+
+    def laps(self, prefix: str):
+        """
+        Sub-step timer for one call of a hot function, or a no-op when this
+        call is not sampled.
+        """
+        if not self.enabled:
+            return NULL_TIMER
+        calls = self.calls.get(prefix, 0) + 1
+        self.calls[prefix] = calls
+        if calls % self.sample_every:
+            return NULL_TIMER
+        return _Laps(self, prefix)
+
+    def count(self, name: str, n: int = 1) -> None:
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self) -> Dict:
+        """
+        Metrics as a JSON-serialisable dict.
+
+        Sampled timers also carry `estimated_total`: the sampled mean scaled
+        up to every call made.
+        """
+        timers = {}
+        for name, (count, total, low, high) in self.timings.items():
+            entry = {'count': count, 'total': total, 'mean': total / count, 'min': low, 'max': high}
+            prefix = name.rsplit('.', 1)[0]
+            if prefix in self.calls:
+                entry['calls'] = self.calls[prefix]
+                entry['estimated_total'] = entry['mean'] * self.calls[prefix]
+            timers[name] = entry
+        return {'sample_every': self.sample_every, 'timers': timers, 'counters': dict(self.counters)}
+
+    def write_report(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+        print(f"Metrics saved to {path}")
+
+    def summary(self) -> str:
+        """Plain-text table of the timers, slowest first."""
+        report = self.report()['timers']
+        rows = sorted(report.items(), key=lambda item: -item[1].get('estimated_total', item[1]['total']))
+        lines = []
+        for name, entry in rows:
+            total = entry.get('estimated_total', entry['total'])
+            approx = '~' if 'estimated_total' in entry else ' '
+            lines.append(f"{name:<32} {approx}{total:>9.3f}s  ({entry['count']} timed, mean {entry['mean'] * 1000:.3f}ms)")
+        return '\n'.join(lines)
+
+
+# Process-wide instance used by text_preprocessor; disabled unless configured
+metrics = Instrumentation()
+
+
+def configure(enabled: bool = True, sample_every: int = 100) -> Instrumentation:
+    """Reset the shared instance for a new run, keeping every module's reference to it valid."""
+    metrics.__init__(enabled=enabled, sample_every=sample_every)
+    return metrics
+
+
+@contextmanager
+def profile(path: Optional[str] = None, top: int = 25):
+    """
+    Run a block under cProfile.
+
+    The raw stats are dumped to `path` (open with `python -m pstats` or
+    snakeviz) and the `top` entries by cumulative time are printed. For a
+    flamegraph, run the same command under `py-spy record` instead.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path:
+            profiler.dump_stats(path)
+            print(f"\nProfile saved to {path}")
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(top)
@@ -0,0 +1,174 @@
+import math
+import re
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from stopwords_vocab import get_stopwords
+
+LANGUAGES = ('en', 'tl', 'mixed')
+UNKNOWN = 'unknown'
+
+# Share of Tagalog-looking tokens needed to call a comment 'tl' (and the
+# mirror image for 'en'); anything in between is Taglish
+TL_THRESHOLD = 0.75
+EN_THRESHOLD = 0.25
+
+TOKEN_PATTERN = re.compile(r"[a-zñ]+(?:'[a-z]+)?")
+
+
+def char_ngrams(word: str, n_min: int = 1, n_max: int = 3) -> List[str]:
+    """Character n-grams of a word padded with ^ and $ boundary markers."""
+    padded = f"^{word}$"
+    return [padded[i:i + n] for n in range(n_min, n_max + 1) for i in range(len(padded) - n + 1)]
+
+
+class CharNgramLanguageID:
+    """
+    Two-class (English / Tagalog) character n-gram naive Bayes applied per
+    token, aggregated into an en / tl / mixed label per comment.
+
+    Tokens found in exactly one training lexicon are labelled by lookup;
+    everything else is scored by the n-gram model. Token scores are cached,
+    and since comment vocabularies are highly repetitive most tokens after
+    the first few thousand comments are cache hits.
+    """
+
+    def __init__(self, english: Iterable[str], tagalog: Iterable[str], alpha: float = 0.5,
+                 margin: float = 0.6, cache_size: int = 200_000):
+        """
+        Args:
+            english: English training words
+            tagalog: Tagalog training words
+            alpha (float): Additive smoothing for n-gram counts
+            margin (float): Mean per-n-gram log-odds a token needs before it
+                counts as evidence; tokens inside the margin are ignored
+            cache_size (int): Number of token scores kept
+        """
+        english, tagalog = set(english), set(tagalog)
+        shared = english & tagalog
+        self.english_only: FrozenSet[str] = frozenset(english - shared)
+        self.tagalog_only: FrozenSet[str] = frozenset(tagalog - shared)
+        self.margin = margin
+
+        en_counts = Counter(g for w in self.english_only for g in char_ngrams(w))
+        tl_counts = Counter(g for w in self.tagalog_only for g in char_ngrams(w))
+        vocab = set(en_counts) | set(tl_counts)
+        en_total = sum(en_counts.values()) + alpha * (len(vocab) + 1)
+        tl_total = sum(tl_counts.values()) + alpha * (len(vocab) + 1)
+
+        # log P(g | tl) - log P(g | en) per n-gram, plus the value for unseen n-grams
+        self.log_odds: Dict[str, float] = {
+            g: math.log((tl_counts[g] + alpha) / tl_total) - math.log((en_counts[g] + alpha) / en_total)
+            for g in vocab
+        }
+        self.unseen = math.log(alpha / tl_total) - math.log(alpha / en_total)
+        self.token_label = lru_cache(maxsize=cache_size)(self._token_label)
+
+    def _token_label(self, token: str) -> Optional[str]:
+        if token in self.tagalog_only:
+            return 'tl'
+        if token in self.english_only:
+            return 'en'
+        grams = char_ngrams(token)
+        score = sum(self.log_odds.get(g, self.unseen) for g in grams) / len(grams)
+        if score > self.margin:
+            return 'tl'
+        if score < -self.margin:
+            return 'en'
+        return None
+
+    def token_counts(self, text: str) -> Tuple[int, int]:
+        """(English tokens, Tagalog tokens) in a comment."""
+        en = tl = 0
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            if len(token) < 2:
+                continue
+            label = self.token_label(token)
+            if label == 'tl':
+                tl += 1
+            elif label == 'en':
+                en += 1
+        return en, tl
+
+    def predict(self, text: str) -> str:
+        """
+        Tag one comment.
+
+        Returns:
+            str: 'en', 'tl', 'mixed', or 'unknown' when no token carries evidence
+        """
+        if not isinstance(text, str) or not text:
+            return UNKNOWN
+        en, tl = self.token_counts(text)
+        if en + tl == 0:
+            return UNKNOWN
+        share = tl / (en + tl)
+        if share >= TL_THRESHOLD:
+            return 'tl'
+        if share <= EN_THRESHOLD:
+            return 'en'
+        return 'mixed'
+
+    def predict_many(self, texts: Iterable[str]) -> List[str]:
+        return [self.predict(text) for text in texts]
+
+
+@lru_cache(maxsize=None)
+def default_model() -> CharNgramLanguageID:
+    """Model trained on the repo's canonical stopword lists."""
+    return CharNgramLanguageID(english=get_stopwords(('sklearn',)),
+                               tagalog=get_stopwords(('tagalog',)))
+
+
+def detect_language(text: str) -> str:
+    """Tag one comment as en / tl / mixed (or unknown) with the default model."""
+    return default_model().predict(text)
+
+
+def tag_languages(texts: pd.Series) -> pd.Series:
+    """
+    Tag a Series of comments.
+
+    Args:
+        texts (pd.Series): Raw comment text (tag before stopword removal,
+            since function words carry most of the signal)
+
+    Returns:
+        pd.Series: Language labels aligned with `texts`
+    """
+    model = default_model()
+    return pd.Series(model.predict_many(texts.fillna('').astype(str)), index=texts.index, name='language')
+
+
+def split_by_language(df: pd.DataFrame, column: str = 'language') -> Dict[str, pd.DataFrame]:
+    """Group a tagged frame into one frame per label, so each can go to its own model."""
+    return {label: group for label, group in df.groupby(column, sort=False)}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Tag comments as English, Tagalog or Taglish")
+    parser.add_argument('input', help="CSV with a text column")
+    parser.add_argument('--column', default='comment')
+    parser.add_argument('--output', help="Write the CSV back with a language column")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input)
+    start = time.perf_counter()
+    df['language'] = tag_languages(df[args.column])
+    elapsed = time.perf_counter() - start
+
+    print(df['language'].value_counts().to_string())
+    print(f"Tagged {len(df)} comments in {elapsed:.2f}s ({len(df) / elapsed if elapsed else 0:,.0f} comments/s)")
+    if args.output:
+        df.to_csv(args.output, index=False)
+        print(f"Saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
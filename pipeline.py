@@ -0,0 +1,450 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Optional, Sequence
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_DIR = os.path.join(BASE_DIR, '.pipeline')
+CACHE_FILE = os.path.join(PIPELINE_DIR, 'cache.json')
+EXECUTED_DIR = os.path.join(PIPELINE_DIR, 'executed')
+
+STOPWORD_FILES = [
+    'topic-modelling/data/tagalog_stopwords.txt',
+    'topic-modelling/data/social_media_stopwords.txt',
+]
+
+# Modules text_preprocessor.py imports; the topic notebooks clean through it too
+PREPROCESSOR_MODULES = ['stopwords_vocab.py', 'comment_schema.py', 'language_id.py', 'instrumentation.py',
+                        'corpus_stats.py', 'timestamps.py', 'spam_filter.py']
+
+# Named datasets resolve through the store's manifest, which records each blob's hash
+DATASET_FILES = ['dataset_store.py', 'data_store/manifest.json']
+
+
+class Stage:
+    """
+    One step of the pipeline.
+
+    A stage declares the files it reads (`inputs`), the files it writes
+    (`outputs`) and the source files that define its behaviour (`code`).
+    Dependencies between stages are derived from those declarations: a stage
+    depends on every stage that produces one of its inputs.
+    """
+
+    def __init__(self, name: str, command: List[str], inputs: Sequence[str] = (),
+                 outputs: Sequence[str] = (), code: Sequence[str] = (), cwd: str = '.',
+                 manual: bool = False, description: str = ''):
+        self.name = name
+        self.command = list(command)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.code = list(code)
+        self.cwd = cwd
+        self.manual = manual  # only runs when requested by name (needs credentials/network)
+        self.description = description
+
+    def __repr__(self):
+        return f"Stage({self.name!r})"
+
+
+def script_stage(name: str, script: str, **kwargs) -> Stage:
+    """Stage that runs a Python script from its own directory."""
+    cwd = os.path.dirname(script) or '.'
+    code = [script] + list(kwargs.pop('code', []))
+    return Stage(name, [sys.executable, os.path.basename(script)], code=code, cwd=cwd, **kwargs)
+
+
+def notebook_stage(name: str, notebook: str, **kwargs) -> Stage:
+    """
+    Stage that executes a notebook with nbconvert.
+
+    The executed copy goes to .pipeline/executed so the source notebook is
+    never rewritten (which would otherwise change its own fingerprint).
+    """
+    cwd = os.path.dirname(notebook) or '.'
+    executed = os.path.relpath(os.path.join(EXECUTED_DIR, f"{name}.ipynb"), BASE_DIR)
+    output_dir = os.path.relpath(EXECUTED_DIR, os.path.join(BASE_DIR, cwd))
+    command = [sys.executable, '-m', 'jupyter', 'nbconvert', '--to', 'notebook', '--execute',
+               '--output', name, '--output-dir', output_dir, os.path.basename(notebook)]
+    code = [notebook] + list(kwargs.pop('code', []))
+    outputs = list(kwargs.pop('outputs', [])) + [executed]
+    return Stage(name, command, code=code, outputs=outputs, cwd=cwd, **kwargs)
+
+
+# ==========================
+# Stage definitions
+# ==========================
+
+STAGES = [
+    # Scrape (manual: needs credentials and network access)
+    script_stage('scrape_reddit', 'reddit-scraper/scraper.py',
+                 code=['scraper_core.py', 'comment_schema.py'],
+                 outputs=['reddit-scraper/reddit_comments.csv'], manual=True,
+                 description='Collect Reddit comments'),
+    script_stage('scrape_instagram', 'instagram-scraper/scraper.py',
+                 code=['scraper_core.py', 'comment_schema.py'],
+                 outputs=['instagram-scraper/instagram_comments.csv'], manual=True,
+                 description='Collect Instagram comments'),
+
+    # Clean
+    notebook_stage('clean_reddit', 'reddit-scraper/cleaner.ipynb',
+                   code=['comment_schema.py'],
+                   inputs=['reddit-scraper/reddit_comments.csv'],
+                   outputs=['reddit-scraper/cleaned_reddit_comments.csv'],
+                   description='Clean Reddit comments'),
+    notebook_stage('clean_instagram', 'instagram-scraper/cleaner.ipynb',
+                   code=['comment_schema.py'],
+                   inputs=['instagram-scraper/instagram_comments.csv'],
+                   outputs=['instagram-scraper/cleaned_instagram_comments.csv'],
+                   description='Clean Instagram comments'),
+    script_stage('clean_x', 'x-scraper/x-comments-cleaner.py',
+                 inputs=['x-scraper/MergedXComments.csv'],
+                 outputs=['x-scraper/CleanedXComments.csv'],
+                 description='Clean X/Twitter replies'),
+
+    # Preprocess
+    script_stage('preprocess', 'text_preprocessor.py',
+                 code=PREPROCESSOR_MODULES,
+                 inputs=['threads_comments.csv',
+                         'instagram-scraper/cleaned_instagram_comments.csv',
+                         'reddit-scraper/cleaned_reddit_comments.csv',
+                         'x-scraper/CleanedXComments.csv',
+                         'tiktok-scraper/abscbn-tiktok_comments.csv',
+                         'tiktok-scraper/gma-tiktok_comments.csv',
+                         'tiktok-scraper/news5-tiktok_comments.csv',
+                         'facebook-scraper/facebook_comments.csv'] + STOPWORD_FILES,
+                 outputs=['preprocessed_comments.csv'],
+                 description='Merge and clean comments from every platform'),
+
+    # Topic modelling
+    notebook_stage('lda', 'topic-modelling/latent-dirichlet-allocation/Latent_Dirichlet_Allocation.ipynb',
+                   code=['text_preprocessor.py'] + PREPROCESSOR_MODULES,
+                   inputs=DATASET_FILES + STOPWORD_FILES,
+                   outputs=['topic-modelling/latent-dirichlet-allocation/final_lda_model.gensim',
+                            'topic-modelling/latent-dirichlet-allocation/lda_dictionary.gensim'],
+                   description='LDA topic model'),
+    notebook_stage('lsa', 'topic-modelling/latent-semantic-analysis/latent-semantic-analysis-model.ipynb',
+                   code=['stopwords_vocab.py',
+                         'topic-modelling/latent-semantic-analysis/similarity_engine.py'],
+                   inputs=DATASET_FILES + STOPWORD_FILES,
+                   outputs=['topic-modelling/results/lsa_topics_summary.csv',
+                            'topic-modelling/latent-semantic-analysis/lsa_doc_similarity.npz'],
+                   description='LSA topic model and similarity graph'),
+    notebook_stage('bertopic', 'topic-modelling/BERTopic/BERT_v2.ipynb',
+                   code=['text_preprocessor.py'] + PREPROCESSOR_MODULES,
+                   inputs=DATASET_FILES + STOPWORD_FILES,
+                   outputs=['topic-modelling/BERTopic/topic_info_BERT_v2.csv',
+                            'topic-modelling/BERTopic/topic_keywords_BERT_v2.csv'],
+                   description='BERTopic topic model'),
+
+    # Sentiment
+    notebook_stage('sentiment_tuned', 'sentiment-analysis/tuned-sentiment-analysis.ipynb',
+                   code=['sentiment-analysis/rebalance.py'],
+                   inputs=DATASET_FILES,
+                   description='Pseudo-labelled NB/LR sentiment'),
+    notebook_stage('sentiment_multilingual', 'sentiment-analysis/multilingual-model-sentiment-analysis.ipynb',
+                   code=['sentiment-analysis/rebalance.py'],
+                   inputs=DATASET_FILES,
+                   description='Multilingual transformer sentiment'),
+
+    # Report
+    script_stage('report', 'consolidator_v2.py',
+                 inputs=['text_preprocessor.py',
+                         'instagram-scraper/scraper.py',
+                         'reddit-scraper/scraper.py',
+                         'tiktok-scraper/scraper.py',
+                         'facebook-scraper/scrape_fb.py',
+                         'instagram-scraper/cleaner.ipynb',
+                         'reddit-scraper/cleaner.ipynb',
+                         'topic-modelling/BERTopic/BERT_v2.ipynb',
+                         'topic-modelling/latent-dirichlet-allocation/Latent_Dirichlet_Allocation.ipynb',
+                         'topic-modelling/latent-semantic-analysis/latent-semantic-analysis-model.ipynb',
+                         'sentiment-analysis/sentiment-analysis.ipynb',
+                         'sentiment-analysis/aaron-sentiment.ipynb',
+                         'sentiment-analysis/tuned-sentiment-analysis.ipynb',
+                         'sentiment-analysis/multilingual-model-sentiment-analysis.ipynb'],
+                 outputs=['CONSOLIDATED_WORKFLOW.ipynb'],
+                 description='Consolidated workflow notebook'),
+]
+
+
+# ==========================
+# Fingerprinting
+# ==========================
+
+class FileHashCache:
+    """
+    Content hashes keyed by (size, mtime_ns).
+
+    Files are only re-read when their stat signature changes, which keeps a
+    no-change run down to one `os.stat` per declared file.
+    """
+
+    def __init__(self, entries: Optional[Dict[str, list]] = None):
+        self.entries = entries or {}
+        self.lock = threading.Lock()
+
+    def digest(self, rel_path: str) -> Optional[str]:
+        path = os.path.join(BASE_DIR, rel_path)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        with self.lock:
+            cached = self.entries.get(rel_path)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+
+        if path.endswith('.ipynb'):
+            sha = _notebook_code_digest(path)
+        else:
+            sha = _file_digest(path)
+
+        with self.lock:
+            self.entries[rel_path] = [st.st_size, st.st_mtime_ns, sha]
+        return sha
+
+
+def _file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _notebook_code_digest(path: str) -> str:
+    """Hash only cell types and sources so outputs and execution counts don't matter."""
+    with open(path, 'r', encoding='utf-8') as f:
+        nb = json.load(f)
+    h = hashlib.sha256()
+    for cell in nb.get('cells', []):
+        source = cell.get('source', '')
+        if isinstance(source, list):
+            source = ''.join(source)
+        h.update(cell.get('cell_type', '').encode('utf-8'))
+        h.update(source.encode('utf-8'))
+    return h.hexdigest()
+
+
+def stage_fingerprint(stage: Stage, hashes: FileHashCache) -> str:
+    """Fingerprint a stage from its command, code and input contents."""
+    h = hashlib.sha256()
+    h.update(json.dumps([stage.name, stage.command[1:], stage.cwd]).encode('utf-8'))
+    for group in (stage.code, stage.inputs):
+        for rel_path in sorted(group):
+            h.update(rel_path.encode('utf-8'))
+            h.update((hashes.digest(rel_path) or 'missing').encode('utf-8'))
+    return h.hexdigest()
+
+
+# ==========================
+# Runner
+# ==========================
+
+class Pipeline:
+    def __init__(self, stages: Sequence[Stage] = STAGES, cache_file: str = CACHE_FILE):
+        self.stages = {stage.name: stage for stage in stages}
+        self.cache_file = cache_file
+        self.producers = {}
+        for stage in stages:
+            for output in stage.outputs:
+                self.producers[output] = stage.name
+        self.deps = {
+            stage.name: sorted({self.producers[i] for i in stage.inputs if i in self.producers})
+            for stage in stages
+        }
+        self._check_acyclic()
+
+        cache = self._load_cache()
+        self.hashes = FileHashCache(cache.get('files'))
+        self.records = cache.get('stages', {})
+        self.lock = threading.Lock()
+
+    def _check_acyclic(self):
+        visiting, done = set(), set()
+
+        def visit(name, path):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle in pipeline: {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dep in self.deps[name]:
+                visit(dep, path + [name])
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name, [])
+
+    def _load_cache(self) -> dict:
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_cache(self):
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        tmp_path = self.cache_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'files': self.hashes.entries, 'stages': self.records}, f, indent=1)
+        os.replace(tmp_path, self.cache_file)
+
+    def select(self, names: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        Resolve the stages to run: the requested ones plus every non-manual
+        upstream stage they depend on. Defaults to all non-manual stages.
+        """
+        if not names:
+            requested = [n for n, s in self.stages.items() if not s.manual]
+        else:
+            unknown = [n for n in names if n not in self.stages]
+            if unknown:
+                raise ValueError(f"Unknown stages: {unknown}. Available: {list(self.stages)}")
+            requested = list(names)
+
+        selected = set()
+        pending = list(requested)
+        while pending:
+            name = pending.pop()
+            if name in selected:
+                continue
+            selected.add(name)
+            pending.extend(d for d in self.deps[name] if not self.stages[d].manual)
+        return [n for n in self.stages if n in selected]
+
+    def is_current(self, stage: Stage, fingerprint: str) -> bool:
+        """A stage is current when its fingerprint and every output are unchanged."""
+        record = self.records.get(stage.name)
+        if not record or record.get('fingerprint') != fingerprint:
+            return False
+        for output in stage.outputs:
+            if self.hashes.digest(output) != record['outputs'].get(output):
+                return False
+        return True
+
+    def run_stage(self, stage: Stage, force: bool = False, dry_run: bool = False) -> str:
+        """Run one stage if its inputs changed. Returns 'skipped', 'ran' or 'would run'."""
+        fingerprint = stage_fingerprint(stage, self.hashes)
+        if not force and self.is_current(stage, fingerprint):
+            return 'skipped'
+        if dry_run:
+            return 'would run'
+
+        os.makedirs(EXECUTED_DIR, exist_ok=True)
+        log_path = os.path.join(PIPELINE_DIR, f"{stage.name}.log")
+        with open(log_path, 'w', encoding='utf-8') as log:
+            result = subprocess.run(stage.command, cwd=os.path.join(BASE_DIR, stage.cwd),
+                                    stdout=log, stderr=subprocess.STDOUT)
+        if result.returncode != 0:
+            raise RuntimeError(f"{stage.name} failed with exit code {result.returncode} (see {log_path})")
+
+        missing = [o for o in stage.outputs if self.hashes.digest(o) is None]
+        if missing:
+            raise RuntimeError(f"{stage.name} did not produce: {missing}")
+
+        with self.lock:
+            self.records[stage.name] = {
+                'fingerprint': fingerprint,
+                'outputs': {o: self.hashes.digest(o) for o in stage.outputs},
+                'finished_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            }
+            self._save_cache()
+        return 'ran'
+
+    def run(self, names: Optional[Sequence[str]] = None, jobs: int = 4,
+            force: bool = False, dry_run: bool = False) -> Dict[str, str]:
+        """
+        Run the selected stages, executing independent branches in parallel.
+
+        Returns:
+            Dict[str, str]: Status per stage ('ran', 'skipped', 'would run',
+            'failed' or 'blocked')
+        """
+        selected = self.select(names)
+        remaining = {n: {d for d in self.deps[n] if d in selected} for n in selected}
+        status = {}
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            running = {}
+            while remaining or running:
+                for name in [n for n, deps in remaining.items() if not deps]:
+                    del remaining[name]
+                    stage_start = time.perf_counter()
+                    future = executor.submit(self.run_stage, self.stages[name], force, dry_run)
+                    running[future] = (name, stage_start)
+
+                if not running:
+                    # Everything left depends on a failed stage
+                    for name in remaining:
+                        status[name] = 'blocked'
+                        print(f"⏭️  {name}: blocked by failed upstream stage")
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name, stage_start = running.pop(future)
+                    elapsed = time.perf_counter() - stage_start
+                    try:
+                        status[name] = future.result()
+                    except Exception as e:
+                        status[name] = 'failed'
+                        print(f"❌ {name}: {e}")
+                        continue
+
+                    print(f"{'✅' if status[name] == 'ran' else '⏩'} {name}: {status[name]} ({elapsed:.2f}s)")
+                    for deps in remaining.values():
+                        deps.discard(name)
+
+                # Stages downstream of a failure can never become ready
+                failed = {n for n, s in status.items() if s == 'failed'}
+                if failed:
+                    for name, deps in list(remaining.items()):
+                        if deps & failed:
+                            del remaining[name]
+                            status[name] = 'blocked'
+                            failed.add(name)
+                            print(f"⏭️  {name}: blocked by failed upstream stage")
+
+        if not dry_run:
+            with self.lock:
+                self._save_cache()
+        print(f"\nPipeline finished in {time.perf_counter() - start:.2f}s")
+        return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the flood control analysis pipeline")
+    parser.add_argument('stages', nargs='*', help="Stages to run (default: all non-manual stages)")
+    parser.add_argument('-j', '--jobs', type=int, default=4, help="Stages to run in parallel")
+    parser.add_argument('--force', action='store_true', help="Ignore the stage cache")
+    parser.add_argument('--dry-run', action='store_true', help="Only report which stages are stale")
+    parser.add_argument('--list', action='store_true', help="List stages and their dependencies")
+    args = parser.parse_args()
+
+    pipeline = Pipeline()
+
+    if args.list:
+        for name, stage in pipeline.stages.items():
+            deps = ', '.join(pipeline.deps[name]) or '-'
+            manual = ' [manual]' if stage.manual else ''
+            print(f"{name:<24} deps: {deps:<40} {stage.description}{manual}")
+        return
+
+    status = pipeline.run(args.stages, jobs=args.jobs, force=args.force, dry_run=args.dry_run)
+    if any(s in ('failed', 'blocked') for s in status.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
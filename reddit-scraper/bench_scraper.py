@@ -0,0 +1,180 @@
+"""
+Throughput check for the Reddit scraper against a local fake Reddit.
+
+A threaded HTTP server answers PRAW's token request and submission fetches
+with generated posts, adding a fixed latency per request. The real
+scrape_posts() / CommentSink / ThrottledRequestor path then scrapes every
+post once per worker count, so the run shows:
+
+- posts/s and comments/s as workers increase,
+- the request rate the shared limiter allowed against its budget,
+- one PRAW instance (one token request) per worker thread,
+- that every comment and checkpoint line was written, and that a re-run
+  resumes without refetching.
+
+    python bench_scraper.py --posts 120 --comments 50 --workers 1 4 8 --latency-ms 80
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+
+class FakeReddit:
+    """Local stand-in for the oauth.reddit.com endpoints PRAW calls."""
+
+    def __init__(self, comments_per_post: int, latency: float):
+        self.comments_per_post = comments_per_post
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.token_requests = 0
+        self.submission_requests = 0
+        self.request_times = []
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                with fake.lock:
+                    fake.token_requests += 1
+                self.reply({'access_token': 'fake', 'token_type': 'bearer', 'expires_in': 86400, 'scope': '*'})
+
+            def do_GET(self):
+                match = re.match(r'/comments/([a-z0-9]+)', self.path)
+                if not match:
+                    self.reply({'error': 404}, status=404)
+                    return
+                with fake.lock:
+                    fake.submission_requests += 1
+                    fake.request_times.append(time.perf_counter())
+                time.sleep(fake.latency)
+                self.reply(fake.submission(match.group(1)))
+
+            def reply(self, payload, status=200):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def submission(self, post_id: str) -> list:
+        """[submission listing, comment listing] as returned by /comments/<id>."""
+        fullname = f't3_{post_id}'
+        post = {'kind': 't3', 'data': {
+            'id': post_id, 'name': fullname, 'title': f'Flood control post {post_id}',
+            'url': f'https://www.reddit.com/r/Philippines/comments/{post_id}/fake/',
+            'permalink': f'/r/Philippines/comments/{post_id}/fake/', 'subreddit': 'Philippines',
+            'num_comments': self.comments_per_post, 'created_utc': 1757000000,
+        }}
+        children = []
+        for i in range(self.comments_per_post):
+            comment_id = f'{post_id}c{i}'
+            children.append({'kind': 't1', 'data': {
+                'id': comment_id, 'name': f't1_{comment_id}', 'parent_id': fullname, 'link_id': fullname,
+                'body': f'Comment {i} tungkol sa flood control', 'author': f'user{i}',
+                'created_utc': 1757000000 + i, 'score': i % 50, 'replies': '', 'subreddit': 'Philippines',
+            }})
+        listing = lambda items: {'kind': 'Listing', 'data': {'children': items, 'after': None, 'before': None}}
+        return [listing([post]), listing(children)]
+
+    def reset(self):
+        with self.lock:
+            self.token_requests = 0
+            self.submission_requests = 0
+            self.request_times = []
+
+    def shutdown(self):
+        self.server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Reddit scraper against a local fake Reddit")
+    parser.add_argument('--posts', type=int, default=120)
+    parser.add_argument('--comments', type=int, default=50, help="Top-level comments per post")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--latency-ms', type=float, default=80, help="Simulated server latency per request")
+    parser.add_argument('--rate', type=float, default=3000,
+                        help="Requests per minute for the shared Reddit limiter (SCRAPER_RATE_REDDIT)")
+    args = parser.parse_args()
+
+    fake = FakeReddit(args.comments, args.latency_ms / 1000)
+    # The scraper reads its endpoints and credentials when imported
+    os.environ.update({
+        'REDDIT_OAUTH_URL': fake.url, 'REDDIT_URL': fake.url,
+        'REDDIT_CLIENT_ID': 'bench', 'REDDIT_CLIENT_SECRET': 'bench', 'REDDIT_USER_AGENT': 'bench_scraper',
+        'SCRAPER_RATE_REDDIT': str(args.rate),
+    })
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from scraper import CommentSink, scrape_posts
+
+    urls = [f'https://www.reddit.com/r/Philippines/comments/p{i:05d}/fake/' for i in range(args.posts)]
+    workdir = tempfile.mkdtemp(prefix='reddit_bench_')
+    expected = args.posts * args.comments
+    ok = True
+    try:
+        print(f"{'workers':>7} {'posts/s':>9} {'comments/s':>11} {'req/min':>9} {'limit':>7} {'PRAW':>5} {'rows':>8}")
+        for workers in args.workers:
+            fake.reset()
+            output = os.path.join(workdir, f'reddit_{workers}.csv')
+            checkpoint = os.path.join(workdir, f'reddit_{workers}.txt')
+            sink = CommentSink(output, checkpoint, fresh=True)
+            try:
+                # collect_submission prints a summary per post
+                with contextlib.redirect_stdout(io.StringIO()):
+                    posts, comments, elapsed = scrape_posts(urls, sink, max_workers=workers)
+            finally:
+                sink.close()
+            # Each PRAW instance authenticates once, so token requests count instances
+            instances = fake.token_requests
+            times = fake.request_times
+            achieved = (len(times) - 1) / (times[-1] - times[0]) * 60 if len(times) > 1 else 0.0
+            rows = len(pd.read_csv(output))
+            with open(checkpoint, encoding='utf-8') as f:
+                done = {line.strip() for line in f if line.strip()}
+
+            # A second pass over the same checkpoint must not fetch anything
+            fake.reset()
+            sink = CommentSink(output, checkpoint)
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    resumed, _, _ = scrape_posts(urls, sink, max_workers=workers)
+            finally:
+                sink.close()
+
+            print(f"{workers:>7} {posts / elapsed:>9.2f} {comments / elapsed:>11,.0f} {achieved:>9.0f} "
+                  f"{args.rate:>7.0f} {instances:>5} {rows:>8}")
+            if rows != expected or len(done) != args.posts or resumed or fake.submission_requests:
+                ok = False
+                print(f"  expected {expected} rows / {args.posts} checkpointed posts, got {rows} / {len(done)}; "
+                      f"resume fetched {fake.submission_requests} posts")
+    finally:
+        fake.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,26 @@
 import praw
+import prawcore
 import re
-import csv
+import sys
+import time
+import argparse
+import threading
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 load_dotenv()
 import os
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from scraper_core import iter_bounded, rate_limiter
+from comment_schema import Comment, CommentWriter
+
 REDDIT_CLIENT_ID = os.getenv('REDDIT_CLIENT_ID')
 REDDIT_CLIENT_SECRET = os.getenv('REDDIT_CLIENT_SECRET')
 REDDIT_USER_AGENT = os.getenv('REDDIT_USER_AGENT')
 
-
-print(REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT)
+# Optional endpoint overrides, e.g. to point the scraper at a local fake Reddit server
+REDDIT_OAUTH_URL = os.getenv('REDDIT_OAUTH_URL')
+REDDIT_URL = os.getenv('REDDIT_URL')
 
 # List of Reddit post URLs or IDs to scrape
 post_urls = [
@@ -28,44 +38,153 @@ def extract_post_id(url):
 	# If it's just the ID
 	return url.strip()
 
-def save_to_csv(data, filename='reddit_comments.csv'):
-    """Save the scraped data to a CSV file."""
-    keys = data[0].keys() if data else ['url', 'user', 'comment']
-    with open(filename, 'w', newline='', encoding='utf-8') as output_file:
-        dict_writer = csv.DictWriter(output_file, fieldnames=keys)
-        dict_writer.writeheader()
-        dict_writer.writerows(data)
-    print(f"Data saved to {filename}")
+
+class ThrottledRequestor(prawcore.Requestor):
+	"""prawcore requestor that takes a token from the shared Reddit limiter before every HTTP call."""
+
+	def request(self, *args, **kwargs):
+		rate_limiter('reddit').acquire()
+		return super().request(*args, **kwargs)
+
+
+_local = threading.local()
+
+def get_reddit():
+	"""One PRAW instance per worker thread (PRAW objects are not thread-safe)."""
+	if not hasattr(_local, 'reddit'):
+		config = {}
+		if REDDIT_OAUTH_URL:
+			config['oauth_url'] = REDDIT_OAUTH_URL
+		if REDDIT_URL:
+			config['reddit_url'] = REDDIT_URL
+		_local.reddit = praw.Reddit(
+			client_id=REDDIT_CLIENT_ID,
+			client_secret=REDDIT_CLIENT_SECRET,
+			user_agent=REDDIT_USER_AGENT,
+			requestor_class=ThrottledRequestor,
+			**config
+		)
+	return _local.reddit
+
+
+def collect_submission(reddit, url):
+	"""Fetch the top-level comments of one submission as Comment records."""
+	post_id = extract_post_id(url)
+	submission = reddit.submission(id=post_id)
+	submission.comments.replace_more(limit=None)
+
+	rows = []
+	for comment in submission.comments:
+		if not isinstance(comment, praw.models.Comment):
+			continue
+		if comment.parent_id != submission.fullname: #Ensures we only get top-level comments
+			continue
+		rows.append(Comment(
+			platform='reddit',
+			post_url=submission.url,
+			comment_id=comment.id,
+			parent_id=comment.parent_id,
+			username=str(comment.author),
+			text=comment.body,
+			created_at=datetime.fromtimestamp(comment.created_utc, timezone.utc).isoformat(),
+			like_count=comment.score
+		))
+	print(f"\nPost: {submission.title}\nURL: {submission.url}\nCollected {len(rows)} comments")
+	return post_id, rows
+
+
+class CommentSink:
+	"""
+	Appends rows to the output CSV as each post finishes and records the post
+	id in a checkpoint file, so an interrupted run resumes where it stopped.
+	"""
+
+	def __init__(self, filename='reddit_comments.csv', checkpoint='reddit_checkpoint.txt', fresh=False):
+		self.filename = filename
+		self.checkpoint = checkpoint
+		self.lock = threading.Lock()
+
+		if fresh and os.path.exists(checkpoint):
+			os.remove(checkpoint)
+
+		self.completed = set()
+		if os.path.exists(checkpoint):
+			with open(checkpoint, 'r', encoding='utf-8') as f:
+				self.completed = {line.strip() for line in f if line.strip()}
+
+		self.rows = CommentWriter(filename, fresh=fresh)
+
+	def write(self, post_id, rows):
+		with self.lock:
+			self.rows.extend(rows)
+			self.rows.flush()
+			# Only mark the post done once its rows are on disk
+			with open(self.checkpoint, 'a', encoding='utf-8') as f:
+				f.write(post_id + '\n')
+			self.completed.add(post_id)
+
+	def close(self):
+		self.rows.close()
+
+
+def _collect_with(reddit_factory, url):
+	return collect_submission(reddit_factory(), url)
+
+
+def scrape_posts(urls, sink, max_workers=4, reddit_factory=get_reddit):
+	"""
+	Collect comments for every URL not yet in the checkpoint, several
+	submissions at a time.
+
+	Returns:
+		tuple: (posts scraped, comments written, elapsed seconds)
+	"""
+	pending = [url for url in urls if extract_post_id(url) not in sink.completed]
+	skipped = len(urls) - len(pending)
+	if skipped:
+		print(f"Resuming: skipping {skipped} already scraped posts")
+
+	start = time.perf_counter()
+	posts = comments = 0
+	for url, result, error in iter_bounded(lambda url: _collect_with(reddit_factory, url), pending, max_workers):
+		if error:
+			print(f"Error scraping {url}: {error}")
+			continue
+		post_id, rows = result
+		sink.write(post_id, rows)
+		posts += 1
+		comments += len(rows)
+	return posts, comments, time.perf_counter() - start
+
 
 def main():
-	reddit = praw.Reddit(
-		client_id=REDDIT_CLIENT_ID,
-		client_secret=REDDIT_CLIENT_SECRET,
-		user_agent=REDDIT_USER_AGENT
-	)
-	
-	data = []
-
-	for url in post_urls:
-		post_id = extract_post_id(url)
-		submission = reddit.submission(id=post_id)
-		print(f"\nPost: {submission.title}\nURL: {submission.url}")
-		submission.comments.replace_more(limit=None)
-		for comment in submission.comments:
-			if not isinstance(comment, praw.models.Comment):
-				continue
-			if comment.parent_id != submission.fullname: #Ensures we only get top-level comments
-				continue
-			print(f"- {comment.author}: {comment.body[:200].replace('\n', ' ')}\n")
-			data.append({
-				'url': submission.url,
-				'user': str(comment.author),
-				'comment': comment.body,
-				'id': comment.id,
-				'parent_id': comment.parent_id
-            })
-		save_to_csv(data)
-			
+	parser = argparse.ArgumentParser(description="Scrape top-level Reddit comments")
+	parser.add_argument('--urls-file', help="File with one post URL or id per line (defaults to post_urls)")
+	parser.add_argument('--output', default='reddit_comments.csv')
+	parser.add_argument('--checkpoint', default='reddit_checkpoint.txt')
+	parser.add_argument('--workers', type=int, default=4, help="Submissions fetched concurrently")
+	parser.add_argument('--fresh', action='store_true', help="Ignore the checkpoint and start over")
+	args = parser.parse_args()
+
+	urls = post_urls
+	if args.urls_file:
+		with open(args.urls_file, 'r', encoding='utf-8') as f:
+			urls = [line.strip() for line in f if line.strip()]
+
+	sink = CommentSink(args.output, args.checkpoint, fresh=args.fresh)
+	try:
+		posts, comments, elapsed = scrape_posts(urls, sink, max_workers=args.workers)
+	finally:
+		sink.close()
+
+	rate = posts / elapsed if elapsed else 0.0
+	print(f"\nData saved to {args.output}")
+	print(f"Scraped {posts} posts / {comments} comments in {elapsed:.1f}s ({rate:.2f} posts/s, {comments / elapsed if elapsed else 0.0:.1f} comments/s)")
+	failed = [url for url in urls if extract_post_id(url) not in sink.completed]
+	if failed:
+		print(f"{len(failed)} posts failed; re-run to resume them")
+		sys.exit(1)
+
 
 if __name__ == "__main__":
 	main()
@@ -0,0 +1,232 @@
+import os
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from timestamps import normalize_timestamps
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ROLLUP_FILE = os.path.join(BASE_DIR, 'rollups.parquet')
+
+# Bucket widths kept for every dimension
+GRANULARITIES = {'day': 'D', 'hour': 'h'}
+
+# Rollup dimension -> column of the labelled comment file it is counted from
+DEFAULT_DIMENSIONS = {'sentiment': 'sentiment', 'topic': 'topic'}
+
+KEY_COLUMNS = ['granularity', 'bucket', 'source', 'dimension', 'label']
+
+# Columns identifying a comment when deciding whether it was already counted
+ROW_KEY_COLUMNS = ['source', 'original_id', 'comment']
+
+# Per (comment, dimension) record of what has been counted, so a comment is
+# counted once per dimension and a new label replaces the old one
+COUNTED_COLUMNS = ['timestamp', 'source', 'label']
+
+
+def _utc(bucket) -> pd.Timestamp:
+    bucket = pd.Timestamp(bucket)
+    return bucket.tz_localize('UTC') if bucket.tzinfo is None else bucket.tz_convert('UTC')
+
+
+class RollupStore:
+    """
+    Pre-aggregated comment counts per (granularity, time bucket, source,
+    dimension, label), e.g. ('day', 2025-09-15, 'Reddit', 'sentiment', 'negative').
+
+    update() folds in new labelled rows and skips labels counted before, so
+    re-running it over a growing file is safe. A comment whose label changed
+    (e.g. re-scored by a newer model) moves from its old label to the new
+    one instead of being counted twice. Point lookups are dict hits
+    and share() works on the rollup table alone, so neither depends on how
+    many comments have been counted.
+    """
+
+    def __init__(self, path: str = DEFAULT_ROLLUP_FILE):
+        self.path = path
+        self.counted_path = f"{os.path.splitext(path)[0]}.counted.parquet"
+        if os.path.exists(path):
+            self.table = pd.read_parquet(path)
+        else:
+            self.table = pd.DataFrame({'granularity': pd.Series(dtype=str),
+                                       'bucket': pd.Series(dtype='datetime64[us, UTC]'),
+                                       'source': pd.Series(dtype=str),
+                                       'dimension': pd.Series(dtype=str),
+                                       'label': pd.Series(dtype=str),
+                                       'count': pd.Series(dtype='int64')})
+        if os.path.exists(self.counted_path):
+            self.counted = pd.read_parquet(self.counted_path)
+        else:
+            self.counted = pd.DataFrame({'timestamp': pd.Series(dtype='datetime64[us, UTC]'),
+                                         'source': pd.Series(dtype=str),
+                                         'label': pd.Series(dtype=str)},
+                                        index=pd.Index([], dtype='uint64', name='key'))
+        self._counts = None
+        self._totals = None
+
+    def _row_keys(self, df: pd.DataFrame, dimension: str) -> np.ndarray:
+        """One key per (comment, dimension), independent of the label and of other columns."""
+        keys = df[[c for c in ROW_KEY_COLUMNS if c in df.columns]].astype(str)
+        return pd.util.hash_pandas_object(keys.assign(dimension=dimension), index=False).to_numpy()
+
+    @staticmethod
+    def _tally(rows: pd.DataFrame, sign: int) -> list:
+        """Rollup rows (KEY_COLUMNS + count) for dated (timestamp, source, label, dimension) rows."""
+        rows = rows[rows['timestamp'].notna()]
+        frames = []
+        for granularity, freq in GRANULARITIES.items():
+            counts = (pd.DataFrame({'bucket': rows['timestamp'].dt.floor(freq), 'source': rows['source'],
+                                    'dimension': rows['dimension'], 'label': rows['label']})
+                      .groupby(['bucket', 'source', 'dimension', 'label'], observed=True).size()
+                      .rename('count').reset_index())
+            counts['granularity'] = granularity
+            counts['count'] *= sign
+            frames.append(counts[KEY_COLUMNS + ['count']])
+        return frames
+
+    def update(self, df: pd.DataFrame, dimensions: Optional[Dict[str, str]] = None) -> int:
+        """
+        Count new labelled comments into the rollups.
+
+        Args:
+            df (pd.DataFrame): Comments with a `source` column, a timestamp
+                (ISO `created_at`, or whatever normalize_timestamps accepts)
+                and one column per dimension
+            dimensions (dict): Dimension name -> label column; dimensions
+                whose column is missing are skipped
+
+        Returns:
+            int: Dated rows with at least one new or changed label
+        """
+        requested = dimensions or DEFAULT_DIMENSIONS
+        dimensions = {name: column for name, column in requested.items() if column in df.columns}
+        if not dimensions:
+            raise ValueError(f"None of the label columns {sorted(requested.values())} are present")
+
+        timestamps = normalize_timestamps(df).to_numpy()
+        sources = df['source'].astype(str).to_numpy()
+        changed_rows = np.zeros(len(df), dtype=bool)
+        added, removed = [], []
+        for dimension, column in dimensions.items():
+            rows = pd.DataFrame({'key': self._row_keys(df, dimension), 'timestamp': timestamps,
+                                 'source': sources, 'label': df[column].astype(str).to_numpy()})
+            previous = self.counted['label'].reindex(rows['key']).to_numpy()
+            # New comments (no previous label) and relabelled ones; the last
+            # occurrence wins when a comment repeats within df
+            changed = (previous != rows['label'].to_numpy()) & ~rows.duplicated('key', keep='last').to_numpy()
+            changed_rows |= changed
+            rows = rows[changed].set_index('key')
+            old = self.counted[self.counted.index.isin(rows.index)]
+            added.append(rows.assign(dimension=dimension))
+            removed.append(old.assign(dimension=dimension))
+            self.counted = pd.concat([self.counted[~self.counted.index.isin(rows.index)], rows[COUNTED_COLUMNS]])
+
+        undated = changed_rows & pd.isna(timestamps)
+        if undated.any():
+            print(f"Skipping {int(undated.sum())} comments without a usable timestamp")
+
+        frames = [self.table]
+        for rows in added:
+            frames += self._tally(rows, 1)
+        for rows in removed:
+            frames += self._tally(rows, -1)
+        table = (pd.concat(frames, ignore_index=True)
+                 .groupby(KEY_COLUMNS, observed=True, sort=True)['count'].sum().reset_index())
+        # Undated rows are remembered too, so a relabel never subtracts what was not counted
+        self.table = table[table['count'] != 0].reset_index(drop=True)
+        self._counts = self._totals = None
+        return int((changed_rows & ~pd.isna(timestamps)).sum())
+
+    def save(self) -> None:
+        """Write the rollups (dictionary-encoded Parquet) and the counted labels per comment."""
+        table = self.table.copy()
+        for column in ('granularity', 'source', 'dimension', 'label'):
+            table[column] = table[column].astype('category')
+        tmp = f"{self.path}.tmp"
+        table.to_parquet(tmp, index=False)
+        os.replace(tmp, self.path)
+        self.counted.to_parquet(f"{self.counted_path}.tmp")
+        os.replace(f"{self.counted_path}.tmp", self.counted_path)
+
+    def _build_lookups(self) -> None:
+        keys = zip(*(self.table[c] for c in KEY_COLUMNS))
+        self._counts = dict(zip(keys, self.table['count']))
+        totals = self.table.groupby(KEY_COLUMNS[:-1], observed=True)['count'].sum()
+        self._totals = totals.to_dict()
+
+    def count(self, granularity: str, bucket, source: str, dimension: str, label: str) -> int:
+        """Comments with `label` in one bucket for one source."""
+        if self._counts is None:
+            self._build_lookups()
+        return int(self._counts.get((granularity, _utc(bucket), source, dimension, str(label)), 0))
+
+    def total(self, granularity: str, bucket, source: str, dimension: str) -> int:
+        """Labelled comments in one bucket for one source."""
+        if self._totals is None:
+            self._build_lookups()
+        return int(self._totals.get((granularity, _utc(bucket), source, dimension), 0))
+
+    def counts(self, dimension: str, granularity: str = 'day',
+               sources: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Counts as a (bucket, source) x label table."""
+        table = self.table[(self.table['granularity'] == granularity) & (self.table['dimension'] == dimension)]
+        if sources is not None:
+            table = table[table['source'].isin(list(sources))]
+        return table.pivot_table(index=['bucket', 'source'], columns='label', values='count',
+                                 aggfunc='sum', fill_value=0, observed=True)
+
+    def share(self, dimension: str, label: str, granularity: str = 'day',
+              sources: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Share of comments carrying `label`, as a bucket x source table, e.g.
+        share('sentiment', 'negative') for the negative share per platform per day.
+        """
+        counts = self.counts(dimension, granularity, sources)
+        if counts.empty:
+            return pd.DataFrame()
+        labelled = counts[str(label)] if str(label) in counts.columns else 0
+        return (labelled / counts.sum(axis=1)).unstack('source')
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Daily/hourly rollups of sentiment and topic labels")
+    parser.add_argument('--store', default=DEFAULT_ROLLUP_FILE, help="Rollup file")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    update = commands.add_parser('update', help="Count new labelled comments")
+    update.add_argument('inputs', nargs='+', help="CSV or Parquet files with source, created_at/original_id and label columns")
+    update.add_argument('--sentiment-column', default='sentiment')
+    update.add_argument('--topic-column', default='topic')
+
+    share = commands.add_parser('share', help="Share of a label per source per bucket")
+    share.add_argument('dimension', choices=sorted(DEFAULT_DIMENSIONS))
+    share.add_argument('label')
+    share.add_argument('--granularity', choices=sorted(GRANULARITIES), default='day')
+    share.add_argument('--source', nargs='+')
+    args = parser.parse_args()
+
+    store = RollupStore(args.store)
+    if args.command == 'update':
+        dimensions = {'sentiment': args.sentiment_column, 'topic': args.topic_column}
+        for path in args.inputs:
+            if path.endswith('.parquet'):
+                # e.g. topic assignments from topic-modelling/BERTopic/assign_topics.py
+                df = pd.read_parquet(path)
+            else:
+                df = pd.read_csv(path, dtype=str, keep_default_na=False)
+            print(f"{path}: {store.update(df, dimensions)} comments counted")
+        store.save()
+        print(f"Saved {len(store.table)} rollup rows to {args.store}")
+    else:
+        result = store.share(args.dimension, args.label, args.granularity, args.source)
+        if result.empty:
+            print("No rollups for that dimension and granularity")
+        else:
+            print(result.to_string(float_format=lambda v: f"{v:.1%}"))
+
+
+if __name__ == '__main__':
+    main()
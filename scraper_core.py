@@ -0,0 +1,342 @@
+import asyncio
+import csv
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import (Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator,
+                    List, Optional, Sequence, Tuple, Type)
+
+# Sustained request budget per platform, in requests per minute.
+# Reddit's is the documented OAuth limit; the others are conservative
+# figures that have held up without triggering blocks. Each can be
+# overridden with SCRAPER_RATE_<PLATFORM>, e.g. SCRAPER_RATE_TIKTOK=60.
+PLATFORM_LIMITS = {
+    'reddit': 100,
+    'instagram': 20,
+    'tiktok': 30,
+    'facebook': 30,
+}
+
+
+class TokenBucket:
+    """
+    Thread- and asyncio-safe token bucket.
+
+    Callers reserve a token up front and then wait out their own slot, so
+    concurrent callers queue in order and, under load, requests go out at
+    exactly `rate` per second with no idle gaps.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            rate (float): Tokens added per second
+            capacity (float): Burst size; 1 means strictly evenly spaced requests
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: float, capacity: float = 1.0) -> 'TokenBucket':
+        return cls(requests_per_minute / 60.0, capacity)
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take `tokens` now and return how many seconds the caller must wait."""
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+            return max(0.0, -self.tokens / self.rate)
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block the calling thread until a token is available."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: float = 1.0) -> None:
+        """Asyncio counterpart of acquire()."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def platform_rate(platform: str) -> float:
+    """Requests per minute for a platform, honouring SCRAPER_RATE_<PLATFORM>."""
+    override = os.getenv(f'SCRAPER_RATE_{platform.upper()}')
+    if override:
+        return float(override)
+    if platform not in PLATFORM_LIMITS:
+        raise ValueError(f"Unknown platform: {platform}. Available: {sorted(PLATFORM_LIMITS)}")
+    return float(PLATFORM_LIMITS[platform])
+
+
+def rate_limiter(platform: str) -> TokenBucket:
+    """
+    The process-wide limiter for a platform.
+
+    Every worker thread or task of a scraper shares this one bucket, so the
+    platform budget holds no matter how many run concurrently.
+    """
+    with _limiters_lock:
+        if platform not in _limiters:
+            _limiters[platform] = TokenBucket.per_minute(platform_rate(platform))
+        return _limiters[platform]
+
+
+def backoff_delays(base: float = 1.0, factor: float = 2.0, max_delay: float = 60.0,
+                   jitter: bool = True, rng: Callable[[], float] = random.random) -> Iterator[float]:
+    """
+    Exponential backoff schedule with "equal jitter".
+
+    Each delay is drawn from [d/2, d] where d = min(max_delay, base * factor**n),
+    so retries from parallel workers spread out but never collapse to zero.
+    """
+    attempt = 0
+    while True:
+        delay = min(max_delay, base * factor ** attempt)
+        yield delay / 2 + rng() * delay / 2 if jitter else delay
+        attempt += 1
+
+
+def retry(fn: Callable[[], Any], retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+          retries: int = 5, base: float = 1.0, max_delay: float = 60.0,
+          sleep: Callable[[float], None] = time.sleep) -> Any:
+    """
+    Call `fn`, retrying with jittered exponential backoff on `retry_on`.
+
+    Args:
+        fn: Zero-argument callable
+        retry_on: Exception types worth retrying
+        retries (int): Retries after the first attempt
+        base (float): First backoff delay in seconds
+        max_delay (float): Upper bound for a single delay
+        sleep: Sleep function (injectable for tests)
+
+    Returns:
+        Whatever `fn` returns; the last exception is re-raised when retries run out
+    """
+    delays = backoff_delays(base, max_delay=max_delay)
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except retry_on as e:
+            if attempt == retries:
+                raise
+            delay = next(delays)
+            print(f"{type(e).__name__}: retrying in {delay:.1f}s ({attempt + 1}/{retries})")
+            sleep(delay)
+
+
+async def retry_async(fn: Callable[[], Awaitable[Any]],
+                      retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+                      retries: int = 5, base: float = 1.0, max_delay: float = 60.0) -> Any:
+    """Asyncio counterpart of retry(); `fn` returns a fresh awaitable per attempt."""
+    delays = backoff_delays(base, max_delay=max_delay)
+    for attempt in range(retries + 1):
+        try:
+            return await fn()
+        except retry_on as e:
+            if attempt == retries:
+                raise
+            delay = next(delays)
+            print(f"{type(e).__name__}: retrying in {delay:.1f}s ({attempt + 1}/{retries})")
+            await asyncio.sleep(delay)
+
+
+_DONE = object()
+
+
+async def bounded_map(worker: Callable[[Any], Awaitable[Any]], items: Iterable[Any],
+                      concurrency: int = 4,
+                      limiter: Optional[TokenBucket] = None) -> AsyncIterator[Tuple[Any, Any, Optional[BaseException]]]:
+    """
+    Run `worker(item)` over `items` with at most `concurrency` in flight.
+
+    A fixed set of worker tasks pull from the shared iterator, so memory does
+    not grow with the number of items. When a limiter is given, a token is
+    taken before each item starts.
+
+    Yields:
+        tuple: (item, result, error) in completion order; error is None on success
+    """
+    iterator = iter(items)
+    results: asyncio.Queue = asyncio.Queue()
+
+    async def consume():
+        try:
+            for item in iterator:
+                if limiter is not None:
+                    await limiter.acquire_async()
+                try:
+                    outcome = (item, await worker(item), None)
+                except Exception as e:
+                    outcome = (item, None, e)
+                await results.put(outcome)
+        finally:
+            await results.put(_DONE)
+
+    tasks = [asyncio.create_task(consume()) for _ in range(max(1, concurrency))]
+    finished = 0
+    try:
+        while finished < len(tasks):
+            outcome = await results.get()
+            if outcome is _DONE:
+                finished += 1
+                continue
+            yield outcome
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def iter_bounded(worker: Callable[[Any], Any], items: Iterable[Any], concurrency: int = 4,
+                 limiter: Optional[TokenBucket] = None) -> Iterator[Tuple[Any, Any, Optional[BaseException]]]:
+    """
+    Thread-based counterpart of bounded_map() for blocking clients
+    (PRAW, instagrapi, Selenium).
+
+    Only `concurrency` items are submitted at a time.
+
+    Yields:
+        tuple: (item, result, error) in completion order
+    """
+    def call(item):
+        if limiter is not None:
+            limiter.acquire()
+        return worker(item)
+
+    iterator = iter(items)
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        pending = {}
+        for item in iterator:
+            pending[executor.submit(call, item)] = item
+            if len(pending) >= concurrency:
+                break
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                error = future.exception()
+                yield item, (None if error else future.result()), error
+                for next_item in iterator:
+                    pending[executor.submit(call, next_item)] = next_item
+                    break
+
+
+class RowSink:
+    """
+    Streaming CSV writer shared by the scrapers.
+
+    Rows are appended as soon as they are written, the header is only added
+    to a new or empty file, and writes from several threads are serialized.
+    """
+
+    def __init__(self, path: str, fieldnames: Sequence[str], fresh: bool = False):
+        self.path = path
+        self.fieldnames = list(fieldnames)
+        self.lock = threading.Lock()
+        self.rows_written = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if fresh and os.path.exists(path):
+            os.remove(path)
+
+        write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, 'a', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames, extrasaction='ignore')
+        if write_header:
+            self.writer.writeheader()
+            self.file.flush()
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        with self.lock:
+            self.writer.writerows(rows)
+            self.file.flush()
+            self.rows_written += len(rows)
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> 'RowSink':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _serve_fake_endpoint():
+    """Start a local HTTP server that answers every GET with a small JSON body."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = b'{"comments": []}'
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    """
+    Check that a limiter sustains its configured rate against a local fake
+    endpoint, with more concurrency than the budget needs.
+    """
+    import argparse
+    import urllib.request
+
+    parser = argparse.ArgumentParser(description="Measure sustained throughput of the shared rate limiter")
+    parser.add_argument('--rate', type=float, default=600, help="Requests per minute to allow")
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    server = _serve_fake_endpoint()
+    url = f'http://127.0.0.1:{server.server_address[1]}/comments'
+    limiter = TokenBucket.per_minute(args.rate)
+
+    async def fetch(_):
+        return await asyncio.to_thread(lambda: urllib.request.urlopen(url).read())
+
+    async def run():
+        start = time.perf_counter()
+        errors = 0
+        async for _, _, error in bounded_map(fetch, range(args.requests), args.concurrency, limiter):
+            errors += error is not None
+        return time.perf_counter() - start, errors
+
+    elapsed, errors = asyncio.run(run())
+    server.shutdown()
+
+    # The first request goes out immediately, so n requests span n - 1 intervals
+    achieved = (args.requests - 1) / elapsed * 60 if elapsed else 0.0
+    print(f"{args.requests} requests in {elapsed:.2f}s: {achieved:.0f}/min against a limit of {args.rate:.0f}/min "
+          f"({achieved / args.rate:.1%}), {errors} errors")
+
+
+if __name__ == '__main__':
+    main()
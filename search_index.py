@@ -0,0 +1,400 @@
+import json
+import mmap
+import os
+import shutil
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from comment_schema import is_unified, read_comments
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_INDEX_DIR = os.path.join(BASE_DIR, 'comment_index')
+DEFAULT_INPUTS = [os.path.join(BASE_DIR, 'preprocessed_comments.csv')]
+
+MANIFEST = 'manifest.json'
+
+# BM25 parameters (Robertson & Zaragoza's usual defaults)
+K1 = 1.2
+B = 0.75
+
+# Score matches in a dense per-document array once they reach 1/DENSE_RATIO
+# of a segment; below that, sorting the matched ids is cheaper
+DENSE_RATIO = 64
+
+# Gap widths a postings list may be stored at; the narrowest that fits is used
+GAP_DTYPES = {1: np.dtype('<u1'), 2: np.dtype('<u2'), 4: np.dtype('<u4')}
+
+
+@dataclass(slots=True)
+class Hit:
+    """One search result."""
+    score: float
+    source: str
+    original_id: str
+    comment: str
+
+
+def load_documents(path: str, get_preprocessor=None) -> pd.DataFrame:
+    """
+    Read a CSV to index as (source, original_id, comment, tokens) rows.
+
+    preprocessed_comments.csv already holds TextPreprocessor output in
+    `cleaned_comment`; unified scraper files are cleaned here.
+
+    Args:
+        path (str): preprocessed_comments.csv or a unified comment CSV
+        get_preprocessor: Returns the TextPreprocessor for unified files;
+            only called when one is needed
+
+    Returns:
+        pd.DataFrame: One row per document
+    """
+    header = pd.read_csv(path, nrows=0)
+    if 'cleaned_comment' in header.columns:
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+        return pd.DataFrame({'source': df['source'], 'original_id': df['original_id'],
+                             'comment': df['comment'], 'tokens': df['cleaned_comment']})
+    if is_unified(header):
+        df = read_comments(path)
+        preprocessor = get_preprocessor() if get_preprocessor else _default_preprocessor()
+        return pd.DataFrame({'source': df['platform'], 'original_id': df['comment_id'],
+                             'comment': df['text'],
+                             'tokens': [preprocessor.clean_text(text) for text in df['text']]})
+    raise ValueError(f"{path} is neither preprocessed_comments.csv nor a unified comment file")
+
+
+def _default_preprocessor():
+    from text_preprocessor import TextPreprocessor
+    return TextPreprocessor()
+
+
+def document_hashes(docs: pd.DataFrame) -> np.ndarray:
+    """64-bit content hash per document, used to skip rows already indexed."""
+    return pd.util.hash_pandas_object(docs[['source', 'original_id', 'comment']], index=False).to_numpy()
+
+
+def _write_json(path: str, data) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def write_segment(seg_dir: str, docs: pd.DataFrame, source_codes: Dict[str, int]) -> int:
+    """
+    Write one immutable segment.
+
+    Files:
+        terms.json    term -> [byte offset, document frequency, gap width]
+        postings.bin  per term: doc-id gaps at 1/2/4 bytes, then uint8 term frequencies
+        lengths.npy   tokens per document
+        sources.npy   source code per document
+        store.bin / store_offsets.npy  JSON-encoded [source, original_id, comment] per document
+        hashes.npy    content hashes (see document_hashes)
+
+    Returns:
+        int: Total tokens in the segment
+    """
+    os.makedirs(seg_dir)
+    postings = defaultdict(list)
+    lengths = np.zeros(len(docs), dtype=np.uint32)
+    for doc_id, tokens in enumerate(docs['tokens']):
+        counts = Counter(tokens.split())
+        lengths[doc_id] = sum(counts.values())
+        for term, tf in counts.items():
+            postings[term].append((doc_id, tf))
+
+    terms = {}
+    with open(os.path.join(seg_dir, 'postings.bin'), 'wb') as f:
+        offset = 0
+        for term in sorted(postings):
+            pairs = np.array(postings[term], dtype=np.uint32)
+            gaps = np.diff(pairs[:, 0], prepend=0)
+            width = next(w for w, dtype in GAP_DTYPES.items() if gaps.max() <= np.iinfo(dtype).max)
+            data = gaps.astype(GAP_DTYPES[width]).tobytes() + np.minimum(pairs[:, 1], 255).astype(np.uint8).tobytes()
+            f.write(data)
+            terms[term] = [offset, len(pairs), width]
+            offset += len(data)
+
+    offsets = np.zeros(len(docs) + 1, dtype=np.uint64)
+    with open(os.path.join(seg_dir, 'store.bin'), 'wb') as f:
+        for i, row in enumerate(zip(docs['source'], docs['original_id'], docs['comment'])):
+            data = json.dumps(row, ensure_ascii=False).encode('utf-8')
+            f.write(data)
+            offsets[i + 1] = offsets[i] + len(data)
+
+    np.save(os.path.join(seg_dir, 'store_offsets.npy'), offsets)
+    np.save(os.path.join(seg_dir, 'lengths.npy'), lengths)
+    np.save(os.path.join(seg_dir, 'sources.npy'),
+            docs['source'].map(source_codes).to_numpy(dtype=np.uint8))
+    np.save(os.path.join(seg_dir, 'hashes.npy'), document_hashes(docs))
+    _write_json(os.path.join(seg_dir, 'terms.json'), terms)
+    return int(lengths.sum())
+
+
+class Segment:
+    """Read side of one segment: postings and stored fields are memory-mapped."""
+
+    def __init__(self, seg_dir: str):
+        with open(os.path.join(seg_dir, 'terms.json'), 'r', encoding='utf-8') as f:
+            self.terms = json.load(f)
+        self.lengths = np.load(os.path.join(seg_dir, 'lengths.npy'), mmap_mode='r')
+        self.sources = np.load(os.path.join(seg_dir, 'sources.npy'), mmap_mode='r')
+        self.store_offsets = np.load(os.path.join(seg_dir, 'store_offsets.npy'), mmap_mode='r')
+        self.postings = self._mmap(os.path.join(seg_dir, 'postings.bin'))
+        self.store = self._mmap(os.path.join(seg_dir, 'store.bin'))
+        self._norms = None
+
+    @staticmethod
+    def _mmap(path: str):
+        if os.path.getsize(path) == 0:
+            return b''
+        with open(path, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def length_norms(self, avgdl: float) -> np.ndarray:
+        """BM25 length normalisation K1 * (1 - B + B * dl / avgdl) per document, cached per avgdl."""
+        if self._norms is None or self._norms[0] != avgdl:
+            norms = K1 * (1 - B + B * np.asarray(self.lengths, dtype=np.float32) / np.float32(avgdl))
+            self._norms = (avgdl, norms.astype(np.float32))
+        return self._norms[1]
+
+    def df(self, term: str) -> int:
+        entry = self.terms.get(term)
+        return entry[1] if entry else 0
+
+    def postings_for(self, term: str):
+        """(doc ids, term frequencies) of a term, or None when it is absent."""
+        entry = self.terms.get(term)
+        if entry is None:
+            return None
+        offset, n, width = entry
+        gaps = np.frombuffer(self.postings, dtype=GAP_DTYPES[width], count=n, offset=offset)
+        tfs = np.frombuffer(self.postings, dtype=np.uint8, count=n, offset=offset + n * width)
+        return np.cumsum(gaps, dtype=np.int64), tfs.astype(np.float32)
+
+    def document(self, doc_id: int) -> List[str]:
+        start, stop = int(self.store_offsets[doc_id]), int(self.store_offsets[doc_id + 1])
+        return json.loads(self.store[start:stop].decode('utf-8'))
+
+
+class SearchIndex:
+    """
+    BM25 keyword index over cleaned comments, made of append-only segments.
+
+    Each build() call indexes only documents whose content hash is not in
+    the index yet and writes them as a new segment; existing segments are
+    never rewritten. Queries score every segment with global BM25
+    statistics and merge the per-segment top hits.
+    """
+
+    def __init__(self, index_dir: str = DEFAULT_INDEX_DIR):
+        self.index_dir = index_dir
+        manifest_path = os.path.join(index_dir, MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {'segments': [], 'sources': [], 'total_docs': 0, 'total_tokens': 0}
+        self._segments = None
+        self._preprocessor = None
+
+    @property
+    def segments(self) -> List[Segment]:
+        if self._segments is None:
+            self._segments = [Segment(os.path.join(self.index_dir, name)) for name in self.manifest['segments']]
+        return self._segments
+
+    def _known_hashes(self) -> np.ndarray:
+        hashes = [np.load(os.path.join(self.index_dir, name, 'hashes.npy'))
+                  for name in self.manifest['segments']]
+        return np.concatenate(hashes) if hashes else np.zeros(0, dtype=np.uint64)
+
+    def add(self, docs: pd.DataFrame) -> int:
+        """
+        Index the documents not seen before as one new segment.
+
+        Returns:
+            int: Documents added
+        """
+        docs = docs.drop_duplicates(['source', 'original_id', 'comment'])
+        docs = docs[~np.isin(document_hashes(docs), self._known_hashes())]
+        docs = docs[docs['tokens'].str.len() > 0].reset_index(drop=True)
+        if docs.empty:
+            return 0
+
+        sources = self.manifest['sources']
+        for source in docs['source'].unique():
+            if source not in sources:
+                sources.append(source)
+        if len(sources) > 255:
+            raise ValueError("An index holds at most 255 distinct sources")
+
+        name = f"seg_{len(self.manifest['segments']):05d}"
+        total_tokens = write_segment(os.path.join(self.index_dir, name), docs,
+                                     {source: code for code, source in enumerate(sources)})
+
+        self.manifest['segments'].append(name)
+        self.manifest['total_docs'] += len(docs)
+        self.manifest['total_tokens'] += total_tokens
+        _write_json(os.path.join(self.index_dir, MANIFEST), self.manifest)
+        self._segments = None
+        return len(docs)
+
+    def build(self, paths: Iterable[str]) -> int:
+        """Index every file in `paths`, skipping documents already in the index."""
+        os.makedirs(self.index_dir, exist_ok=True)
+        frames = []
+        for path in paths:
+            docs = load_documents(path, self.preprocessor)
+            frames.append(docs)
+            print(f"Loaded {len(docs)} documents from {path}")
+        if not frames:
+            return 0
+        return self.add(pd.concat(frames, ignore_index=True))
+
+    def preprocessor(self):
+        """Shared TextPreprocessor, created on first use."""
+        if self._preprocessor is None:
+            self._preprocessor = _default_preprocessor()
+        return self._preprocessor
+
+    def query_terms(self, query: str) -> List[str]:
+        """Tokens of a query, cleaned the same way as the indexed comments."""
+        return list(dict.fromkeys(self.preprocessor().clean_text(query).split()))
+
+    def search(self, query: str, k: int = 10, sources: Optional[Sequence[str]] = None) -> List[Hit]:
+        """
+        BM25-ranked search.
+
+        Args:
+            query (str): Free text; cleaned with TextPreprocessor.clean_text
+            k (int): Number of hits to return
+            sources (list, optional): Only return documents from these sources
+
+        Returns:
+            List[Hit]: Best hits first
+        """
+        terms = self.query_terms(query)
+        return self.search_terms(terms, k, sources)
+
+    def search_terms(self, terms: Sequence[str], k: int = 10,
+                     sources: Optional[Sequence[str]] = None) -> List[Hit]:
+        """search() for already-cleaned query terms."""
+        total_docs = self.manifest['total_docs']
+        if not terms or not total_docs:
+            return []
+        avgdl = self.manifest['total_tokens'] / total_docs
+        allowed = None
+        if sources is not None:
+            # Lookup table over the uint8 source codes
+            allowed = np.zeros(256, dtype=bool)
+            allowed[[code for code, name in enumerate(self.manifest['sources']) if name in set(sources)]] = True
+            if not allowed.any():
+                return []
+
+        idf = {}
+        for term in terms:
+            df = sum(segment.df(term) for segment in self.segments)
+            if df:
+                idf[term] = np.log1p((total_docs - df + 0.5) / (df + 0.5))
+
+        candidates = []
+        for seg_no, segment in enumerate(self.segments):
+            norms = segment.length_norms(avgdl)
+            ids, scores = [], []
+            for term, weight in idf.items():
+                postings = segment.postings_for(term)
+                if postings is None:
+                    continue
+                doc_ids, tfs = postings
+                if allowed is not None:
+                    keep = allowed[segment.sources[doc_ids]]
+                    doc_ids, tfs = doc_ids[keep], tfs[keep]
+                ids.append(doc_ids)
+                scores.append(np.float32(weight * (K1 + 1)) * tfs / (tfs + norms[doc_ids]))
+            if not ids:
+                continue
+
+            if len(ids) == 1:
+                doc_ids, totals = ids[0], scores[0]
+            elif sum(len(i) for i in ids) * DENSE_RATIO >= len(norms):
+                # Long lists: accumulate into a per-document array. Ids are
+                # unique within one term, so fancy-index += is exact.
+                totals = np.zeros(len(norms), dtype=np.float32)
+                for term_ids, term_scores in zip(ids, scores):
+                    totals[term_ids] += term_scores
+                doc_ids = None
+            else:
+                doc_ids, inverse = np.unique(np.concatenate(ids), return_inverse=True)
+                totals = np.bincount(inverse, weights=np.concatenate(scores))
+
+            if len(totals) > k:
+                top = np.argpartition(-totals, k - 1)[:k]
+            else:
+                top = np.arange(len(totals))
+            top = top[totals[top] > 0]
+            candidates.extend((float(totals[i]), seg_no, int(i if doc_ids is None else doc_ids[i])) for i in top)
+
+        candidates.sort(key=lambda c: -c[0])
+        hits = []
+        for score, seg_no, doc_id in candidates[:k]:
+            source, original_id, comment = self.segments[seg_no].document(doc_id)
+            hits.append(Hit(score, source, original_id, comment))
+        return hits
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="BM25 keyword search over cleaned comments")
+    parser.add_argument('--index', default=DEFAULT_INDEX_DIR, help="Index directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="Index new comments (incremental)")
+    build.add_argument('inputs', nargs='*', default=DEFAULT_INPUTS,
+                       help="preprocessed_comments.csv or unified comment CSVs")
+    build.add_argument('--rebuild', action='store_true', help="Drop the existing index first")
+
+    search = commands.add_parser('search', help="Search the index")
+    search.add_argument('query')
+    search.add_argument('-k', type=int, default=10, help="Number of hits")
+    search.add_argument('--source', nargs='+', help="Only these sources, e.g. Reddit X")
+
+    commands.add_parser('info', help="Show index statistics")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        if args.rebuild and os.path.isdir(args.index):
+            shutil.rmtree(args.index)
+        index = SearchIndex(args.index)
+        start = time.perf_counter()
+        added = index.build(args.inputs)
+        print(f"Indexed {added} new documents in {time.perf_counter() - start:.2f}s "
+              f"({index.manifest['total_docs']} total, {len(index.manifest['segments'])} segments)")
+    elif args.command == 'search':
+        index = SearchIndex(args.index)
+        terms = index.query_terms(args.query)
+        index.segments  # open before timing
+        start = time.perf_counter()
+        hits = index.search_terms(terms, args.k, args.source)
+        elapsed = time.perf_counter() - start
+        for rank, hit in enumerate(hits, 1):
+            comment = hit.comment.replace('\n', ' ')
+            print(f"{rank:>3}. [{hit.score:.2f}] {hit.source} {hit.original_id}: "
+                  f"{comment[:120]}{'...' if len(comment) > 120 else ''}")
+        print(f"{len(hits)} hits for {terms} in {elapsed * 1000:.1f}ms")
+    else:
+        manifest = SearchIndex(args.index).manifest
+        print(f"Documents: {manifest['total_docs']}")
+        print(f"Segments: {len(manifest['segments'])}")
+        print(f"Sources: {', '.join(manifest['sources'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Character n-gram TF-IDF features for the distilled sentiment student.
+
+Equivalent in spirit to TfidfVectorizer(analyzer='char_wb', sublinear_tf=True),
+but each distinct word is turned into its n-gram feature ids once and cached.
+Comment vocabularies are highly repetitive, so after the first few thousand
+comments transform() is mostly dict hits instead of building and looking
+up every n-gram string, several times faster than the sklearn vectorizer.
+Lives in its own module so pickled students load anywhere this file is importable.
+"""
+from collections import Counter
+from typing import Dict, Iterable, List
+
+import numpy as np
+import scipy.sparse as sp
+
+
+def word_ngrams(word: str, n_min: int, n_max: int) -> List[str]:
+    """Character n-grams of a word padded with ^ and $ boundary markers (as in language_id)."""
+    padded = f"^{word}$"
+    return [padded[i:i + n] for n in range(n_min, n_max + 1) for i in range(len(padded) - n + 1)]
+
+
+class CharNgramVectorizer:
+    """
+    Sublinear-TF, smooth-IDF, L2-normalized character n-gram features of
+    whitespace-separated lowercased words.
+    """
+
+    def __init__(self, n_min: int = 2, n_max: int = 5, min_df: int = 2, max_features: int = None,
+                 cache_size: int = 500_000):
+        self.n_min = n_min
+        self.n_max = n_max
+        self.min_df = min_df
+        self.max_features = max_features
+        self.cache_size = cache_size
+        self.vocabulary_: Dict[str, int] = {}
+        self.idf_ = np.zeros(0)
+        self._cache: Dict[str, tuple] = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_cache'] = {}
+        return state
+
+    def fit(self, texts: Iterable[str]) -> 'CharNgramVectorizer':
+        df = Counter()
+        n_docs = 0
+        for text in texts:
+            n_docs += 1
+            df.update({g for word in set(text.lower().split()) for g in word_ngrams(word, self.n_min, self.n_max)})
+        grams = [(count, g) for g, count in df.items() if count >= self.min_df]
+        if self.max_features:
+            grams = sorted(grams, reverse=True)[:self.max_features]
+        grams = sorted(g for _, g in grams)
+        self.vocabulary_ = {g: i for i, g in enumerate(grams)}
+        counts = np.array([df[g] for g in grams], dtype=np.float64)
+        self.idf_ = np.log((1 + n_docs) / (1 + counts)) + 1
+        self._cache = {}
+        return self
+
+    def _word_ids(self, word: str) -> tuple:
+        ids = self._cache.get(word)
+        if ids is None:
+            vocabulary = self.vocabulary_
+            ids = tuple(vocabulary[g] for g in word_ngrams(word, self.n_min, self.n_max) if g in vocabulary)
+            if len(self._cache) >= self.cache_size:
+                self._cache.clear()
+            self._cache[word] = ids
+        return ids
+
+    def transform(self, texts: Iterable[str]) -> sp.csr_matrix:
+        ids: List[int] = []
+        indptr = [0]
+        word_ids = self._word_ids
+        for text in texts:
+            for word in text.lower().split():
+                ids.extend(word_ids(word))
+            indptr.append(len(ids))
+        n_docs = len(indptr) - 1
+        rows = np.repeat(np.arange(n_docs), np.diff(indptr))
+        X = sp.csr_matrix((np.ones(len(ids)), (rows, np.array(ids, dtype=np.int64))),
+                          shape=(n_docs, len(self.vocabulary_)))
+        X.sum_duplicates()
+        np.log(X.data, out=X.data)
+        X.data += 1
+        X.data *= self.idf_[X.indices]
+        norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        X.data /= np.repeat(norms, np.diff(X.indptr))
+        return X
+
+    def fit_transform(self, texts: Iterable[str]) -> sp.csr_matrix:
+        texts = list(texts)
+        return self.fit(texts).transform(texts)
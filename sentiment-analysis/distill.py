@@ -0,0 +1,221 @@
+"""
+Distill a transformer sentiment model into a character n-gram student.
+
+The teacher (the notebooks' pseudo-labelling transformer) scores every
+comment once and its full probability distribution is cached. The student
+is a char n-gram TF-IDF (char_features.py) + LogisticRegression trained on those
+soft targets: each comment is entered once per class, weighted by the
+teacher's probability, which makes LogisticRegression minimise cross-entropy
+against the teacher's distribution rather than its argmax.
+
+    python distill.py teacher --teacher hf:nlptown/bert-base-multilingual-uncased-sentiment
+    python distill.py train
+
+The student is saved as {'vectorizer', 'model'} with joblib, the format
+sentiment_server.py already serves:
+
+    python sentiment_server.py --model sentiment_student.joblib
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from sentiment_server import load_model
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(SCRIPT_DIR))
+from dataset_store import load_dataset
+
+DEFAULT_TEACHER = 'hf:nlptown/bert-base-multilingual-uncased-sentiment'
+TEACHER_FILE = os.path.join(SCRIPT_DIR, 'teacher_probs.csv')
+STUDENT_FILE = os.path.join(SCRIPT_DIR, 'sentiment_student.joblib')
+REPORT_FILE = os.path.join(SCRIPT_DIR, 'distill_report.json')
+
+# Character n-grams cope with Taglish spelling variants and need no tokenizer
+STUDENT_VECTORIZER = dict(n_min=2, n_max=5, min_df=2, max_features=200000)
+STUDENT_C = 10.0
+
+
+def load_comments(path: Optional[str] = None) -> List[str]:
+    """Non-empty comments from a CSV with a Comments column, by default the 'comments' dataset."""
+    df = pd.read_csv(path) if path else load_dataset('comments')
+    texts = df['Comments'].dropna().astype(str)
+    return texts[texts.str.strip() != ''].tolist()
+
+
+def score_teacher(spec: str, texts: List[str], batch_size: int = 32) -> Tuple[pd.DataFrame, float]:
+    """
+    Teacher probabilities for every comment.
+
+    Args:
+        spec (str): 'hf:<model name>' or a joblib model, as for sentiment_server.py
+        texts (list): Comments to score
+        batch_size (int): Comments per model call
+
+    Returns:
+        tuple: (DataFrame of text plus one p_<label> column per class,
+            teacher comments/s)
+    """
+    teacher = load_model(spec)
+    labels, chunks = None, []
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        batch_labels, probs = teacher.distributions(texts[i:i + batch_size])
+        if labels is None:
+            labels = batch_labels
+        elif batch_labels != labels:
+            # A batch may lack a label no comment in it received
+            probs = pd.DataFrame(probs, columns=batch_labels).reindex(columns=labels, fill_value=0.0).to_numpy()
+        chunks.append(probs)
+        print(f"Teacher scored {min(i + batch_size, len(texts))}/{len(texts)} comments")
+    elapsed = time.perf_counter() - start
+    probs = pd.DataFrame(np.vstack(chunks), columns=[f"p_{label}" for label in labels])
+    probs.insert(0, 'text', texts)
+    return probs, len(texts) / elapsed
+
+
+def soft_targets(df: pd.DataFrame) -> Tuple[List[str], np.ndarray]:
+    """(class labels, probability matrix) from a teacher CSV, rows renormalized to sum to 1."""
+    columns = [c for c in df.columns if c.startswith('p_')]
+    probs = df[columns].to_numpy(dtype=np.float64)
+    return [c[2:] for c in columns], probs / probs.sum(axis=1, keepdims=True)
+
+
+def fit_student(texts: List[str], labels: List[str], probs: np.ndarray, C: float = STUDENT_C):
+    """
+    Char n-gram TF-IDF + LogisticRegression fitted to soft targets.
+
+    Returns:
+        tuple: (fitted vectorizer, fitted model)
+    """
+    import scipy.sparse as sp
+    from sklearn.linear_model import LogisticRegression
+
+    from char_features import CharNgramVectorizer
+
+    vectorizer = CharNgramVectorizer(**STUDENT_VECTORIZER)
+    X = vectorizer.fit_transform(texts)
+    n, k = probs.shape
+    # One copy of every comment per class, weighted by the teacher's probability
+    X_soft = sp.vstack([X] * k, format='csr')
+    y_soft = np.repeat(np.array(labels), n)
+    weights = probs.T.ravel()
+    keep = weights > 1e-6
+    model = LogisticRegression(C=C, max_iter=2000)
+    model.fit(X_soft[keep], y_soft[keep], sample_weight=weights[keep])
+    return vectorizer, model
+
+
+def agreement(labels: List[str], teacher: np.ndarray, student: np.ndarray) -> Dict[str, float]:
+    """Top-1 agreement, per-teacher-label agreement and mean KL(teacher || student)."""
+    teacher_top, student_top = teacher.argmax(axis=1), student.argmax(axis=1)
+    eps = 1e-9
+    kl = (teacher * (np.log(teacher + eps) - np.log(student + eps))).sum(axis=1)
+    report = {'top1_agreement': float((teacher_top == student_top).mean()), 'mean_kl': float(kl.mean())}
+    for i, label in enumerate(labels):
+        mask = teacher_top == i
+        if mask.any():
+            report[f"agreement_{label}"] = float((student_top[mask] == i).mean())
+    return report
+
+
+def throughput(predict, texts: List[str], repeat: int = 3) -> float:
+    """Best comments/s of predict(texts) over `repeat` runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predict(texts)
+        best = min(best, time.perf_counter() - start)
+    return len(texts) / best
+
+
+def train(teacher_file: str = TEACHER_FILE, student_file: str = STUDENT_FILE,
+          report_file: str = REPORT_FILE, test_size: float = 0.2) -> dict:
+    """
+    Fit the student on a split of the teacher's scores, report held-out
+    agreement and throughput, then refit on every comment and save it.
+    """
+    import joblib
+    from sklearn.model_selection import train_test_split
+
+    df = pd.read_csv(teacher_file, keep_default_na=False)
+    labels, probs = soft_targets(df)
+    texts = df['text'].astype(str).tolist()
+    with open(f"{os.path.splitext(teacher_file)[0]}.json", encoding='utf-8') as f:
+        teacher_info = json.load(f)
+
+    train_idx, test_idx = train_test_split(np.arange(len(texts)), test_size=test_size,
+                                           stratify=probs.argmax(axis=1), random_state=42)
+    vectorizer, model = fit_student([texts[i] for i in train_idx], labels, probs[train_idx])
+    test_texts = [texts[i] for i in test_idx]
+    student_probs = model.predict_proba(vectorizer.transform(test_texts))
+    # predict_proba columns follow model.classes_, which are the sorted labels
+    student_probs = student_probs[:, [list(model.classes_).index(label) for label in labels]]
+
+    student_rate = throughput(lambda batch: model.predict_proba(vectorizer.transform(batch)), texts)
+    report = {
+        'teacher': teacher_info['teacher'],
+        'labels': labels,
+        'comments': len(texts),
+        'held_out': len(test_idx),
+        **agreement(labels, probs[test_idx], student_probs),
+        'teacher_comments_per_s': teacher_info['comments_per_s'],
+        'student_comments_per_s': student_rate,
+        'speedup': student_rate / teacher_info['comments_per_s'],
+        'student_features': len(vectorizer.vocabulary_),
+    }
+
+    # The shipped student sees every comment the teacher scored
+    vectorizer, model = fit_student(texts, labels, probs)
+    joblib.dump({'vectorizer': vectorizer, 'model': model}, student_file, compress=3)
+    report['student_bytes'] = os.path.getsize(student_file)
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distill the pseudo-labelling transformer into a fast student")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    teacher = commands.add_parser('teacher', help="Score every comment with the teacher")
+    teacher.add_argument('--teacher', default=DEFAULT_TEACHER, help="hf:<model name> or a joblib model")
+    teacher.add_argument('--input', help="CSV with a Comments column (default: the 'comments' dataset)")
+    teacher.add_argument('--output', default=TEACHER_FILE)
+    teacher.add_argument('--batch-size', type=int, default=32)
+
+    fit = commands.add_parser('train', help="Train, evaluate and export the student")
+    fit.add_argument('--teacher-file', default=TEACHER_FILE)
+    fit.add_argument('--output', default=STUDENT_FILE)
+    fit.add_argument('--report', default=REPORT_FILE)
+    args = parser.parse_args()
+
+    if args.command == 'teacher':
+        texts = load_comments(args.input)
+        probs, rate = score_teacher(args.teacher, texts, args.batch_size)
+        probs.to_csv(args.output, index=False, encoding='utf-8')
+        with open(f"{os.path.splitext(args.output)[0]}.json", 'w', encoding='utf-8') as f:
+            json.dump({'teacher': args.teacher, 'comments': len(texts), 'comments_per_s': rate}, f, indent=2)
+        print(f"Saved {len(texts)} teacher distributions to {args.output} ({rate:,.1f} comments/s)")
+        return
+
+    report = train(args.teacher_file, args.output, args.report)
+    print(f"\nStudent saved to {args.output} ({report['student_bytes'] / 1e6:.1f} MB)")
+    print(f"Held-out agreement with {report['teacher']}: {report['top1_agreement']:.1%} "
+          f"(mean KL {report['mean_kl']:.3f})")
+    for label in report['labels']:
+        if f"agreement_{label}" in report:
+            print(f"  teacher '{label}': {report[f'agreement_{label}']:.1%}")
+    print(f"Throughput: teacher {report['teacher_comments_per_s']:,.1f} comments/s, "
+          f"student {report['student_comments_per_s']:,.0f} comments/s ({report['speedup']:,.0f}x)")
+    print(f"Report saved to {args.report}")
+
+
+if __name__ == '__main__':
+    main()
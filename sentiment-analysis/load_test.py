@@ -0,0 +1,169 @@
+"""
+Load-test the sentiment server across batch window settings.
+
+For every (max wait, max batch) setting a fresh server is started, a fixed
+number of concurrent keep-alive clients send single-comment requests, and
+p50/p99 latency, throughput and the server's mean batch size are reported.
+
+    python load_test.py --model sentiment_lr.joblib --waits 0 2 5 10 --concurrency 32
+
+Without a saved model, --placeholder fits a throwaway TF-IDF + LR on
+the 'comments' dataset with arbitrary labels: its predictions are meaningless, but it
+costs the same per comment as the real one.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER = os.path.join(SCRIPT_DIR, 'sentiment_server.py')
+
+sys.path.append(os.path.dirname(SCRIPT_DIR))
+from dataset_store import load_dataset
+
+
+def fit_placeholder_model(path: str) -> str:
+    """Fit a timing-only TF-IDF + LogisticRegression on the comments and save it to `path`."""
+    import joblib
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    texts = load_dataset('comments')['Comments'].dropna().astype(str)
+    labels = np.random.default_rng(42).choice(['negative', 'positive'], len(texts))
+    vectorizer = TfidfVectorizer(max_features=5000, ngram_range=(1, 2))
+    model = LogisticRegression(max_iter=1000).fit(vectorizer.fit_transform(texts), labels)
+    joblib.dump({'vectorizer': vectorizer, 'model': model}, path)
+    return path
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+async def request(reader, writer, method: str, path: str, payload=None):
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode().partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return json.loads(await reader.readexactly(length))
+
+
+async def wait_until_up(port: int, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            await request(reader, writer, 'GET', '/health')
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+async def client(port: int, texts, count: int, latencies: list) -> None:
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    for i in range(count):
+        start = time.perf_counter()
+        await request(reader, writer, 'POST', '/predict', {'texts': [texts[i % len(texts)]]})
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def drive(port: int, texts, concurrency: int, requests_per_client: int):
+    await wait_until_up(port)
+    latencies = []
+    # Warm up the model and connection handling before measuring
+    await client(port, texts, 20, [])
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, texts[i::concurrency] or texts, requests_per_client, latencies)
+                           for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    stats = await request(reader, writer, 'GET', '/stats')
+    writer.close()
+    return latencies, elapsed, stats
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_setting(model: str, max_wait_ms: float, max_batch: int, texts, concurrency: int,
+                requests_per_client: int) -> dict:
+    port = free_port()
+    server = subprocess.Popen([sys.executable, SERVER, '--model', model, '--port', str(port),
+                               '--max-wait-ms', str(max_wait_ms), '--max-batch', str(max_batch)],
+                              stdout=subprocess.DEVNULL)
+    try:
+        latencies, elapsed, stats = asyncio.run(drive(port, texts, concurrency, requests_per_client))
+    finally:
+        server.terminate()
+        server.wait()
+    return {
+        'max_wait_ms': max_wait_ms, 'max_batch': max_batch, 'concurrency': concurrency,
+        'requests': len(latencies),
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'mean_ms': statistics.mean(latencies) * 1000,
+        'throughput': len(latencies) / elapsed,
+        'mean_batch_size': stats['mean_batch_size'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the sentiment server")
+    parser.add_argument('--model', help="Model spec passed to sentiment_server.py")
+    parser.add_argument('--placeholder', action='store_true',
+                        help="Fit a timing-only model on the comments instead of loading one")
+    parser.add_argument('--waits', type=float, nargs='+', default=[0, 2, 5, 10], help="max-wait-ms values")
+    parser.add_argument('--batches', type=int, nargs='+', default=[64], help="max-batch values")
+    parser.add_argument('--concurrency', type=int, default=32, help="Concurrent clients")
+    parser.add_argument('--requests', type=int, default=50, help="Requests per client")
+    parser.add_argument('--output', help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    if args.placeholder:
+        model = fit_placeholder_model(os.path.join(tempfile.mkdtemp(prefix='sentiment_'), 'placeholder.joblib'))
+    elif args.model:
+        model = args.model
+    else:
+        parser.error("pass --model or --placeholder")
+
+    texts = load_dataset('comments')['Comments'].dropna().astype(str).tolist()
+    results = []
+    print(f"{'wait ms':>8} {'batch':>6} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>9} {'mean batch':>11}")
+    for max_batch in args.batches:
+        for max_wait_ms in args.waits:
+            result = run_setting(model, max_wait_ms, max_batch, texts, args.concurrency, args.requests)
+            results.append(result)
+            print(f"{max_wait_ms:>8g} {max_batch:>6} {result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                  f"{result['throughput']:>9,.0f} {result['mean_batch_size']:>11.1f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+Class rebalancing for the sentiment notebooks without copying training rows.
+
+RandomOverSampler.fit_resample(X_train, y_train) returns a new CSR matrix
+holding every minority row it draws. Fitting MultinomialNB or
+LogisticRegression on those duplicates is the same as fitting the original
+matrix with each row weighted by how often it was drawn, so
+oversample_weights() makes the same draw and returns only those counts:
+
+    weights = oversample_weights(y_train, random_state=42)
+    model.fit(X_train, y_train, sample_weight=weights)
+
+    python rebalance.py            # compare both on the 'comments' dataset
+"""
+import os
+import sys
+import time
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.append(os.path.dirname(SCRIPT_DIR))
+from dataset_store import load_dataset
+
+
+def oversample_indices(y, random_state=None) -> np.ndarray:
+    """
+    Row indices RandomOverSampler(random_state=...) would emit, without the rows.
+
+    Every original row once, then bootstrap draws of each non-majority class
+    (in sorted label order) until it matches the majority count: the same
+    draw as imblearn's default 'auto' strategy. X[indices] would be the
+    materialized resample; the point is not to build it.
+
+    Args:
+        y: Training labels
+        random_state: Seed or np.random.RandomState, as for RandomOverSampler
+
+    Returns:
+        np.ndarray: Indices into the original training rows
+    """
+    y = np.asarray(y)
+    rng = random_state if isinstance(random_state, np.random.RandomState) else np.random.RandomState(random_state)
+    labels, counts = np.unique(y, return_counts=True)
+    stats = pd.Series(y).value_counts(sort=False)
+    majority = stats.idxmax()
+    indices = [np.arange(len(y))]
+    for label, count in zip(labels, counts):
+        if label == majority:
+            continue
+        members = np.flatnonzero(y == label)
+        indices.append(rng.choice(members, size=stats[majority] - count, replace=True))
+    return np.concatenate(indices)
+
+
+def oversample_weights(y, random_state=None) -> np.ndarray:
+    """
+    Per-row sample weights equivalent to training on the random oversample.
+
+    Returns:
+        np.ndarray: How many times each original row appears in
+            oversample_indices(y, random_state), as float64
+    """
+    return np.bincount(oversample_indices(y, random_state), minlength=len(y)).astype(np.float64)
+
+
+def balanced_weights(y) -> np.ndarray:
+    """
+    Deterministic weights giving every class the majority's total weight
+    (the expectation of oversample_weights).
+    """
+    y = pd.Series(np.asarray(y))
+    counts = y.value_counts()
+    return (counts.max() / y.map(counts)).to_numpy(dtype=np.float64)
+
+
+def weighted_counts(y, weights) -> pd.Series:
+    """Effective class sizes under `weights`, the weighted 'balanced training distribution'."""
+    return pd.Series(weights, index=np.asarray(y)).groupby(level=0).sum()
+
+
+def csr_nbytes(X) -> int:
+    """Bytes held by a CSR matrix's data, indices and indptr arrays."""
+    return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+
+
+def compare(X, y, X_test, y_test, random_state: int = 42) -> Dict[str, dict]:
+    """
+    Fit NB and LR on the materialized oversample and on sample weights, and
+    report test metrics, fit time and training-data memory for both.
+    """
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import accuracy_score, f1_score
+    from sklearn.naive_bayes import MultinomialNB
+
+    indices = oversample_indices(y, random_state)
+    y = np.asarray(y)
+    start = time.perf_counter()
+    X_bal, y_bal = X[indices], y[indices]
+    materialize_seconds = time.perf_counter() - start
+    weights = np.bincount(indices, minlength=len(y)).astype(np.float64)
+
+    models = {
+        'Naive Bayes': MultinomialNB,
+        'Logistic Regression': lambda: LogisticRegression(max_iter=1000, class_weight='balanced', random_state=42),
+    }
+    results = {}
+    for name, make in models.items():
+        for mode, fit in (('resampled', lambda m: m.fit(X_bal, y_bal)),
+                          ('weighted', lambda m: m.fit(X, y, sample_weight=weights))):
+            start = time.perf_counter()
+            model = fit(make())
+            elapsed = time.perf_counter() - start
+            pred = model.predict(X_test)
+            results[f"{name} ({mode})"] = {
+                'accuracy': accuracy_score(y_test, pred),
+                'f1_macro': f1_score(y_test, pred, average='macro'),
+                'fit_seconds': elapsed + (materialize_seconds if mode == 'resampled' else 0.0),
+                'train_bytes': csr_nbytes(X_bal) + y_bal.nbytes if mode == 'resampled' else weights.nbytes,
+            }
+    return results
+
+
+def main():
+    import argparse
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.model_selection import train_test_split
+
+    parser = argparse.ArgumentParser(description="Compare oversampled matrices with sample weights")
+    parser.add_argument('--minority-share', type=float, default=0.2,
+                        help="Share of placeholder 'positive' labels (the comments have no labels)")
+    parser.add_argument('--repeat', type=int, default=1, help="Repeat the corpus to mimic a larger one")
+    args = parser.parse_args()
+
+    texts = load_dataset('comments')['Comments'].dropna().astype(str)
+    texts = pd.concat([texts] * args.repeat, ignore_index=True)
+    labels = np.where(np.random.default_rng(42).random(len(texts)) < args.minority_share, 'positive', 'negative')
+    train_x, test_x, y_train, y_test = train_test_split(texts, labels, test_size=0.2, stratify=labels, random_state=42)
+    vectorizer = TfidfVectorizer(max_features=5000, ngram_range=(1, 2))
+    X_train = vectorizer.fit_transform(train_x)
+    X_test = vectorizer.transform(test_x)
+    print(f"Train: {X_train.shape[0]} rows, {csr_nbytes(X_train) / 1e6:.2f} MB TF-IDF; "
+          f"weighted class sizes {weighted_counts(y_train, oversample_weights(y_train, 42)).to_dict()}")
+
+    print(f"{'model':<36} {'accuracy':>9} {'macro F1':>9} {'fit s':>7} {'extra train MB':>15}")
+    for name, r in compare(X_train, y_train, X_test, y_test).items():
+        print(f"{name:<36} {r['accuracy']:>9.4f} {r['f1_macro']:>9.4f} {r['fit_seconds']:>7.2f} "
+              f"{r['train_bytes'] / 1e6:>15.2f}")
+
+
+if __name__ == '__main__':
+    main()
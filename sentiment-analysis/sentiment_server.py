@@ -0,0 +1,315 @@
+"""
+Local sentiment scoring service with dynamic micro-batching.
+
+Concurrent requests are queued and scored together: a batch closes when it
+holds --max-batch comments or --max-wait-ms has passed since its first
+request arrived, and the model is called once per batch.
+
+    python sentiment_server.py --model sentiment_lr.joblib
+    python sentiment_server.py --model hf:nlptown/bert-base-multilingual-uncased-sentiment
+
+    curl -s localhost:8765/predict -d '{"texts": ["grabe ang kurakot", "salamat po"]}'
+    -> {"results": [{"label": "negative", "score": 0.91}, ...]}
+
+Endpoints: POST /predict, GET /health, GET /stats. Pass --unix PATH to
+listen on a Unix socket instead of TCP.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODEL = os.path.join(SCRIPT_DIR, 'sentiment_lr.joblib')
+
+# Star ratings of nlptown/bert-base-multilingual-uncased-sentiment, mapped as
+# in multilingual-model-sentiment-analysis.ipynb
+STAR_LABELS = {'1 star': 'negative', '2 stars': 'negative', '3 stars': 'neutral',
+               '4 stars': 'positive', '5 stars': 'positive'}
+
+MAX_BODY = 8 * 1024 * 1024
+
+
+class SklearnSentimentModel:
+    """
+    TF-IDF + LogisticRegression as fitted in the sentiment notebooks.
+
+    Loads a joblib file holding either a fitted Pipeline or a dict with
+    'vectorizer' and 'model' (what the notebooks save).
+    """
+
+    def __init__(self, path: str):
+        import joblib
+
+        saved = joblib.load(path)
+        if isinstance(saved, dict):
+            self.vectorizer, self.model = saved['vectorizer'], saved['model']
+        else:
+            self.vectorizer, self.model = None, saved
+        self.name = os.path.basename(path)
+
+    def predict(self, texts: List[str]) -> List[Tuple[str, float]]:
+        features = self.vectorizer.transform(texts) if self.vectorizer is not None else texts
+        probs = self.model.predict_proba(features)
+        best = probs.argmax(axis=1)
+        classes = self.model.classes_
+        return [(str(classes[i]), float(p[i])) for i, p in zip(best, probs)]
+
+    def distributions(self, texts: List[str]) -> Tuple[List[str], np.ndarray]:
+        """(class labels, probability matrix with one row per text)."""
+        features = self.vectorizer.transform(texts) if self.vectorizer is not None else texts
+        return [str(c) for c in self.model.classes_], self.model.predict_proba(features)
+
+
+class HFSentimentModel:
+    """Hugging Face text-classification pipeline, called once per batch."""
+
+    def __init__(self, model_name: str):
+        try:
+            from transformers import pipeline
+        except ImportError as e:
+            raise SystemExit(f"transformers is required for hf: models ({e})")
+        self.pipeline = pipeline('sentiment-analysis', model=model_name)
+        self.name = model_name
+
+    def predict(self, texts: List[str]) -> List[Tuple[str, float]]:
+        results = self.pipeline(texts, batch_size=len(texts), truncation=True)
+        return [(STAR_LABELS.get(r['label'].lower(), r['label'].lower()), float(r['score'])) for r in results]
+
+    def distributions(self, texts: List[str]) -> Tuple[List[str], np.ndarray]:
+        """
+        (class labels, probability matrix with one row per text), with star
+        ratings summed into negative / neutral / positive.
+        """
+        results = self.pipeline(texts, batch_size=len(texts), truncation=True, top_k=None)
+        mapped = [{} for _ in results]
+        for row, scores in zip(mapped, results):
+            for r in scores:
+                label = STAR_LABELS.get(r['label'].lower(), r['label'].lower())
+                row[label] = row.get(label, 0.0) + float(r['score'])
+        labels = sorted({label for row in mapped for label in row})
+        return labels, np.array([[row.get(label, 0.0) for label in labels] for row in mapped])
+
+
+def load_model(spec: str):
+    """'hf:<model name>' for a Hugging Face model, otherwise a joblib path."""
+    if spec.startswith('hf:'):
+        return HFSentimentModel(spec[3:])
+    return SklearnSentimentModel(spec)
+
+
+class MicroBatcher:
+    """
+    Collects texts from concurrent callers into batches for one model call.
+
+    Only one batch runs at a time (in a worker thread, so the event loop
+    keeps accepting requests); requests arriving meanwhile form the next one.
+    """
+
+    def __init__(self, model, max_batch: int = 64, max_wait: float = 0.005):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.batches = 0
+        self.items = 0
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+
+    async def predict(self, texts: List[str]) -> List[Tuple[str, float]]:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((texts, future))
+        return await future
+
+    async def _collect(self) -> list:
+        pending = [await self.queue.get()]
+        size = len(pending[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            pending.append(item)
+            size += len(item[0])
+        # Take whatever else is already queued without waiting
+        while size < self.max_batch and not self.queue.empty():
+            item = self.queue.get_nowait()
+            pending.append(item)
+            size += len(item[0])
+        return pending
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = await self._collect()
+            texts = [text for item_texts, _ in pending for text in item_texts]
+            try:
+                results = await loop.run_in_executor(None, self.model.predict, texts)
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(texts)
+            start = 0
+            for item_texts, future in pending:
+                if not future.done():
+                    future.set_result(results[start:start + len(item_texts)])
+                start += len(item_texts)
+
+
+def parse_texts(body: bytes) -> List[str]:
+    """Texts from a {"texts": [...]} or {"text": "..."} body."""
+    payload = json.loads(body or b'{}')
+    if not isinstance(payload, dict):
+        raise ValueError('expected a JSON object')
+    if 'texts' in payload:
+        texts = payload['texts']
+    elif 'text' in payload:
+        texts = [payload['text']]
+    else:
+        raise ValueError('expected "texts" or "text"')
+    if not isinstance(texts, list):
+        raise ValueError('"texts" must be a list')
+    return ['' if t is None else str(t) for t in texts]
+
+
+async def read_request(reader: asyncio.StreamReader):
+    """(method, path, headers, body) of one HTTP/1.1 request, or None at EOF."""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, path, _ = request_line.decode('latin-1').split(' ', 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    if length > MAX_BODY:
+        raise ValueError('request body too large')
+    body = await reader.readexactly(length) if length else b''
+    return method, path, headers, body
+
+
+def write_response(writer: asyncio.StreamWriter, status: int, payload: dict, keep_alive: bool) -> None:
+    reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}
+    body = json.dumps(payload).encode('utf-8')
+    head = (f"HTTP/1.1 {status} {reasons[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode('latin-1') + body)
+
+
+class SentimentServer:
+    def __init__(self, batcher: MicroBatcher):
+        self.batcher = batcher
+        self.requests = 0
+        self.started = time.time()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except (ValueError, asyncio.IncompleteReadError) as e:
+                    write_response(writer, 400, {'error': str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                status, payload = await self.route(method, path, body)
+                write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method: str, path: str, body: bytes):
+        if method == 'POST' and path == '/predict':
+            try:
+                texts = parse_texts(body)
+            except (ValueError, json.JSONDecodeError) as e:
+                return 400, {'error': str(e)}
+            self.requests += 1
+            try:
+                results = await self.batcher.predict(texts) if texts else []
+            except Exception as e:
+                return 500, {'error': str(e)}
+            return 200, {'results': [{'label': label, 'score': score} for label, score in results]}
+        if method == 'GET' and path == '/health':
+            return 200, {'status': 'ok', 'model': self.batcher.model.name}
+        if method == 'GET' and path == '/stats':
+            batches = self.batcher.batches
+            return 200, {'requests': self.requests, 'batches': batches, 'comments': self.batcher.items,
+                         'mean_batch_size': self.batcher.items / batches if batches else 0.0,
+                         'uptime': time.time() - self.started}
+        return 404, {'error': f"no route for {method} {path}"}
+
+
+async def serve(model, host: str = '127.0.0.1', port: int = 8765, unix: Optional[str] = None,
+                max_batch: int = 64, max_wait_ms: float = 5.0) -> None:
+    batcher = MicroBatcher(model, max_batch=max_batch, max_wait=max_wait_ms / 1000)
+    batcher.start()
+    server = SentimentServer(batcher)
+    if unix:
+        listener = await asyncio.start_unix_server(server.handle, path=unix)
+        where = unix
+    else:
+        listener = await asyncio.start_server(server.handle, host, port)
+        where = f"http://{host}:{port}"
+    print(f"Serving {model.name} on {where} (max batch {max_batch}, max wait {max_wait_ms}ms)", flush=True)
+    async with listener:
+        try:
+            await listener.serve_forever()
+        finally:
+            await batcher.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentiment scoring server with micro-batching")
+    parser.add_argument('--model', default=DEFAULT_MODEL,
+                        help="joblib file saved by the sentiment notebooks, or hf:<model name>")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="Listen on this Unix socket instead of TCP")
+    parser.add_argument('--max-batch', type=int, default=64, help="Comments per model call")
+    parser.add_argument('--max-wait-ms', type=float, default=5.0,
+                        help="How long a batch waits for more requests after its first")
+    args = parser.parse_args()
+
+    model = load_model(args.model)
+    try:
+        asyncio.run(serve(model, args.host, args.port, args.unix, args.max_batch, args.max_wait_ms))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""
+Spam and keyword filtering shared by the scrapers and the preprocessor.
+
+A pattern list (one term per line, '#' starts a comment) is compiled once
+into an Aho-Corasick automaton that finds every term in a single pass over
+each comment, so the cost per comment depends on the comment's length, not
+on how many terms are listed.
+
+    python spam_filter.py preprocessed_comments.csv --column comment
+    python spam_filter.py --bench
+"""
+import os
+import time
+from collections import deque
+from functools import lru_cache
+from typing import List, Sequence
+
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'topic-modelling', 'data')
+# Ad spam seen under the Facebook posts (Vietnamese betting, course and shop links)
+SPAM_TERMS_FILE = os.path.join(DATA_DIR, 'spam_terms.txt')
+
+
+@lru_cache(maxsize=None)
+def load_patterns(path: str) -> tuple:
+    """
+    Load a pattern list, skipping blank lines and '#' comments.
+
+    Args:
+        path (str): Path to the pattern file
+
+    Returns:
+        tuple: Terms in file order, duplicates removed
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        terms = (line.split('#', 1)[0].strip() for line in f)
+        return tuple(dict.fromkeys(t for t in terms if t))
+
+
+class PatternMatcher:
+    """
+    Aho-Corasick automaton over a fixed list of terms, matched
+    case-insensitively anywhere in the text. Like the original Facebook
+    filter, 'http' also matches 'https://...'.
+
+    Fail links are folded into each state's transition table when the
+    automaton is built, so matching is one dict lookup per character of the
+    comment whatever the number of terms. Transitions that lead straight
+    back to a child of the root are left out of the tables and taken from
+    the root's, which keeps thousands of terms to a few MB.
+    """
+
+    def __init__(self, terms: Sequence[str]):
+        self.terms = tuple(dict.fromkeys(t.lower() for t in terms if t))
+        goto = [{}]
+        outputs = [()]
+        for term in self.terms:
+            state = 0
+            for char in term:
+                nxt = goto[state].get(char)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][char] = nxt
+                    goto.append({})
+                    outputs.append(())
+                state = nxt
+            outputs[state] = (term,)
+
+        root = goto[0]
+        fail = [0] * len(goto)
+        self.delta: List[dict] = [{}] * len(goto)
+        self.delta[0] = {}
+        # Breadth-first, so a state's fail target is complete before the state
+        queue = deque(root.values())
+        while queue:
+            state = queue.popleft()
+            inherited = self.delta[fail[state]]
+            table = dict(inherited)
+            table.update(goto[state])
+            self.delta[state] = table
+            outputs[state] = outputs[state] + outputs[fail[state]]
+            for char, child in goto[state].items():
+                fail[child] = inherited.get(char) or root.get(char, 0)
+                queue.append(child)
+            # Root-level transitions are looked up separately
+            for char in [c for c, nxt in table.items() if root.get(c) == nxt]:
+                del table[char]
+        self.root = root
+        self.outputs = outputs
+
+    @classmethod
+    def from_files(cls, *paths: str) -> 'PatternMatcher':
+        """Matcher for the union of several pattern files."""
+        return cls([term for path in paths for term in load_patterns(path)])
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def matches(self, text: str) -> bool:
+        """True if any term occurs in `text`."""
+        delta, root, outputs = self.delta, self.root, self.outputs
+        state = 0
+        for char in text.lower():
+            state = delta[state].get(char) or root.get(char, 0)
+            if outputs[state]:
+                return True
+        return False
+
+    def find_all(self, text: str) -> List[str]:
+        """Distinct terms found in `text`, in order of where they end."""
+        delta, root, outputs = self.delta, self.root, self.outputs
+        found = {}
+        state = 0
+        for char in text.lower():
+            state = delta[state].get(char) or root.get(char, 0)
+            for term in outputs[state]:
+                found.setdefault(term, None)
+        return list(found)
+
+    def mask(self, texts: pd.Series) -> pd.Series:
+        """Boolean Series, True where a comment contains any term (NaN counts as no match)."""
+        return texts.fillna('').astype(str).map(self.matches).astype(bool)
+
+
+@lru_cache(maxsize=None)
+def _spam_matcher(paths: tuple) -> PatternMatcher:
+    return PatternMatcher.from_files(*paths)
+
+
+def spam_matcher(paths: Sequence[str] = (SPAM_TERMS_FILE,)) -> PatternMatcher:
+    """Shared matcher for the given pattern files, compiled once per process."""
+    return _spam_matcher(tuple(paths))
+
+
+def is_spam(text: str, paths: Sequence[str] = (SPAM_TERMS_FILE,)) -> bool:
+    """True if `text` contains a term from the spam lists."""
+    return spam_matcher(paths).matches(text)
+
+
+def drop_spam(df: pd.DataFrame, column: str = 'comment',
+              paths: Sequence[str] = (SPAM_TERMS_FILE,)) -> pd.DataFrame:
+    """
+    Rows of `df` whose `column` contains none of the spam terms.
+
+    Args:
+        df (pd.DataFrame): Comments from any platform
+        column (str): Text column to match against
+        paths: Pattern files to combine
+
+    Returns:
+        pd.DataFrame: Remaining rows
+    """
+    return df[~spam_matcher(paths).mask(df[column])]
+
+
+def bench(sizes: Sequence[int] = (8, 100, 1000, 5000), n_comments: int = 20000) -> None:
+    """Print comments/s for growing synthetic term lists over the same comments."""
+    import random
+
+    rng = random.Random(42)
+    alphabet = 'abcdefghijklmnopqrstuvwxyzàáạảãèéẹẻẽ'
+    base = load_patterns(SPAM_TERMS_FILE)
+    words = ['baha', 'flood', 'control', 'kurakot', 'dpwh', 'grabe', 'salamat', 'po', 'ang', 'mga',
+             'contractor', 'pondo', 'ghost', 'project', 'senador', 'sana', 'makulong']
+    comments = [' '.join(rng.choices(words, k=rng.randint(5, 40))) for _ in range(n_comments)]
+    print(f"{'terms':>6} {'compile ms':>11} {'comments/s':>12}")
+    for size in sizes:
+        extra = [''.join(rng.choices(alphabet, k=rng.randint(4, 12))) for _ in range(max(0, size - len(base)))]
+        start = time.perf_counter()
+        matcher = PatternMatcher(list(base) + extra)
+        compiled = time.perf_counter() - start
+        start = time.perf_counter()
+        for comment in comments:
+            matcher.matches(comment)
+        elapsed = time.perf_counter() - start
+        print(f"{len(matcher):>6} {compiled * 1000:>11.1f} {n_comments / elapsed:>12,.0f}")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Flag comments containing spam or keyword terms")
+    parser.add_argument('input', nargs='?', help="CSV of comments")
+    parser.add_argument('--column', default='comment')
+    parser.add_argument('--patterns', nargs='+', default=[SPAM_TERMS_FILE], help="Pattern files to combine")
+    parser.add_argument('--show', type=int, default=5, help="Print this many flagged comments")
+    parser.add_argument('--bench', action='store_true', help="Time matching as the term list grows")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench()
+        return
+    if not args.input:
+        parser.error("pass a CSV or --bench")
+
+    df = pd.read_csv(args.input, dtype=str, keep_default_na=False)
+    matcher = spam_matcher(args.patterns)
+    start = time.perf_counter()
+    flagged = df[matcher.mask(df[args.column])]
+    elapsed = time.perf_counter() - start
+    print(f"{len(flagged)} of {len(df)} comments match {len(matcher)} terms ({elapsed:.2f}s)")
+    for text in flagged[args.column].head(args.show):
+        print(f"- {matcher.find_all(text)}: {text[:100]}")
+
+
+if __name__ == '__main__':
+    main()
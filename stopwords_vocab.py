@@ -0,0 +1,97 @@
+import os
+from functools import lru_cache
+from typing import FrozenSet, List, Sequence
+
+# Canonical stopword resources shared by the preprocessor and every notebook
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'topic-modelling', 'data')
+TAGALOG_STOPWORDS_FILE = os.path.join(DATA_DIR, 'tagalog_stopwords.txt')
+SOCIAL_MEDIA_STOPWORDS_FILE = os.path.join(DATA_DIR, 'social_media_stopwords.txt')
+
+DEFAULT_GROUPS = ('english', 'tagalog')
+
+
+@lru_cache(maxsize=None)
+def load_wordlist(path: str) -> FrozenSet[str]:
+    """
+    Load a one-word-per-line list, lowercased and stripped.
+
+    Args:
+        path (str): Path to the word list
+
+    Returns:
+        FrozenSet[str]: Words in the file
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return frozenset(line.strip().lower() for line in f if line.strip())
+
+
+@lru_cache(maxsize=None)
+def nltk_english_stopwords() -> FrozenSet[str]:
+    """
+    NLTK English stopwords, downloading the corpus on first use.
+
+    Offline machines without the corpus fall back to scikit-learn's list,
+    which covers all but a handful of NLTK's words.
+    """
+    import nltk
+    from nltk.corpus import stopwords
+
+    try:
+        nltk.data.find('corpora/stopwords')
+    except LookupError:
+        print("Downloading NLTK stopwords...")
+        nltk.download('stopwords', quiet=True)
+    try:
+        return frozenset(w.lower() for w in stopwords.words('english'))
+    except LookupError:
+        print("NLTK stopwords unavailable, using scikit-learn's English list instead")
+        return sklearn_english_stopwords()
+
+
+@lru_cache(maxsize=None)
+def sklearn_english_stopwords() -> FrozenSet[str]:
+    """scikit-learn's built-in English stopword list."""
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+    return frozenset(ENGLISH_STOP_WORDS)
+
+
+_GROUP_LOADERS = {
+    'english': nltk_english_stopwords,
+    'sklearn': sklearn_english_stopwords,
+    'tagalog': lambda: load_wordlist(TAGALOG_STOPWORDS_FILE),
+    'social': lambda: load_wordlist(SOCIAL_MEDIA_STOPWORDS_FILE),
+}
+
+
+@lru_cache(maxsize=None)
+def _get_stopwords(groups: tuple) -> FrozenSet[str]:
+    unknown = [g for g in groups if g not in _GROUP_LOADERS]
+    if unknown:
+        raise ValueError(f"Unknown stopword groups: {unknown}. Available: {sorted(_GROUP_LOADERS)}")
+
+    words = set()
+    for group in groups:
+        words |= _GROUP_LOADERS[group]()
+    return frozenset(words)
+
+
+def get_stopwords(groups: Sequence[str] = DEFAULT_GROUPS) -> FrozenSet[str]:
+    """
+    Return the merged stopword set for the requested groups.
+
+    The result is cached, so every caller asking for the same groups shares
+    one frozenset; filter tokens with `token not in stopwords`.
+
+    Args:
+        groups: Any of 'english' (NLTK), 'sklearn', 'tagalog' and 'social'
+
+    Returns:
+        FrozenSet[str]: Lowercased stopwords
+    """
+    return _get_stopwords(tuple(sorted(set(groups))))
+
+
+def stopword_list(groups: Sequence[str] = DEFAULT_GROUPS) -> List[str]:
+    """Sorted stopword list for `CountVectorizer(stop_words=...)` / `TfidfVectorizer`."""
+    return sorted(get_stopwords(groups))
+
@@ -2,31 +2,85 @@ import pandas as pd
 import re
 import string
 import os
+import unicodedata
 from typing import List, Dict, Tuple
 import nltk
-from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
+from stopwords_vocab import get_stopwords
+from comment_schema import is_unified, read_comments
+from language_id import detect_language, tag_languages
+from instrumentation import configure, metrics, profile
+from corpus_stats import CorpusStats
+from timestamps import iso_strings, normalize_timestamps
+from spam_filter import SPAM_TERMS_FILE, spam_matcher
 import warnings
 warnings.filterwarnings('ignore')
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT_FILE = os.path.join(BASE_DIR, 'preprocessed_comments.csv')
+
+# Output profile -> column of the preprocessed CSV holding that view
+PROFILES = {
+    # Light cleaning for transformer models (preprocess_text in BERT_v2.ipynb)
+    'transformer': 'light_comment',
+    # Stopword-filtered tokens for TF-IDF and BERTopic (clean_text)
+    'tfidf': 'cleaned_comment',
+    # Lemmatized alphabetic tokens for LDA (preprocess in Latent_Dirichlet_Allocation.ipynb)
+    'lda': 'lda_tokens',
+}
+
+# Emoji ranges stripped by remove_emojis in BERT_v2.ipynb
+EMOJI_PATTERN = re.compile("["
+                           "\U0001F600-\U0001F64F"  # emoticons
+                           "\U0001F300-\U0001F5FF"  # symbols & pictographs
+                           "\U0001F680-\U0001F6FF"  # transport & map symbols
+                           "\U0001F1E0-\U0001F1FF"  # flags
+                           "]+", flags=re.UNICODE)
+
+# gensim's simple_preprocess tokens: runs of letters, 2 to 15 characters
+ALPHA_TOKEN_PATTERN = re.compile(r'(?:(?!\d)\w)+')
+
+
+def deaccent(text: str) -> str:
+    """Strip combining accents, as gensim.utils.deaccent does."""
+    norm = unicodedata.normalize('NFD', text)
+    return unicodedata.normalize('NFC', ''.join(ch for ch in norm if unicodedata.category(ch) != 'Mn'))
+
+
+def load_lemmatizer():
+    """
+    WordNet lemmatizer as used by the LDA notebook, downloading WordNet on
+    first use. Offline machines without the corpus keep words unchanged.
+    """
+    from nltk.stem import WordNetLemmatizer
+
+    try:
+        nltk.data.find('corpora/wordnet')
+    except LookupError:
+        print("Downloading NLTK wordnet...")
+        nltk.download('wordnet', quiet=True)
+    lemmatizer = WordNetLemmatizer()
+    try:
+        lemmatizer.lemmatize('comments')
+    except LookupError:
+        print("NLTK wordnet unavailable, LDA tokens will not be lemmatized")
+        return lambda word: word
+    return lemmatizer.lemmatize
+
 class TextPreprocessor:
     def __init__(self):
         """Initialize the text preprocessor with necessary NLTK downloads."""
         self.download_nltk_data()
-        self.english_stopwords = set(stopwords.words('english'))
+        self.english_stopwords = get_stopwords(('english',))
+        
+        # Filipino stopwords come from the shared canonical list
+        self.filipino_stopwords = get_stopwords(('tagalog',))
         
-        # Common Filipino stopwords
-        self.filipino_stopwords = {
-            'ang', 'ng', 'sa', 'na', 'at', 'ay', 'si', 'ni', 'mga', 'para', 'kung', 'nang', 
-            'yan', 'ito', 'din', 'daw', 'raw', 'rin', 'lang', 'lamang', 'man', 'po', 'opo',
-            'kasi', 'pero', 'dahil', 'kaya', 'habang', 'kapag', 'saan', 'ano', 'sino', 'bakit',
-            'paano', 'kelan', 'nasaan', 'alin', 'ilan', 'gaano', 'sobra', 'masyado', 'talaga',
-            'naman', 'pala', 'nga', 'yung', 'yun', 'dun', 'dito', 'diyan', 'doon', 'nung',
-            'noong', 'may', 'meron', 'wala', 'walang', 'hindi', 'di', 'huwag', 'wag',
-            'ba', 'eh', 'ah', 'oh', 'uy', 'hay', 'sus', 'tsk', 'ano', 'kaya', 'nga'
-        }
+        self.all_stopwords = get_stopwords(('english', 'tagalog'))
         
-        self.all_stopwords = self.english_stopwords.union(self.filipino_stopwords)
+        # WordNet is only loaded when the LDA view is requested
+        self._lemmatizer = None
+        self._lemmas = {}
         
     def download_nltk_data(self):
         """Download required NLTK data."""
@@ -44,6 +98,16 @@ class TextPreprocessor:
             print("Downloading NLTK stopwords...")
             nltk.download('stopwords')
     
+    def detect_language(self, text: str) -> str:
+        """
+        Tag raw text as 'en', 'tl', 'mixed' or 'unknown'.
+        
+        Run this before clean_text: stopwords are the strongest language signal.
+        The tag is for routing comments to per-language models; cleaning
+        always removes both stopword lists, since Taglish is the norm.
+        """
+        return detect_language(text)
+    
     def clean_text(self, text: str) -> str:
         """
         Clean and preprocess text data.
@@ -54,8 +118,26 @@ class TextPreprocessor:
         Returns:
             str: Cleaned and preprocessed text
         """
+        return self.clean_views(text, ('tfidf',))['tfidf']
+    
+    def clean_views(self, text: str, profiles=tuple(PROFILES)) -> Dict[str, str]:
+        """
+        Produce several cleaned views of one comment in a single pass.
+        
+        URL/HTML removal, hashtag and mention handling and whitespace
+        normalization run once; each profile then finishes from that shared text.
+        
+        Args:
+            text (str): Raw text to be cleaned
+            profiles: Any of the PROFILES keys
+            
+        Returns:
+            Dict[str, str]: Profile -> cleaned text ('lda' tokens are space-separated)
+        """
         if pd.isna(text) or text == '':
-            return ''
+            return {profile: '' for profile in profiles}
+        
+        laps = metrics.laps('clean_text')
         
         # Convert to string if not already
         text = str(text)
@@ -68,17 +150,35 @@ class TextPreprocessor:
         text = re.sub(r'&[a-zA-Z]+;', ' ', text)
         text = re.sub(r'<[^>]+>', ' ', text)
         text = re.sub(r'&gt;|&lt;|&amp;', ' ', text)
+        laps.mark('urls_html')
         
         # Remove hashtags but keep the content
         text = re.sub(r'#(\w+)', r'\1', text)
         
         # Remove mentions
         text = re.sub(r'@\w+', '', text)
+        laps.mark('hashtags_mentions')
         
         # Remove extra whitespace and newlines
         text = re.sub(r'\s+', ' ', text)
         text = re.sub(r'\n+', ' ', text)
         
+        views = {}
+        for profile in profiles:
+            if profile == 'tfidf':
+                views[profile] = self._stopword_view(text, laps)
+            elif profile == 'transformer':
+                views[profile] = self._light_view(text)
+                laps.mark('light')
+            elif profile == 'lda':
+                views[profile] = self._lda_view(text)
+                laps.mark('lda')
+            else:
+                raise ValueError(f"Unknown profile {profile!r}. Available: {sorted(PROFILES)}")
+        return views
+    
+    def _stopword_view(self, text: str, laps) -> str:
+        """Stopword-filtered tokens, the original clean_text output."""
         # Remove excessive punctuation (3 or more consecutive)
         text = re.sub(r'[.]{3,}', '...', text)
         text = re.sub(r'[!]{3,}', '!!!', text)
@@ -89,6 +189,7 @@ class TextPreprocessor:
         
         # Convert to lowercase
         text = text.lower()
+        laps.mark('normalize')
         
         # Tokenize
         try:
@@ -96,6 +197,7 @@ class TextPreprocessor:
         except:
             # Fallback tokenization if NLTK fails
             tokens = text.split()
+        laps.mark('tokenize')
         
         # Remove stopwords and single characters
         cleaned_tokens = []
@@ -115,22 +217,57 @@ class TextPreprocessor:
         
         # Final cleanup
         cleaned_text = re.sub(r'\s+', ' ', cleaned_text).strip()
+        laps.mark('stopwords')
         
         return cleaned_text
+    
+    def _light_view(self, text: str) -> str:
+        """Lowercased text with emojis and punctuation runs reduced, for transformers."""
+        text = EMOJI_PATTERN.sub('', text.lower())
+        text = re.sub(r'[.]{2,}', '.', text)
+        text = re.sub(r'[!]{2,}', '!', text)
+        text = re.sub(r'[?]{2,}', '?', text)
+        # Single characters are mostly typos
+        return ' '.join(word for word in text.split() if len(word) >= 2)
+    
+    def _lda_view(self, text: str) -> str:
+        """Alphabetic, non-stopword tokens longer than two letters, lemmatized."""
+        tokens = []
+        for token in ALPHA_TOKEN_PATTERN.findall(deaccent(text.lower())):
+            if 2 < len(token) <= 15 and token.isalpha() and token not in self.all_stopwords:
+                tokens.append(self.lemmatize(token))
+        return ' '.join(tokens)
+    
+    def lemmatize(self, word: str) -> str:
+        """WordNet lemma of a lowercased word, cached per preprocessor."""
+        lemma = self._lemmas.get(word)
+        if lemma is None:
+            if self._lemmatizer is None:
+                self._lemmatizer = load_lemmatizer()
+            lemma = self._lemmas[word] = self._lemmatizer(word)
+        return lemma
+
+def read_source(path: str) -> pd.DataFrame:
+    """Read unified comment files with fixed dtypes and older layouts as plain CSV."""
+    if is_unified(pd.read_csv(path, nrows=0)):
+        return read_comments(path)
+    return pd.read_csv(path)
 
-def read_csv_files() -> List[Tuple[pd.DataFrame, str]]:
+def read_csv_files(base_path: str = BASE_DIR) -> List[Tuple[pd.DataFrame, str]]:
     """
     Read all CSV files and return list of (dataframe, source_name) tuples.
     
+    Args:
+        base_path (str): Repository root containing the scraper folders
+        
     Returns:
         List[Tuple[pd.DataFrame, str]]: List of dataframes with their source names
     """
     csv_files = []
-    base_path = r'c:\Users\Ven\Documents\Coding\Data Mining\flood-control-semantic-analysis'
     
     # Threads comments
     try:
-        df_threads = pd.read_csv(os.path.join(base_path, 'threads_comments.csv'))
+        df_threads = read_source(os.path.join(base_path, 'threads_comments.csv'))
         csv_files.append((df_threads, 'Threads'))
         print(f"Loaded Threads: {len(df_threads)} records")
     except Exception as e:
@@ -138,7 +275,7 @@ def read_csv_files() -> List[Tuple[pd.DataFrame, str]]:
     
     # Instagram comments
     try:
-        df_instagram = pd.read_csv(os.path.join(base_path, 'instagram-scraper', 'cleaned_instagram_comments.csv'))
+        df_instagram = read_source(os.path.join(base_path, 'instagram-scraper', 'cleaned_instagram_comments.csv'))
         csv_files.append((df_instagram, 'Instagram'))
         print(f"Loaded Instagram: {len(df_instagram)} records")
     except Exception as e:
@@ -146,7 +283,7 @@ def read_csv_files() -> List[Tuple[pd.DataFrame, str]]:
     
     # Reddit comments
     try:
-        df_reddit = pd.read_csv(os.path.join(base_path, 'reddit-scraper', 'cleaned_reddit_comments.csv'))
+        df_reddit = read_source(os.path.join(base_path, 'reddit-scraper', 'cleaned_reddit_comments.csv'))
         csv_files.append((df_reddit, 'Reddit'))
         print(f"Loaded Reddit: {len(df_reddit)} records")
     except Exception as e:
@@ -154,7 +291,7 @@ def read_csv_files() -> List[Tuple[pd.DataFrame, str]]:
     
     # X (Twitter) comments
     try:
-        df_x = pd.read_csv(os.path.join(base_path, 'CleanedXComments.csv'))
+        df_x = read_source(os.path.join(base_path, 'x-scraper', 'CleanedXComments.csv'))
         csv_files.append((df_x, 'X'))
         print(f"Loaded X: {len(df_x)} records")
     except Exception as e:
@@ -165,7 +302,7 @@ def read_csv_files() -> List[Tuple[pd.DataFrame, str]]:
     
     for tiktok_file in tiktok_files:
         try:
-            df_tiktok = pd.read_csv(os.path.join(base_path, 'tiktok-scraper', tiktok_file))
+            df_tiktok = read_source(os.path.join(base_path, 'tiktok-scraper', tiktok_file))
             source_name = f"TikTok-{tiktok_file.split('-')[0].upper()}"
             csv_files.append((df_tiktok, source_name))
             print(f"Loaded {source_name}: {len(df_tiktok)} records")
@@ -174,7 +311,7 @@ def read_csv_files() -> List[Tuple[pd.DataFrame, str]]:
     
     # Facebook comments (if not empty)
     try:
-        df_facebook = pd.read_csv(os.path.join(base_path, 'facebook-scraper', 'facebook_comments.csv'))
+        df_facebook = read_source(os.path.join(base_path, 'facebook-scraper', 'facebook_comments.csv'))
         if not df_facebook.empty:
             csv_files.append((df_facebook, 'Facebook'))
             print(f"Loaded Facebook: {len(df_facebook)} records")
@@ -185,94 +322,103 @@ def read_csv_files() -> List[Tuple[pd.DataFrame, str]]:
     
     return csv_files
 
-def extract_comments_from_dataframes(csv_files: List[Tuple[pd.DataFrame, str]]) -> pd.DataFrame:
+def unified_comments(df: pd.DataFrame, source: str) -> pd.DataFrame:
     """
-    Extract comment text from different CSV structures and combine into unified format.
+    Fast path for files in the unified comment layout: select columns, no re-parsing.
     
     Args:
-        csv_files: List of (dataframe, source_name) tuples
+        df (pd.DataFrame): Frame with COMMENT_FIELDS columns
+        source (str): Source label
         
     Returns:
-        pd.DataFrame: Combined dataframe with columns [comment, source, original_id]
+        pd.DataFrame: Columns [comment, source, original_id, created_at]
     """
-    all_comments = []
+    text = df['text'].fillna('')
+    kept = df[text.str.strip() != '']
+    ids = kept['comment_id'].fillna('').astype(str)
+    fallback = pd.Series([f"{source}_{idx}" for idx in kept.index], index=kept.index)
+    return pd.DataFrame({
+        'comment': kept['text'],
+        'source': source,
+        'original_id': ids.where(ids != '', fallback),
+        'created_at': kept['created_at'].fillna('')
+    }).reset_index(drop=True)
+
+def legacy_comments(df: pd.DataFrame, source: str) -> List[Dict]:
+    """
+    Extract comments from the per-platform layouts written before the unified schema.
     
-    for df, source in csv_files:
-        print(f"\nProcessing {source}...")
-        
-        if source == 'Threads':
-            # Extract from 'Comments' column
-            if 'Comments' in df.columns:
-                for idx, row in df.iterrows():
-                    if pd.notna(row['Comments']) and row['Comments'].strip():
-                        all_comments.append({
-                            'comment': row['Comments'],
-                            'source': source,
-                            'original_id': f"{source}_{idx}"
-                        })
-        
-        elif source == 'Instagram':
-            # Extract from 'text' column
-            if 'text' in df.columns:
-                for idx, row in df.iterrows():
-                    if pd.notna(row['text']) and row['text'].strip():
-                        all_comments.append({
-                            'comment': row['text'],
-                            'source': source,
-                            'original_id': row.get('comment_id', f"{source}_{idx}")
-                        })
-        
-        elif source == 'Reddit':
-            # Extract from 'comment' column
-            if 'comment' in df.columns:
-                for idx, row in df.iterrows():
-                    if pd.notna(row['comment']) and row['comment'].strip():
-                        all_comments.append({
-                            'comment': row['comment'],
-                            'source': source,
-                            'original_id': row.get('id', f"{source}_{idx}")
-                        })
-        
-        elif source == 'X':
-            # Extract from 'comments' column
-            if 'comments' in df.columns:
-                for idx, row in df.iterrows():
-                    if pd.notna(row['comments']) and row['comments'].strip():
-                        all_comments.append({
-                            'comment': row['comments'],
-                            'source': source,
-                            'original_id': row.get('postId', f"{source}_{idx}")
-                        })
-        
-        elif source.startswith('TikTok'):
-            # Extract from 'Comment Text' column, skip metadata rows
-            if 'Comment Text' in df.columns:
-                # Find the header row
-                header_found = False
-                for idx, row in df.iterrows():
-                    if header_found and pd.notna(row['Comment Text']) and row['Comment Text'].strip():
-                        all_comments.append({
-                            'comment': row['Comment Text'],
-                            'source': source,
-                            'original_id': f"{source}_{idx}"
-                        })
-                    elif row.get('Comment Number (ID)') == 'Comment Number (ID)':
-                        header_found = True
-            else:
-                # Alternative: look for comment text in other columns
-                comment_cols = [col for col in df.columns if 'comment' in col.lower() or 'text' in col.lower()]
-                if comment_cols:
-                    col_name = comment_cols[0]
-                    for idx, row in df.iterrows():
-                        if pd.notna(row[col_name]) and row[col_name].strip():
-                            all_comments.append({
-                                'comment': row[col_name],
-                                'source': source,
-                                'original_id': f"{source}_{idx}"
-                            })
+    Args:
+        df (pd.DataFrame): Frame as read from the source CSV
+        source (str): Source label
         
-        elif source == 'Facebook':
-            # Extract from appropriate column when structure is known
+    Returns:
+        List[Dict]: Records with keys comment, source, original_id (and
+            created_at where the layout has one)
+    """
+    all_comments = []
+    
+    if source == 'Threads':
+        # Extract from 'Comments' column
+        if 'Comments' in df.columns:
+            for idx, row in df.iterrows():
+                if pd.notna(row['Comments']) and row['Comments'].strip():
+                    all_comments.append({
+                        'comment': row['Comments'],
+                        'source': source,
+                        'original_id': f"{source}_{idx}"
+                    })
+    
+    elif source == 'Instagram':
+        # Extract from 'text' column
+        if 'text' in df.columns:
+            for idx, row in df.iterrows():
+                if pd.notna(row['text']) and row['text'].strip():
+                    all_comments.append({
+                        'comment': row['text'],
+                        'source': source,
+                        'original_id': row.get('comment_id', f"{source}_{idx}"),
+                        'created_at': row.get('created_at_utc', '')
+                    })
+    
+    elif source == 'Reddit':
+        # Extract from 'comment' column
+        if 'comment' in df.columns:
+            for idx, row in df.iterrows():
+                if pd.notna(row['comment']) and row['comment'].strip():
+                    all_comments.append({
+                        'comment': row['comment'],
+                        'source': source,
+                        'original_id': row.get('id', f"{source}_{idx}")
+                    })
+    
+    elif source == 'X':
+        # Extract from 'comments' column
+        if 'comments' in df.columns:
+            for idx, row in df.iterrows():
+                if pd.notna(row['comments']) and row['comments'].strip():
+                    all_comments.append({
+                        'comment': row['comments'],
+                        'source': source,
+                        'original_id': row.get('postId', f"{source}_{idx}")
+                    })
+    
+    elif source.startswith('TikTok'):
+        # Extract from 'Comment Text' column, skip metadata rows
+        if 'Comment Text' in df.columns:
+            # Find the header row
+            header_found = False
+            for idx, row in df.iterrows():
+                if header_found and pd.notna(row['Comment Text']) and row['Comment Text'].strip():
+                    all_comments.append({
+                        'comment': row['Comment Text'],
+                        'source': source,
+                        'original_id': f"{source}_{idx}"
+                    })
+                elif row.get('Comment Number (ID)') == 'Comment Number (ID)':
+                    header_found = True
+        else:
+            # Alternative: look for comment text in other columns
             comment_cols = [col for col in df.columns if 'comment' in col.lower() or 'text' in col.lower()]
             if comment_cols:
                 col_name = comment_cols[0]
@@ -283,25 +429,103 @@ def extract_comments_from_dataframes(csv_files: List[Tuple[pd.DataFrame, str]])
                             'source': source,
                             'original_id': f"{source}_{idx}"
                         })
+    
+    elif source == 'Facebook':
+        # Extract from appropriate column when structure is known
+        comment_cols = [col for col in df.columns if 'comment' in col.lower() or 'text' in col.lower()]
+        if comment_cols:
+            col_name = comment_cols[0]
+            for idx, row in df.iterrows():
+                if pd.notna(row[col_name]) and row[col_name].strip():
+                    all_comments.append({
+                        'comment': row[col_name],
+                        'source': source,
+                        'original_id': f"{source}_{idx}"
+                    })
+    
+    return all_comments
+
+def extract_comments_from_dataframes(csv_files: List[Tuple[pd.DataFrame, str]]) -> pd.DataFrame:
+    """
+    Extract comment text from different CSV structures and combine into unified format.
+    
+    Files in the unified comment layout are taken column-for-column; older
+    per-platform layouts go through legacy_comments.
+    
+    Args:
+        csv_files: List of (dataframe, source_name) tuples
         
-        print(f"Extracted {len([c for c in all_comments if c['source'] == source])} comments from {source}")
+    Returns:
+        pd.DataFrame: Combined dataframe with columns [comment, source, original_id, created_at]
+            (created_at is the raw platform value; see timestamps.normalize_timestamps)
+    """
+    frames = []
     
-    combined_df = pd.DataFrame(all_comments)
+    for df, source in csv_files:
+        print(f"\nProcessing {source}...")
+        
+        if is_unified(df):
+            extracted = unified_comments(df, source)
+        else:
+            extracted = pd.DataFrame(legacy_comments(df, source),
+                                     columns=['comment', 'source', 'original_id', 'created_at'])
+        frames.append(extracted)
+        
+        print(f"Extracted {len(extracted)} comments from {source}")
+    
+    combined_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
     print(f"\nTotal comments extracted: {len(combined_df)}")
     
     return combined_df
 
-def main():
-    """Main function to execute the text preprocessing pipeline."""
+def read_view(profile: str, path: str = DEFAULT_OUTPUT_FILE) -> list:
+    """
+    One profile's view from the preprocessed CSV, row-aligned with its other columns.
+    
+    Args:
+        profile (str): A PROFILES key
+        path (str): CSV written by main
+    
+    Returns:
+        list: Strings, or token lists for 'lda'
+    """
+    column = PROFILES[profile]
+    values = pd.read_csv(path, usecols=[column], dtype=str, keep_default_na=False)[column]
+    if profile == 'lda':
+        return [value.split() for value in values]
+    return values.tolist()
+
+def main(output_file: str = DEFAULT_OUTPUT_FILE, metrics_file: str = None, spam_files: List[str] = None,
+         profiles: List[str] = tuple(PROFILES)):
+    """
+    Main function to execute the text preprocessing pipeline.
+    
+    Args:
+        output_file (str): Where the preprocessed CSV is written
+        metrics_file (str, optional): Write per-stage timings and counters
+            here as JSON; enables the shared metrics if no caller has
+            (see instrumentation.configure)
+        spam_files (list, optional): Pattern files (see spam_filter.py);
+            comments from any platform containing one of their terms are dropped
+        profiles (list): Views to write, one column each (see PROFILES);
+            'tfidf' (cleaned_comment) is always included
+    """
+    profiles = ['tfidf'] + [p for p in PROFILES if p in profiles and p != 'tfidf']
+    if metrics_file and not metrics.enabled:
+        configure(enabled=True)
     print("=== Flood Control Comments Text Preprocessor ===\n")
     
     # Initialize preprocessor
     print("Initializing text preprocessor...")
-    preprocessor = TextPreprocessor()
+    with metrics.timer('init'):
+        preprocessor = TextPreprocessor()
     
     # Read all CSV files
     print("\nReading CSV files...")
-    csv_files = read_csv_files()
+    with metrics.timer('read'):
+        csv_files = read_csv_files()
+    metrics.count('files_read', len(csv_files))
+    metrics.count('rows_read', sum(len(df) for df, _ in csv_files))
     
     if not csv_files:
         print("No CSV files found or loaded successfully!")
@@ -309,49 +533,65 @@ def main():
     
     # Extract and combine comments
     print("\nExtracting comments from dataframes...")
-    combined_df = extract_comments_from_dataframes(csv_files)
+    with metrics.timer('extract'):
+        combined_df = extract_comments_from_dataframes(csv_files)
+    metrics.count('comments_extracted', len(combined_df))
     
     if combined_df.empty:
         print("No comments extracted!")
         return
     
+    if spam_files:
+        with metrics.timer('spam'):
+            matcher = spam_matcher(spam_files)
+            spam = matcher.mask(combined_df['comment'])
+            combined_df = combined_df[~spam]
+        metrics.count('spam_dropped', int(spam.sum()))
+        print(f"Removed {int(spam.sum())} comments matching {len(matcher)} spam terms")
+    
+    # One UTC timestamp format for every platform ('' where unknown)
+    combined_df['created_at'] = iso_strings(normalize_timestamps(combined_df))
+    
+    # Tag languages on the raw text, before stopwords are stripped
+    print(f"\nDetecting languages for {len(combined_df)} comments...")
+    with metrics.timer('language'):
+        combined_df['language'] = tag_languages(combined_df['comment'])
+    
     # Preprocess comments
     print(f"\nPreprocessing {len(combined_df)} comments...")
-    combined_df['cleaned_comment'] = combined_df['comment'].apply(preprocessor.clean_text)
+    with metrics.timer('clean'):
+        views = [preprocessor.clean_views(comment, profiles) for comment in combined_df['comment']]
+        for profile in profiles:
+            combined_df[PROFILES[profile]] = [view[profile] for view in views]
     
     # Remove empty cleaned comments
     initial_count = len(combined_df)
     combined_df = combined_df[combined_df['cleaned_comment'].str.len() > 0]
     final_count = len(combined_df)
     
+    metrics.count('empty_after_cleaning', initial_count - final_count)
     print(f"Removed {initial_count - final_count} empty comments after cleaning")
     print(f"Final dataset: {final_count} cleaned comments")
     
-    # Add statistics
-    combined_df['original_length'] = combined_df['comment'].str.len()
-    combined_df['cleaned_length'] = combined_df['cleaned_comment'].str.len()
-    combined_df['word_count'] = combined_df['cleaned_comment'].str.split().str.len()
+    # Accumulate summary statistics without adding columns to the output
+    with metrics.timer('stats'):
+        stats = CorpusStats()
+        stats.update(combined_df)
     
     # Reorder columns
-    final_columns = ['original_id', 'source', 'comment', 'cleaned_comment', 
-                    'original_length', 'cleaned_length', 'word_count']
+    final_columns = (['original_id', 'source', 'created_at', 'language', 'comment']
+                     + [PROFILES[profile] for profile in profiles])
     combined_df = combined_df[final_columns]
     
     # Save to CSV
-    output_file = r'c:\Users\Ven\Documents\Coding\Data Mining\flood-control-semantic-analysis\preprocessed_comments.csv'
-    combined_df.to_csv(output_file, index=False, encoding='utf-8')
+    with metrics.timer('write'):
+        combined_df.to_csv(output_file, index=False, encoding='utf-8')
+    metrics.count('rows_written', len(combined_df))
     
     print(f"\nPreprocessed comments saved to: {output_file}")
     
     # Print summary statistics
-    print("\n=== Summary Statistics ===")
-    print(f"Total comments: {len(combined_df)}")
-    print(f"Comments by source:")
-    print(combined_df['source'].value_counts())
-    print(f"\nAverage word count: {combined_df['word_count'].mean():.2f}")
-    print(f"Median word count: {combined_df['word_count'].median():.2f}")
-    print(f"Max word count: {combined_df['word_count'].max()}")
-    print(f"Min word count: {combined_df['word_count'].min()}")
+    stats.print_summary()
     
     # Show sample of cleaned comments
     print(f"\n=== Sample Cleaned Comments ===")
@@ -362,6 +602,36 @@ def main():
         print(f"Original: {row['comment'][:100]}{'...' if len(row['comment']) > 100 else ''}")
         print(f"Cleaned:  {row['cleaned_comment'][:100]}{'...' if len(row['cleaned_comment']) > 100 else ''}")
         print("-" * 80)
+    
+    if metrics.enabled:
+        print("\n=== Stage Timings ===")
+        print(metrics.summary())
+        if metrics_file:
+            metrics.write_report(metrics_file)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Clean and combine the scraped comments")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT_FILE)
+    parser.add_argument('--metrics', help="Time each stage and write the metrics to this JSON file")
+    parser.add_argument('--sample-every', type=int, default=100,
+                        help="Time clean_text sub-steps on one in this many comments (default: 100)")
+    parser.add_argument('--profile', nargs='?', const='text_preprocessor.prof',
+                        help="Run under cProfile and dump pstats (default: text_preprocessor.prof)")
+    parser.add_argument('--drop-spam', nargs='*', metavar='PATTERN_FILE',
+                        help="Drop comments matching these pattern files (default: topic-modelling/data/spam_terms.txt)")
+    parser.add_argument('--views', nargs='+', choices=sorted(PROFILES), default=list(PROFILES),
+                        help="Cleaned views to write (default: all; cleaned_comment is always written)")
+    args = parser.parse_args()
+    
+    spam_files = None
+    if args.drop_spam is not None:
+        spam_files = args.drop_spam or [SPAM_TERMS_FILE]
+    if args.metrics:
+        configure(enabled=True, sample_every=args.sample_every)
+    if args.profile:
+        with profile(args.profile):
+            main(args.output, args.metrics, spam_files, args.views)
+    else:
+        main(args.output, args.metrics, spam_files, args.views)
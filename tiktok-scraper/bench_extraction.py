@@ -0,0 +1,105 @@
+import asyncio
+import os
+import time
+import argparse
+from playwright.async_api import async_playwright
+
+from scraper import ALL_COMMENTS_XPATH, extract_comments, comment_record
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def comment_html(i: int) -> str:
+    return (
+        '<div class="DivCommentContentContainer">'
+        f'<a href="https://www.tiktok.com/@user{i}"><span><img src="https://example.com/pic{i}.jpg"></span></a>'
+        f'<div><a>Nickname {i}</a><p>Comment number {i} tungkol sa flood control</p><p><span>{i % 12 + 1}-{i % 28 + 1}</span></p></div>'
+        f'<div>{i % 500}</div>'
+        '</div>'
+    )
+
+
+def write_fixture(n_comments: int, path: str) -> str:
+    """
+    Write a static page shaped like a TikTok post with `n_comments` comments.
+
+    Every fifth comment is a reply so the Is Reply column is exercised too.
+    """
+    items = []
+    for i in range(1, n_comments + 1):
+        if i % 5 == 0:
+            items.append(f'<div class="DivCommentItemWrapper"><div class="DivReplyContainer">{comment_html(i)}</div></div>')
+        else:
+            items.append(f'<div class="DivCommentItemWrapper">{comment_html(i)}</div>')
+
+    html = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>fixture</title></head>
+<body>
+<span class="SpanUniqueId">publisher</span>
+<span class="SpanOtherInfos">Publisher Name · 9-18</span>
+<div>Fixture description</div><h4 class="H4Link">#floodcontrol</h4>
+<strong class="StrongText">1200</strong><strong class="StrongText">{n_comments}</strong><strong class="StrongText">34</strong>
+<div class="DivCommentListContainer">
+{''.join(items)}
+</div>
+</body></html>
+"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
+    return path
+
+
+async def legacy_extract(page, limit: int):
+    """The previous per-comment approach: ~7 awaited round-trips per comment."""
+    comments = await page.locator(ALL_COMMENTS_XPATH).all()
+    for c in comments[:limit]:
+        await c.locator("./div[1]/a").first.inner_text()
+        await c.locator("./a").first.get_attribute("href")
+        await c.locator("./div[1]/p").first.inner_text()
+        await c.locator("./div[1]/p[2]/span").first.inner_text()
+        await c.locator("./div[2]").first.inner_text()
+        await c.locator("./a/span/img").first.get_attribute("src")
+        await c.evaluate("el => el.parentElement.className")
+    return min(limit, len(comments))
+
+
+async def run(n_comments: int, repeats: int, legacy_sample: int):
+    fixture = os.path.join(FIXTURE_DIR, f"tiktok_{n_comments}_comments.html")
+    if not os.path.exists(fixture):
+        write_fixture(n_comments, fixture)
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.goto(f"file://{fixture}")
+
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            comments = await extract_comments(page)
+            rows = [comment_record(idx, c, fixture) for idx, c in enumerate(comments, start=1)]
+            timings.append(time.perf_counter() - start)
+
+        best = min(timings)
+        print(f"Bulk extraction: {len(rows)} comments in {best:.3f}s ({len(rows) / best:,.0f} comments/s, best of {repeats})")
+
+        if legacy_sample:
+            start = time.perf_counter()
+            sampled = await legacy_extract(page, legacy_sample)
+            per_comment = (time.perf_counter() - start) / sampled
+            projected = per_comment * len(rows)
+            print(f"Per-comment locators: {per_comment * 1000:.1f} ms/comment, projected {projected:.1f}s for {len(rows)} comments "
+                  f"({projected / best:.0f}x slower)")
+
+        await browser.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark TikTok comment extraction on a saved HTML fixture")
+    parser.add_argument("--comments", type=int, default=5000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--legacy-sample", type=int, default=200,
+                        help="Comments to time with the old per-comment locators (0 to skip)")
+    args = parser.parse_args()
+    asyncio.run(run(args.comments, args.repeats, args.legacy_sample))
@@ -1,8 +1,17 @@
 import asyncio
-import csv
-from playwright.async_api import async_playwright
+import json
+import os
+import re
+import sys
+import time
+import argparse
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 from datetime import datetime
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from scraper_core import bounded_map, rate_limiter
+from comment_schema import Comment, CommentWriter
+
 # XPaths from your JS
 COMMENTS_DIV_XPATH = '//div[contains(@class, "DivCommentListContainer")]'
 ALL_COMMENTS_XPATH = '//div[contains(@class, "DivCommentContentContainer")]'
@@ -13,6 +22,35 @@ LIKES_COMMENTS_SHARES_XPATH = "//strong[contains(@class, 'StrongText')]"
 DESCRIPTION_XPATH = '//h4[contains(@class, "H4Link")]/preceding-sibling::div'
 VIEW_MORE_XPATH = '//p[contains(@class, "PReplyAction") and contains(., "View")]'
 
+# Count XPath matches in the page, and wait until that count grows past a value
+COUNT_JS = "xpath => document.evaluate(`count(${xpath})`, document, null, XPathResult.NUMBER_TYPE, null).numberValue"
+COUNT_ABOVE_JS = "([xpath, n]) => document.evaluate(`count(${xpath})`, document, null, XPathResult.NUMBER_TYPE, null).numberValue > n"
+
+# Reads every field of every comment in one round-trip; paths mirror the per-comment XPaths
+EXTRACT_COMMENTS_JS = """
+els => els.map(el => {
+    const x = path => document.evaluate(path, el, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    const nickname = x('./div[1]/a');
+    const userLink = x('./a');
+    const text = x('./div[1]/p');
+    const time = x('./div[1]/p[2]/span');
+    const likes = x('./div[2]');
+    const pic = x('./a/span/img');
+    if (!nickname || !userLink || !text || !time || !likes) {
+        return {error: 'missing comment fields'};
+    }
+    return {
+        nickname: nickname.innerText,
+        user_url: userLink.getAttribute('href') || '',
+        text: text.innerText,
+        time: time.innerText,
+        likes: likes.innerText,
+        pic: pic ? pic.getAttribute('src') : null,
+        is_reply: (el.parentElement.className || '').includes('Reply'),
+    };
+})
+"""
+
 
 def format_date(str_date: str):
     """Convert TikTok style date to DD-MM-YYYY"""
@@ -28,97 +66,234 @@ def format_date(str_date: str):
     return "Malformed date"
 
 
-async def scrape_tiktok_comments(url: str, output_csv: str):
+async def count_matches(page, xpath: str) -> int:
+    return int(await page.evaluate(COUNT_JS, xpath))
+
+
+async def wait_for_more(page, xpath: str, current: int, timeout: int) -> bool:
+    """Wait until more elements match `xpath` than `current`. Returns False on timeout."""
+    try:
+        await page.wait_for_function(COUNT_ABOVE_JS, arg=[xpath, current], timeout=timeout)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+
+async def load_all_comments(page, idle_rounds: int = 3, timeout: int = 3000):
+    """
+    Scroll until no new 1st level comments arrive.
+
+    Instead of polling on a fixed sleep, each round waits for the rendered
+    comment count to change; `idle_rounds` consecutive timeouts end the loop.
+    """
+    count = await count_matches(page, ALL_COMMENTS_XPATH)
+    misses = 0
+    while misses < idle_rounds:
+        if count:
+            await page.locator(ALL_COMMENTS_XPATH).nth(count - 1).scroll_into_view_if_needed()
+        else:
+            await page.locator(COMMENTS_DIV_XPATH).scroll_into_view_if_needed()
+
+        if await wait_for_more(page, ALL_COMMENTS_XPATH, count, timeout):
+            misses = 0
+        else:
+            await page.locator(COMMENTS_DIV_XPATH).scroll_into_view_if_needed()
+            misses += 1
+        count = await count_matches(page, ALL_COMMENTS_XPATH)
+    print("Opened all 1st level comments")
+
+
+async def expand_replies(page, timeout: int = 3000):
+    """Click every 'View replies' button until none are left or clicking stops loading anything."""
+    while True:
+        buttons = await page.locator(VIEW_MORE_XPATH).all()
+        if not buttons:
+            break
+
+        before = await count_matches(page, ALL_COMMENTS_XPATH)
+        for btn in buttons:
+            await btn.click()
+
+        if not await wait_for_more(page, ALL_COMMENTS_XPATH, before, timeout):
+            try:
+                await page.wait_for_load_state("networkidle", timeout=timeout)
+            except PlaywrightTimeoutError:
+                pass
+            if await count_matches(page, ALL_COMMENTS_XPATH) == before:
+                break
+    print("Opened all 2nd level comments")
+
+
+async def extract_comments(page):
+    """Collect the fields of every rendered comment with a single evaluate_all call."""
+    return await page.locator(ALL_COMMENTS_XPATH).evaluate_all(EXTRACT_COMMENTS_JS)
+
+
+def parse_count(text: str) -> int:
+    """Turn TikTok counters like '812', '1.2K' or '3M' into integers"""
+    text = (text or "").strip().upper().replace(",", "")
+    multiplier = {"K": 1_000, "M": 1_000_000, "B": 1_000_000_000}.get(text[-1:], 1)
+    if multiplier > 1:
+        text = text[:-1]
+    try:
+        return int(float(text) * multiplier)
+    except ValueError:
+        return 0
+
+
+def comment_record(idx: int, comment: dict, url: str) -> Comment:
+    """Turn one extracted comment into a unified Comment record."""
+    user = comment["user_url"].split("/")[3].lstrip("@")
+    return Comment(
+        platform="tiktok",
+        post_url=url,
+        comment_id=str(idx),
+        username=user,
+        text=comment["text"],
+        created_at=format_date(comment["time"]),
+        like_count=parse_count(comment["likes"]),
+        is_reply=int(bool(comment["is_reply"])),
+    )
+
+
+async def scrape_tiktok_comments(url: str, output_csv: str, headless: bool = False):
+    """Scrape a single post in its own browser (interactive mode)."""
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
+        browser = await p.chromium.launch(headless=headless)
         page = await browser.new_page()
-        await page.goto(url)
-
-        # Scroll to load all 1st level comments
-        loading_buffer = 30
-        prev_len = 0
-        while loading_buffer > 0:
-            comments = await page.locator(ALL_COMMENTS_XPATH).all()
-            if comments:
-                await comments[-1].scroll_into_view_if_needed()
-
-            new_len = len(comments)
-            if new_len != prev_len:
-                loading_buffer = 15
-            else:
-                await page.locator(COMMENTS_DIV_XPATH).scroll_into_view_if_needed()
-                loading_buffer -= 1
-
-            prev_len = new_len
-            await page.wait_for_timeout(300)
-        print("Opened all 1st level comments")
-
-        # Expand replies (2nd level comments)
-        loading_buffer = 5
-        while loading_buffer > 0:
-            read_more_buttons = await page.locator(VIEW_MORE_XPATH).all()
-            for btn in read_more_buttons:
-                await btn.click()
-            await page.wait_for_timeout(500)
-            if not read_more_buttons:
-                loading_buffer -= 1
+        try:
+            await scrape_page(page, url, output_csv)
+        finally:
+            await browser.close()
+
+
+async def scrape_page(page, url: str, output_csv: str):
+    """Scrape one post using an already open page and write its CSV."""
+    await page.goto(url)
+
+    await load_all_comments(page)
+    await expand_replies(page)
+
+    # Extract metadata
+    publisher = await page.locator(PUBLISHER_PROFILE_XPATH).first.inner_text()
+    nickname_and_time = (await page.locator(NICKNAME_TIME_XPATH).first.inner_text()).replace("\n", " ").split(" · ")
+    description = await page.locator(DESCRIPTION_XPATH).first.inner_text()
+
+    strong_tags = [await el.inner_text() for el in await page.locator(LIKES_COMMENTS_SHARES_XPATH).all()]
+    likes_comments_shares = strong_tags[-3:] if strong_tags[-3].isdigit() else strong_tags[-2:]
+    likes = likes_comments_shares[0]
+    total_comments = likes_comments_shares[1]
+    shares = likes_comments_shares[2] if len(likes_comments_shares) > 2 else "N/A"
+
+    comments = await extract_comments(page)
+    level2_count = await count_matches(page, LEVEL2_COMMENTS_XPATH)
+
+    # Post-level metadata goes to a JSON sidecar; the CSV holds only comment records
+    metadata = {
+        "scraped_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "post_url": url,
+        "publisher_nickname": nickname_and_time[0],
+        "publisher": publisher,
+        "publisher_url": f"https://www.tiktok.com/@{publisher}",
+        "publish_time": format_date(nickname_and_time[1]),
+        "likes": likes,
+        "shares": shares,
+        "description": description,
+        "first_level_comments": len(comments) - level2_count,
+        "second_level_comments": level2_count,
+        "rendered_comments": len(comments),
+        "reported_comments": total_comments,
+    }
+    with open(metadata_path_for(output_csv), "w", encoding="utf-8") as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+    writer = CommentWriter(output_csv, fresh=True)
+    try:
+        for idx, c in enumerate(comments, start=1):
+            try:
+                if "error" in c:
+                    raise ValueError(c["error"])
+                writer.add(comment_record(idx, c, url))
+            except Exception as e:
+                print(f"Error parsing comment {idx}: {e}")
+    finally:
+        writer.close()
+
+    print(f"Saved to {output_csv}")
+
+
+def metadata_path_for(output_csv: str) -> str:
+    """Sidecar JSON holding the post metadata for a comments CSV."""
+    return os.path.splitext(output_csv)[0] + "_post.json"
+
+
+def output_path_for(url: str, output_dir: str, idx: int) -> str:
+    """Per-post CSV name based on the TikTok video id when present."""
+    match = re.search(r'/video/(\d+)', url)
+    name = match.group(1) if match else str(idx)
+    return os.path.join(output_dir, f"tiktok_{name}_comments.csv")
+
+
+async def scrape_many(urls, output_dir: str = ".", concurrency: int = 4, headless: bool = True):
+    """
+    Scrape many posts with one shared browser context.
+
+    At most `concurrency` pages are open at once and page loads are paced by
+    the shared TikTok rate limiter. Works the same against file:// URLs of
+    saved HTML fixtures.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    results = {}
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+        context = await browser.new_context()
+
+        async def worker(job):
+            idx, url = job
+            page = await context.new_page()
+            output_csv = output_path_for(url, output_dir, idx)
+            try:
+                await scrape_page(page, url, output_csv)
+                return output_csv
+            finally:
+                await page.close()
+
+        # Local fixtures are not subject to TikTok's rate limit
+        limiter = None if all(url.startswith("file://") for url in urls) else rate_limiter("tiktok")
+
+        start = time.perf_counter()
+        async for (_, url), output_csv, error in bounded_map(worker, enumerate(urls, start=1), concurrency, limiter):
+            if error:
+                print(f"Error scraping {url}: {error}")
             else:
-                loading_buffer = 5
-        print("Opened all 2nd level comments")
-
-        # Extract metadata
-        publisher = await page.locator(PUBLISHER_PROFILE_XPATH).first.inner_text()
-        nickname_and_time = (await page.locator(NICKNAME_TIME_XPATH).first.inner_text()).replace("\n", " ").split(" · ")
-        description = await page.locator(DESCRIPTION_XPATH).first.inner_text()
-
-        strong_tags = [await el.inner_text() for el in await page.locator(LIKES_COMMENTS_SHARES_XPATH).all()]
-        likes_comments_shares = strong_tags[-3:] if strong_tags[-3].isdigit() else strong_tags[-2:]
-        likes = likes_comments_shares[0]
-        total_comments = likes_comments_shares[1]
-        shares = likes_comments_shares[2] if len(likes_comments_shares) > 2 else "N/A"
-
-        comments = await page.locator(ALL_COMMENTS_XPATH).all()
-        level2_count = len(await page.locator(LEVEL2_COMMENTS_XPATH).all())
-
-        # Write to CSV
-        with open(output_csv, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["Now", datetime.now().strftime("%Y-%m-%d %H:%M:%S")])
-            writer.writerow(["Post URL", url])
-            writer.writerow(["Publisher Nickname", nickname_and_time[0]])
-            writer.writerow(["Publisher @", publisher])
-            writer.writerow(["Publisher URL", f"https://www.tiktok.com/@{publisher}"])
-            writer.writerow(["Publish Time", format_date(nickname_and_time[1])])
-            writer.writerow(["Post Likes", likes])
-            writer.writerow(["Post Shares", shares])
-            writer.writerow(["Description", description])
-            writer.writerow(["Number of 1st level comments", len(comments) - level2_count])
-            writer.writerow(["Number of 2nd level comments", level2_count])
-            writer.writerow(["Total Comments (rendered)", len(comments)])
-            writer.writerow(["Total Comments (TikTok)", total_comments])
-            writer.writerow([])
-            writer.writerow(["ID", "Nickname", "User @", "User URL", "Comment Text", "Time", "Likes", "Profile Pic", "Is Reply"])
-
-            for idx, c in enumerate(comments, start=1):
-                try:
-                    nickname = await c.locator("./div[1]/a").first.inner_text()
-                    user_url = await c.locator("./a").first.get_attribute("href")
-                    user = user_url.split("/")[3].lstrip("@")
-                    comment_text = await c.locator("./div[1]/p").first.inner_text()
-                    time_text = await c.locator("./div[1]/p[2]/span").first.inner_text()
-                    comment_time = format_date(time_text)
-                    likes_count = await c.locator("./div[2]").first.inner_text()
-                    pic = await c.locator("./a/span/img").first.get_attribute("src") or "N/A"
-                    is_reply = "Reply" in (await c.evaluate("el => el.parentElement.className"))
-
-                    writer.writerow([idx, nickname, user, f"https://www.tiktok.com/@{user}", comment_text, comment_time, likes_count, pic, "Yes" if is_reply else "No"])
-                except Exception as e:
-                    print(f"Error parsing comment {idx}: {e}")
-
-        print(f"Saved to {output_csv}")
+                results[url] = output_csv
+        elapsed = time.perf_counter() - start
+
+        await context.close()
         await browser.close()
 
+    per_minute = len(results) / elapsed * 60 if elapsed else 0.0
+    print(f"\nScraped {len(results)}/{len(urls)} posts in {elapsed:.1f}s ({per_minute:.1f} posts/min, concurrency={concurrency})")
+    return results
+
 
 if __name__ == "__main__":
-    url = input("Enter TikTok post URL: ").strip()
-    asyncio.run(scrape_tiktok_comments(url, "tiktok_comments.csv"))
+    parser = argparse.ArgumentParser(description="Scrape TikTok comments")
+    parser.add_argument("urls", nargs="*", help="Post URLs (or file:// fixtures)")
+    parser.add_argument("--urls-file", help="File with one URL per line")
+    parser.add_argument("--output-dir", default=".", help="Directory for per-post CSVs in batch mode")
+    parser.add_argument("--concurrency", type=int, default=4, help="Pages scraped at the same time")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    args = parser.parse_args()
+
+    urls = list(args.urls)
+    if args.urls_file:
+        with open(args.urls_file, "r", encoding="utf-8") as f:
+            urls.extend(line.strip() for line in f if line.strip())
+
+    if urls:
+        asyncio.run(scrape_many(urls, args.output_dir, args.concurrency, headless=not args.headed))
+    else:
+        url = input("Enter TikTok post URL: ").strip()
+        asyncio.run(scrape_tiktok_comments(url, "tiktok_comments.csv"))
@@ -0,0 +1,79 @@
+import pandas as pd
+
+# X (Twitter) snowflake ids carry milliseconds since this epoch in their top 41 bits
+TWITTER_EPOCH_MS = 1288834974657
+SNOWFLAKE_MAX = 2 ** 63 - 1
+
+# format_date in the TikTok scraper writes dates as DD-MM-YYYY
+TIKTOK_DATE_FORMAT = '%d-%m-%Y'
+
+
+def snowflake_times(ids: pd.Series) -> pd.Series:
+    """
+    Creation time encoded in X status ids: ms = (id >> 22) + TWITTER_EPOCH_MS.
+
+    Non-numeric ids (e.g. 'X_12' fallbacks) and ids outside the signed
+    64-bit range snowflakes use give NaT.
+    """
+    ids = ids.astype(str)
+    valid = ids.str.fullmatch(r'\d{8,19}')
+    # 19-digit strings can exceed int64; compare as uint64 before converting
+    digits = ids[valid].astype('uint64')
+    valid[valid] = (digits <= SNOWFLAKE_MAX).to_numpy()
+    ms = pd.Series(pd.NA, index=ids.index, dtype='Int64')
+    # Parse the digits directly: a float round-trip would lose the low bits
+    ms[valid] = (ids[valid].astype('int64').to_numpy() >> 22) + TWITTER_EPOCH_MS
+    return pd.to_datetime(ms, unit='ms', utc=True)
+
+
+def parse_timestamps(values: pd.Series, fmt: str = None) -> pd.Series:
+    """Parse ISO 8601 strings (or `fmt` when given) to UTC; anything else gives NaT."""
+    values = values.fillna('').astype(str)
+    if fmt:
+        return pd.to_datetime(values, format=fmt, utc=True, errors='coerce')
+    return pd.to_datetime(values, format='ISO8601', utc=True, errors='coerce')
+
+
+def normalize_timestamps(df: pd.DataFrame, created_col: str = 'created_at',
+                         source_col: str = 'source', id_col: str = 'original_id') -> pd.Series:
+    """
+    One UTC timestamp per comment, whatever platform it came from.
+
+    - Instagram, Reddit (unified files) and Facebook: ISO `created_at`
+    - TikTok: `created_at` as written by format_date (DD-MM-YYYY), or ISO
+      once normalized; relative times such as '2h ago' cannot be resolved
+      and give NaT
+    - X: the snowflake id when no `created_at` is present. Older exports only
+      keep the parent post's id, so this is the post's time, not the reply's
+    - Reddit base36 ids and Threads rows carry no time and give NaT
+
+    Args:
+        df (pd.DataFrame): Comments with source and id columns, and
+            optionally a raw created_at column
+        created_col (str): Raw timestamp column
+        source_col (str): Platform / source label column
+        id_col (str): Comment or post id column
+
+    Returns:
+        pd.Series: datetime64[ns, UTC], NaT where the time is unknown
+    """
+    created = df[created_col] if created_col in df.columns else pd.Series('', index=df.index)
+    result = parse_timestamps(created)
+
+    source = df[source_col].astype(str)
+    tiktok = source.str.startswith('TikTok')
+    # Rows already normalized (e.g. re-read from preprocessed_comments.csv)
+    # parsed as ISO above; only the scraper's DD-MM-YYYY dates are left
+    tiktok_raw = tiktok & result.isna()
+    if tiktok_raw.any():
+        result[tiktok_raw] = parse_timestamps(created[tiktok_raw], TIKTOK_DATE_FORMAT)
+
+    x_missing = (source == 'X') & result.isna()
+    if x_missing.any() and id_col in df.columns:
+        result[x_missing] = snowflake_times(df.loc[x_missing, id_col])
+    return result
+
+
+def iso_strings(timestamps: pd.Series) -> pd.Series:
+    """ISO 8601 UTC strings for CSV output, '' where the time is unknown."""
+    return timestamps.dt.strftime('%Y-%m-%dT%H:%M:%S+00:00').fillna('')
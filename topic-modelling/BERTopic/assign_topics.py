@@ -0,0 +1,239 @@
+"""
+Assign topics to new comments with a saved BERTopic model, without refitting.
+
+The model is loaded once and comments are processed in chunks: embeddings
+come from a persistent cache where possible, topics from
+BERTopic.transform, and each chunk is appended to a Parquet file.
+
+    # One-off: convert the pickled model from BERT.ipynb to safetensors
+    python assign_topics.py export bertopic_model bertopic_safetensors
+
+    python assign_topics.py assign ../../preprocessed_comments.csv --model bertopic_safetensors
+
+Pickled models keep UMAP and the HDBSCAN model fitted with
+prediction_data=True, so transform places new comments with HDBSCAN's
+approximate_predict. Safetensors models load much faster but keep only
+the topic embeddings, so transform assigns each comment to the most
+similar topic embedding instead.
+"""
+import argparse
+import hashlib
+import os
+import time
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODEL = os.path.join(SCRIPT_DIR, 'bertopic_safetensors')
+DEFAULT_CACHE = os.path.join(SCRIPT_DIR, 'embedding_cache')
+# Embedding model used in BERT.ipynb
+EMBEDDING_MODEL = 'paraphrase-multilingual-MiniLM-L12-v2'
+
+# Input columns carried over to the output when present
+PASSTHROUGH_COLUMNS = ['original_id', 'source', 'created_at']
+
+
+def export_model(pickle_path: str, output_dir: str, embedding_model: str = EMBEDDING_MODEL) -> None:
+    """
+    Re-save a pickled BERTopic model with safetensors serialization.
+
+    Args:
+        pickle_path (str): Model saved by topic_model.save(path)
+        output_dir (str): Directory for the safetensors model
+        embedding_model (str): Sentence-transformers name stored as a
+            pointer, so loading does not pickle the encoder
+    """
+    from bertopic import BERTopic
+
+    model = BERTopic.load(pickle_path)
+    model.save(output_dir, serialization='safetensors', save_ctfidf=True,
+               save_embedding_model=embedding_model)
+    print(f"Saved {pickle_path} as safetensors to {output_dir}")
+
+
+def load_topic_model(path: str, embedding_model: Optional[str] = None):
+    """
+    Load a saved BERTopic model.
+
+    Returns:
+        tuple: (model, load seconds)
+    """
+    from bertopic import BERTopic
+
+    start = time.perf_counter()
+    if embedding_model:
+        model = BERTopic.load(path, embedding_model=embedding_model)
+    else:
+        model = BERTopic.load(path)
+    elapsed = time.perf_counter() - start
+    mode = 'HDBSCAN approximate_predict' if has_cluster_model(model) else 'topic-embedding similarity'
+    print(f"Loaded {path} in {elapsed:.2f}s ({len(model.get_topic_info())} topics, assignment via {mode})")
+    return model, elapsed
+
+
+def has_cluster_model(model) -> bool:
+    """True when the fitted HDBSCAN model (with prediction data) survived serialization."""
+    return getattr(getattr(model, 'hdbscan_model', None), 'prediction_data_', None) is not None
+
+
+class EmbeddingCache:
+    """
+    Embeddings keyed by a hash of the comment text, persisted as two .npy files.
+
+    Re-running assignment over a growing export only encodes comments that
+    have not been seen before.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE):
+        self.path = path
+        self.index = {}
+        self.vectors: List[np.ndarray] = []
+        self.dirty = False
+        keys_file, vectors_file = f"{path}.keys.npy", f"{path}.vectors.npy"
+        if os.path.exists(keys_file) and os.path.exists(vectors_file):
+            keys = np.load(keys_file, allow_pickle=False)
+            vectors = np.load(vectors_file, allow_pickle=False)
+            self.vectors = list(vectors)
+            self.index = {key: row for row, key in enumerate(keys.tolist())}
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+    def embed(self, texts: List[str], encode) -> np.ndarray:
+        """
+        Embeddings for `texts`, calling encode(list_of_texts) only for cache misses.
+        """
+        keys = [self.key(t) for t in texts]
+        missing = list(dict.fromkeys(k for k in keys if k not in self.index))
+        if missing:
+            first = {}
+            for key, text in zip(keys, texts):
+                first.setdefault(key, text)
+            encoded = encode([first[k] for k in missing])
+            for key, vector in zip(missing, encoded):
+                self.index[key] = len(self.vectors)
+                self.vectors.append(np.asarray(vector, dtype=np.float32))
+            self.dirty = True
+        return np.vstack([self.vectors[self.index[k]] for k in keys])
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        keys = sorted(self.index, key=self.index.get)
+        np.save(f"{self.path}.keys.npy", np.array(keys))
+        np.save(f"{self.path}.vectors.npy", np.vstack(self.vectors))
+        self.dirty = False
+
+
+def assign_topics(model, texts: List[str], cache: Optional[EmbeddingCache] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Topic and probability per comment.
+
+    Args:
+        model: Loaded BERTopic model
+        texts (list): Comment texts
+        cache (EmbeddingCache, optional): Reused across calls and runs
+
+    Returns:
+        tuple: (topic ids, probability of the assigned topic)
+    """
+    def encode(batch):
+        return model.embedding_model.embed_documents(batch, verbose=False)
+
+    embeddings = cache.embed(texts, encode) if cache is not None else encode(texts)
+    topics, probs = model.transform(texts, embeddings=embeddings)
+    topics = np.asarray(topics)
+    if probs is None:
+        return topics, np.full(len(topics), np.nan, dtype=np.float32)
+    probs = np.asarray(probs)
+    if probs.ndim == 2:
+        # calculate_probabilities=True gives the full topic distribution;
+        # keep the probability of the chosen topic (0 for outliers)
+        picked = np.where(topics >= 0, probs[np.arange(len(topics)), np.clip(topics, 0, None)], 0.0)
+        return topics, picked.astype(np.float32)
+    return topics, probs.astype(np.float32)
+
+
+def iter_chunks(path: str, column: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Non-empty comments of a CSV, `chunksize` rows at a time."""
+    for chunk in pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunksize):
+        chunk = chunk[chunk[column].str.strip() != '']
+        if not chunk.empty:
+            yield chunk
+
+
+def assign_file(model, input_path: str, output_path: str, column: str = 'comment',
+                chunksize: int = 1000, cache: Optional[EmbeddingCache] = None) -> int:
+    """
+    Stream a comment CSV through the model into a Parquet file.
+
+    Output columns: the PASSTHROUGH_COLUMNS present in the input, the
+    comment text, `topic` and `topic_probability`.
+
+    Returns:
+        int: Comments assigned
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    total = 0
+    start = time.perf_counter()
+    try:
+        for chunk in iter_chunks(input_path, column, chunksize):
+            topics, probs = assign_topics(model, chunk[column].tolist(), cache)
+            out = chunk[[c for c in PASSTHROUGH_COLUMNS if c in chunk.columns] + [column]].copy()
+            out['topic'] = topics.astype(np.int32)
+            out['topic_probability'] = probs
+            table = pa.Table.from_pandas(out, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, table.schema)
+            writer.write_table(table)
+            total += len(out)
+            elapsed = time.perf_counter() - start
+            print(f"Assigned {total} comments ({total / elapsed if elapsed else 0:,.0f} comments/s)")
+    finally:
+        if writer is not None:
+            writer.close()
+        if cache is not None:
+            cache.save()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assign BERTopic topics to new comments")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export = commands.add_parser('export', help="Convert a pickled model to safetensors")
+    export.add_argument('pickle_path')
+    export.add_argument('output_dir')
+    export.add_argument('--embedding-model', default=EMBEDDING_MODEL)
+
+    assign = commands.add_parser('assign', help="Assign topics to a comment CSV")
+    assign.add_argument('input', help="CSV with a comment column, e.g. preprocessed_comments.csv")
+    assign.add_argument('--model', default=DEFAULT_MODEL)
+    assign.add_argument('--embedding-model', help="Override the embedding model stored with the topic model")
+    assign.add_argument('--column', default='comment')
+    assign.add_argument('--output', default='topic_assignments.parquet')
+    assign.add_argument('--chunksize', type=int, default=1000)
+    assign.add_argument('--cache', default=DEFAULT_CACHE, help="Embedding cache prefix ('' to disable)")
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        export_model(args.pickle_path, args.output_dir, args.embedding_model)
+        return
+
+    model, load_seconds = load_topic_model(args.model, args.embedding_model)
+    cache = EmbeddingCache(args.cache) if args.cache else None
+    start = time.perf_counter()
+    total = assign_file(model, args.input, args.output, args.column, args.chunksize, cache)
+    elapsed = time.perf_counter() - start
+    print(f"Cold load: {load_seconds:.2f}s; assigned {total} comments in {elapsed:.2f}s "
+          f"({total / elapsed if elapsed else 0:,.0f} comments/s) -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
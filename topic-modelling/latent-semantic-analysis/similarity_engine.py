@@ -0,0 +1,137 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows so that dot products are cosine similarities."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _topk_block(vectors: np.ndarray, start: int, stop: int, k: int,
+                include_self: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the top-k neighbours for rows [start, stop).
+
+    Only a (stop - start) x N similarity block is ever alive, so peak memory
+    is bounded by block_size * N instead of N * N.
+    """
+    block = vectors[start:stop] @ vectors.T
+    rows = np.arange(stop - start)
+
+    if not include_self:
+        block[rows, rows + start] = -np.inf
+
+    # argpartition is O(N) per row; only the k survivors get sorted
+    top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+    scores = block[rows[:, None], top]
+    order = np.argsort(-scores, axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    scores = np.take_along_axis(scores, order, axis=1)
+    return top, scores
+
+
+def build_topk_graph(vectors: np.ndarray, k: int = 10, block_size: int = 2048,
+                     n_jobs: int = 1, normalized: bool = False,
+                     include_self: bool = False) -> sparse.csr_matrix:
+    """
+    Build a sparse top-k cosine similarity graph over document vectors.
+
+    Args:
+        vectors: Dense (n_docs, n_components) matrix, e.g. the LSA output
+        k (int): Number of neighbours to keep per document
+        block_size (int): Number of query rows scored at once
+        n_jobs (int): Worker threads; numpy releases the GIL inside matmul
+        normalized (bool): Set when rows are already L2-normalized
+        include_self (bool): Keep each document as its own neighbour
+
+    Returns:
+        sparse.csr_matrix: (n_docs, n_docs) matrix with exactly k non-zeros
+        per row, ordered by descending similarity
+    """
+    vectors = np.asarray(vectors, dtype=np.float32) if normalized else _normalize_rows(vectors)
+    n_docs = vectors.shape[0]
+    max_k = n_docs if include_self else n_docs - 1
+    k = max(0, min(k, max_k))
+
+    if k == 0:
+        # No neighbours to keep (k=0 or a single document)
+        return sparse.csr_matrix((n_docs, n_docs), dtype=np.float32)
+
+    indices = np.empty(n_docs * k, dtype=np.int32)
+    data = np.empty(n_docs * k, dtype=np.float32)
+    indptr = np.arange(0, n_docs * k + 1, k, dtype=np.int64)
+
+    def fill(start: int) -> None:
+        stop = min(start + block_size, n_docs)
+        top, scores = _topk_block(vectors, start, stop, k, include_self)
+        # Each block owns a disjoint slice of the output buffers
+        indices[start * k:stop * k] = top.ravel()
+        data[start * k:stop * k] = scores.ravel()
+
+    starts = range(0, n_docs, block_size)
+    if n_jobs > 1:
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            list(executor.map(fill, starts))
+    else:
+        for start in starts:
+            fill(start)
+
+    return sparse.csr_matrix((data, indices, indptr), shape=(n_docs, n_docs))
+
+
+def neighbours(graph: sparse.csr_matrix, doc_index: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return (indices, similarities) of a document's neighbours, best first.
+    """
+    start, stop = graph.indptr[doc_index], graph.indptr[doc_index + 1]
+    return graph.indices[start:stop], graph.data[start:stop]
+
+
+def save_topk_graph(graph: sparse.csr_matrix, path: str) -> str:
+    """Write the similarity graph as a compressed .npz file."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    sparse.save_npz(path, graph, compressed=True)
+    return path
+
+
+def load_topk_graph(path: str) -> sparse.csr_matrix:
+    """Load a similarity graph written by save_topk_graph."""
+    return sparse.load_npz(path).tocsr()
+
+
+def topk_graph_for_lsa(lsa_matrix: np.ndarray, k: int = 10, block_size: int = 2048,
+                       n_jobs: Optional[int] = None,
+                       output_path: Optional[str] = None) -> sparse.csr_matrix:
+    """
+    Convenience wrapper used by the LSA notebook.
+
+    Args:
+        lsa_matrix: Document-topic matrix from TruncatedSVD (normalized or not)
+        k (int): Neighbours to keep per document
+        block_size (int): Query rows scored per block
+        n_jobs (int, optional): Worker threads, defaults to the CPU count
+        output_path (str, optional): Where to save the compressed graph
+
+    Returns:
+        sparse.csr_matrix: Top-k similarity graph
+    """
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+
+    graph = build_topk_graph(lsa_matrix, k=k, block_size=block_size, n_jobs=n_jobs)
+    print(f"Built top-{k} similarity graph: {graph.shape[0]} documents, {graph.nnz} edges")
+
+    if output_path:
+        save_topk_graph(graph, output_path)
+        print(f"Similarity graph saved to: {output_path}")
+
+    return graph
@@ -1,31 +1,160 @@
+import os
+import csv
+import glob
+import time
+import argparse
 import pandas as pd
 
-# Load the CSV file (skip the first 3 metadata rows)
-file_path = "./MergedXComments.csv"
-df = pd.read_csv(file_path, skiprows=3)
-
-# Keep only the relevant columns
+# Columns read from the raw exports; everything else is never parsed
 needed_cols = ["postUrl", "postId", "replyText"]
-df_filtered = df[needed_cols].copy()
 
-# Extract postId from postUrl (numeric part after /status/)
-df_filtered["postId"] = df_filtered["postUrl"].str.extract(r"status/(\d+)")
 
-# Remove @"user" mentions from replyText
-df_filtered["replyText"] = (
-    df_filtered["replyText"]
-    .str.replace(r"@\w+", "", regex=True)  # remove mentions
-    .str.strip()
-)
+def find_header_row(file_path, max_lines=20):
+    """
+    Return how many lines precede the header.
+
+    Hand-merged exports (MergedXComments.csv) start with 3 metadata rows,
+    while raw exports start directly with the header.
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        for idx, line in enumerate(f):
+            if idx >= max_lines:
+                break
+            # Parse as CSV so quoted cells containing commas stay one column
+            columns = next(csv.reader([line.lstrip('\ufeff').rstrip("\r\n")]), [])
+            if columns[:1] == ["postUrl"] and all(col in columns for col in needed_cols):
+                return idx
+    raise ValueError(f"no export header in the first {max_lines} lines")
+
+
+def clean_chunk(df):
+    """Extract postId from postUrl and strip @mentions from the reply text"""
+    df_filtered = df[needed_cols].copy()
+
+    # Extract postId from postUrl (numeric part after /status/)
+    df_filtered["postId"] = df_filtered["postUrl"].str.extract(r"status/(\d+)", expand=False)
+
+    # Remove @"user" mentions from replyText
+    df_filtered["replyText"] = (
+        df_filtered["replyText"]
+        .str.replace(r"@\w+", "", regex=True)  # remove mentions
+        .str.strip()
+    )
+
+    # Rename replyText → Comments
+    df_filtered.rename(columns={"replyText": "comments"}, inplace=True)
+
+    # Keep only final cleaned columns: postUrl, postId, comments
+    return df_filtered[["postUrl", "postId", "comments"]]
+
+
+def row_hashes(df):
+    """64-bit hash of (postId, comments) per row"""
+    # Empty replies read back from CSV as NaN, so treat NaN and "" alike
+    return pd.util.hash_pandas_object(df[["postId", "comments"]].fillna(""), index=False).tolist()
+
+
+def drop_seen(df, seen):
+    """Drop rows whose (postId, comments) hash was already written, recording the new ones"""
+    keep = []
+    for h in row_hashes(df):
+        if h in seen:
+            keep.append(False)
+        else:
+            seen.add(h)
+            keep.append(True)
+    return df[keep]
+
+
+def iter_chunks(file_path, chunksize, skiprows=0):
+    """Stream cleaned chunks of one export"""
+    reader = pd.read_csv(file_path, skiprows=skiprows, usecols=needed_cols,
+                         dtype=str, chunksize=chunksize)
+    for chunk in reader:
+        yield clean_chunk(chunk)
+
+
+def seed_seen(output_file, chunksize):
+    """Hashes of rows already in an existing output, so appending never duplicates them"""
+    seen = set()
+    if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
+        for chunk in pd.read_csv(output_file, dtype=str, chunksize=chunksize):
+            seen.update(row_hashes(chunk))
+    return seen
+
+
+def resolve_inputs(patterns, output_file):
+    files = []
+    for pattern in patterns:
+        files.extend(sorted(glob.glob(pattern)))
+    output = os.path.abspath(output_file)
+    # A broad glob like *.csv would otherwise pick up the cleaned output itself
+    return list(dict.fromkeys(f for f in files if os.path.abspath(f) != output))
+
+
+def clean_exports(patterns, output_file="CleanedXComments.csv", chunksize=50_000, append=False):
+    """
+    Clean every export matching `patterns` into one deduplicated CSV.
+
+    Files are read in chunks of `chunksize` rows and each chunk is appended
+    to the output as soon as it is cleaned, so memory depends on the chunk
+    size and the number of unique rows, not on the size of the exports.
+
+    Returns:
+        tuple: (rows read, rows written)
+    """
+    files = resolve_inputs(patterns, output_file)
+    if not files:
+        raise FileNotFoundError(f"No exports match {patterns}")
+
+    if append:
+        seen = seed_seen(output_file, chunksize)
+        write_header = not os.path.exists(output_file) or os.path.getsize(output_file) == 0
+    else:
+        seen = set()
+        write_header = True
+        # Start a new output; chunks are appended to it below
+        open(output_file, "w").close()
+
+    total_read = total_written = 0
+    start = time.perf_counter()
+    for file_path in files:
+        try:
+            skiprows = find_header_row(file_path)
+        except ValueError as e:
+            print(f"Skipping {file_path}: {e}")
+            continue
+
+        file_start = time.perf_counter()
+        file_read = file_written = 0
+        for chunk in iter_chunks(file_path, chunksize, skiprows):
+            unique = drop_seen(chunk, seen)
+            unique.to_csv(output_file, mode="a", header=write_header, index=False)
+            write_header = False
+            file_read += len(chunk)
+            file_written += len(unique)
+
+        elapsed = time.perf_counter() - file_start
+        rate = file_read / elapsed if elapsed else 0.0
+        print(f"{file_path}: {file_read} rows read, {file_written} kept ({rate:,.0f} rows/s)")
+        total_read += file_read
+        total_written += file_written
 
-# Rename replyText → Comments
-df_filtered.rename(columns={"replyText": "comments"}, inplace=True)
+    elapsed = time.perf_counter() - start
+    rate = total_read / elapsed if elapsed else 0.0
+    print(f"Cleaning complete. {total_written}/{total_read} rows saved to {output_file} "
+          f"({total_read - total_written} duplicates dropped, {rate:,.0f} rows/s)")
+    return total_read, total_written
 
-# Keep only final cleaned columns: postUrl, postId, comments
-final_df = df_filtered[["postUrl", "postId", "comments"]]
 
-# Save cleaned dataset to CSV
-final_df.to_csv("CleanedXComments.csv", index=False)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean raw X reply exports into one CSV")
+    parser.add_argument("patterns", nargs="*", default=["./MergedXComments.csv"],
+                        help='Export files or globs, e.g. "exports/*.csv" (default: MergedXComments.csv)')
+    parser.add_argument("--output", default="CleanedXComments.csv")
+    parser.add_argument("--chunksize", type=int, default=50_000, help="Rows read per chunk")
+    parser.add_argument("--append", action="store_true",
+                        help="Append to an existing output, skipping rows it already contains")
+    args = parser.parse_args()
 
-print("Cleaning complete. Saved as CleanedXComments.csv")
-print(final_df.head())
+    clean_exports(args.patterns, args.output, args.chunksize, args.append)